@@ -1,121 +1,59 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-from utils import load_assets, save_assets
+from utils import StaleAssetsError, load_assets, save_assets
+from fx import get_usd_krw_rate
+from quotes import cached_price_table, collect_tickers, delayed_tickers, fetch_stock_prices
+from crypto import collect_symbols, default_source, value_crypto
+from summary import empty_summary, refresh_summary
+from snapshots import category_timeline, timeline
+from refresher import freshness_text, start_refresher
+from profiling import begin_run, end_run, lap
+from price_history import HISTORY_PERIODS, crypto_value_history, period_start, stock_value_history
 
 st.set_page_config(page_title="My Assets Overview", layout="wide")
 st.title("My Assets (Home)")
-
-# -----------------------------
-# 환율 관련 함수 (yfinance 활용)
-# -----------------------------
-def fetch_exchange_rate() -> float:
-    try:
-        data = yf.Ticker("KRX=X")
-        hist = data.history(period="1d")
-        if not hist.empty:
-            return float(hist["Close"][-1])
-        else:
-            return 1350.0
-    except Exception:
-        return 1350.0
-
-# -----------------------------
-# Stocks 관련 헬퍼 함수
-# -----------------------------
-def fetch_live_price_KRW(ticker: str) -> float:
-    if not ticker:
-        return 0.0
-    try:
-        data = yf.Ticker(ticker)
-        hist = data.history(period="1d")
-        if not hist.empty:
-            return float(hist["Close"][-1])
-        else:
-            return 0.0
-    except Exception:
-        return 0.0
-
-def fetch_live_price_USD(ticker: str) -> float:
-    if not ticker:
-        return 0.0
-    try:
-        data = yf.Ticker(ticker)
-        hist = data.history(period="1d")
-        if not hist.empty:
-            return float(hist["Close"][-1])
-        else:
-            return 0.0
-    except Exception:
-        return 0.0
-
-def compute_stock_totals(holdings: list, exch_rate: float):
-    acc_krw = 0.0
-    acc_usd = 0.0
-    for item in holdings:
-        if item.get("name") == "원화 예수금":
-            acc_krw += item.get("amount_krw", 0.0)
-        elif item.get("name") == "달러 예수금":
-            acc_usd += item.get("amount_usd", 0.0)
-        else:
-            cur = item.get("currency", "USD")
-            qty = item.get("quantity", 0.0)
-            ticker = item.get("ticker", "")
-            if cur == "KRW":
-                if ticker.endswith(".KS") or ticker.endswith(".KQ"):
-                    live_krw = fetch_live_price_KRW(ticker)
-                else:
-                    live_usd = fetch_live_price_USD(ticker)
-                    live_krw = live_usd * exch_rate
-                acc_krw += live_krw * qty
-            else:
-                live_usd = fetch_live_price_USD(ticker)
-                acc_usd += live_usd * qty
-    return acc_krw, acc_usd
-
-def aggregate_stock_assets(stocks_data: dict, exch_rate: float):
-    total_krw = 0.0
-    total_usd = 0.0
-    for account_name, holdings in stocks_data.items():
-        if account_name in ["total_krw", "total_usd"]:
-            continue
-        if isinstance(holdings, list):
-            acc_krw, acc_usd = compute_stock_totals(holdings, exch_rate)
-            total_krw += acc_krw
-            total_usd += acc_usd
-    return total_krw, total_usd
-
-# -----------------------------
-# 각 자산 카테고리 집계 함수
-# -----------------------------
-def aggregate_liquid_assets(liquid_assets: dict):
-    return liquid_assets.get("total_krw", 0)
-
-def aggregate_receivables_deposits(rd: dict):
-    return rd.get("total_krw", 0)
-
-def aggregate_cryptocurrency(crypto: dict, exch_rate: float):
-    crypto_usd = crypto.get("total_usd", 0)
-    crypto_krw = crypto_usd * exch_rate
-    return crypto_krw, crypto_usd
+begin_run("Home")  # 구간별 시간 (STRAWBERRY_DEBUG=1 또는 ?debug=1이면 사이드바에 표시)
 
 #################################
 # 1) 전체 자산 요약 계산
 #################################
+# summary는 각 페이지의 변경 함수가 증분으로 유지하고,
+# 여기서는 가격/환율이 바뀐 종목만 다시 평가한다.
 assets = load_assets()
-exch_rate = fetch_exchange_rate()
-
-liquid_total = aggregate_liquid_assets(assets.get("liquid_assets", {}))
-rd_total = aggregate_receivables_deposits(assets.get("receivables_and_deposits", {}))
-stocks_krw, stocks_usd = aggregate_stock_assets(assets.get("stocks", {}), exch_rate)
-crypto_krw, crypto_usd = aggregate_cryptocurrency(assets.get("cryptocurrency", {}), exch_rate)
+start_refresher()  # 가격은 백그라운드 갱신기가 공유 캐시에 채워둔다 (기다리지 않음)
+exch_rate = get_usd_krw_rate()
+
+# 주식 + 코인 티커를 한 번에 받아 공유 캐시에 넣어두고, 아래 평가는 캐시에서 읽는다
+crypto_source = default_source()
+crypto_data = assets.get("cryptocurrency", {})
+cached_price_table(collect_tickers(assets.get("stocks", {}))
+                   + crypto_source.tickers(collect_symbols(crypto_data)))
+prices, quote_status = fetch_stock_prices(assets.get("stocks", {}))
+crypto_valuation = value_crypto(crypto_data, exch_rate, crypto_source)
+if assets:
+    # 가격 / 환율 / 코인 평가는 화면용 (프로세스 캐시). 예전 형식을 변환했을 때만 저장한다
+    if refresh_summary(assets, prices, exch_rate, crypto_valuation):
+        try:
+            save_assets(assets)
+        except StaleAssetsError:
+            # 다른 탭이 먼저 저장함 → 다음 로드 때 다시 변환
+            pass
+summary = assets.get("summary") or empty_summary()
+
+lap("summary")
+
+liquid_total = summary["liquid_assets_krw"]
+rd_total = summary["receivables_and_deposits_krw"]
+stocks_krw = summary["stocks_krw"]
+stocks_usd = summary["stocks_usd"]
+crypto_krw = summary["cryptocurrency_krw"]
 
 # (A) KRW 자산 합
-total_krw = liquid_total + rd_total + stocks_krw + crypto_krw
-# (B) USD 자산 합
-total_usd = stocks_usd + crypto_usd
+total_krw = summary["total_krw_without_usd"]
+# (B) USD 자산 합 (주식 USD + 암호화폐)
+total_usd = summary["total_usd"]
 # (C) Combined Total in KRW
-combined_total_krw = total_krw + (total_usd * exch_rate)
+combined_total_krw = summary["converted_total_krw"]
 
 #################################
 # 2) 화면 배치
@@ -129,6 +67,14 @@ st.write(
     f"**Total (KRW)**: ₩ {int(total_krw):,} &nbsp;/&nbsp; "
     f"**Total (USD)**: $ {total_usd:,.2f}"
 )
+st.caption(f"USD/KRW {exch_rate:,.2f} · {freshness_text()}")
+
+stale_tickers, unavailable_tickers = delayed_tickers(
+    pd.concat([quote_status, crypto_valuation["status"]]))
+if stale_tickers:
+    st.caption(f"Showing last known prices for: {', '.join(stale_tickers)}")
+if unavailable_tickers:
+    st.caption(f"Prices unavailable (valued at 0): {', '.join(unavailable_tickers)}")
 
 col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
@@ -142,6 +88,44 @@ with col4:
 with col5:
     st.metric("Cryptocurrency (₩)", f"₩ {crypto_krw:,.0f}")
 
+lap("overview")
+
+#################################
+# 3) 순자산 추이 (기록해 둔 스냅샷) / 과거 종가 기준 가치 추이 (지금 보유 수량 기준)
+#################################
+st.write("---")
+period = st.radio("Period", list(HISTORY_PERIODS), index=1, horizontal=True, key="home_history_period")
+history_start = period_start(period)
+
+st.subheader("Net Worth")
+net_worth = timeline(start=history_start)
+if net_worth.empty:
+    st.caption("No snapshots recorded yet. One is recorded each day you save a change.")
+else:
+    st.line_chart(net_worth.rename(columns={"total": "Net Worth (KRW)"}))
+    with st.expander("By category", expanded=False):
+        st.area_chart(category_timeline(history_start))
+
+lap("net_worth")
+
+st.subheader("Value History")
+crypto_symbols = collect_symbols(crypto_data)
+# 빠진 종가는 백그라운드에서 받고, 이번 실행은 디스크에 있는 것만 그린다 (다음 실행부터 반영)
+history = pd.DataFrame({
+    "Stocks": stock_value_history(assets.get("stocks", {}), history_start, budget=0).sum(axis=1),
+    "Cryptocurrency": crypto_value_history(
+        crypto_data, dict(zip(crypto_symbols, crypto_source.tickers(crypto_symbols))), history_start,
+        budget=0),
+}).ffill().dropna(axis=1, how="all")
+if history.empty:
+    st.caption("No price history yet. It is being downloaded and will show up on the next reload.")
+else:
+    st.line_chart(history)
+    st.caption("Current holdings valued at past daily closes (KRW).")
+
+lap("value_history")
+
 st.write("---")
 st.write("<br><br>", unsafe_allow_html=True)
-st.info("Use the sidebar to navigate to other pages.")
\ No newline at end of file
+st.info("Use the sidebar to navigate to other pages.")
+end_run()
\ No newline at end of file
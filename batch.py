@@ -0,0 +1,108 @@
+# batch.py
+"""
+여러 변경을 모아 두었다가 한 번에 검증하고 한 번에 저장하는 batch API.
+
+    batch = Batch()
+    batch.add("liquid_deposit", acct_type="Checking", acct_name="Main", amount=100_000)
+    batch.add("stock_buy", account_name="Broker", symbol="Apple", quantity=2, price=180.0,
+              ticker="AAPL", currency="USD")
+    failures = batch.validate()   # 저장하지 않고 끝까지 적용해 보고 실패한 단계 목록
+    failures = batch.commit()     # 하나라도 실패하면 아무것도 저장하지 않는다 (all-or-nothing)
+
+commit은 load_assets 한 번 → 모든 단계를 같은 문서 / Portfolio에 차례로 적용 → save_assets 한 번.
+각 단계는 liquid / receivables / stocks 모듈의 변경 함수를 그대로 부르므로 페이지의 탭과 규칙이 같다.
+"""
+from liquid import (add_new_account_with_tags, adjust_account_balance, deposit_to_account,
+                    transfer_between_accounts, withdraw_from_account)
+from portfolio import Portfolio
+from profiling import timed_function
+from receivables import rd_adjust, rd_loan_out, rd_withdraw
+from stocks import buy_stock, deposit_stock_account, exchange_currency, sell_stock, withdraw_stock_account
+from utils import load_assets, save_assets
+
+# 단계 이름 → (변경 함수, 화면 표시 이름). 함수는 (portfolio, **인자)로 불린다
+OPERATIONS = {
+    "liquid_deposit": (deposit_to_account, "Liquid: deposit"),
+    "liquid_withdraw": (withdraw_from_account, "Liquid: withdraw"),
+    "liquid_transfer": (transfer_between_accounts, "Liquid: transfer"),
+    "liquid_adjust": (adjust_account_balance, "Liquid: adjust balance"),
+    "liquid_add_account": (add_new_account_with_tags, "Liquid: add account"),
+    "rd_loan_out": (rd_loan_out, "Receivables: loan out"),
+    "rd_repay": (rd_withdraw, "Receivables: repay"),
+    "rd_adjust": (rd_adjust, "Receivables: adjust balance"),
+    "stock_deposit": (deposit_stock_account, "Stocks: deposit"),
+    "stock_withdraw": (withdraw_stock_account, "Stocks: withdraw"),
+    "stock_exchange": (exchange_currency, "Stocks: exchange"),
+    "stock_buy": (buy_stock, "Stocks: buy"),
+    "stock_sell": (sell_stock, "Stocks: sell"),
+}
+
+# 변경 함수들이 실패를 알리는 반환값
+FAILED_RESULTS = ("insufficient", "no_deposit")
+
+
+def succeeded(result) -> bool:
+    """변경 함수의 반환값(True / "ok" / 새 이름 ...)이 성공인지."""
+    if result is None or result is False:
+        return False
+    return not (isinstance(result, str) and result in FAILED_RESULTS)
+
+
+class Batch:
+    """순서대로 적용할 변경 단계 목록. steps: [(단계 이름, 인자 dict), ...]"""
+
+    def __init__(self, steps=None):
+        self.steps = list(steps or [])
+
+    def __len__(self):
+        return len(self.steps)
+
+    def add(self, op: str, **kwargs) -> int:
+        """단계를 뒤에 추가하고 그 위치를 돌려준다."""
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op}")
+        self.steps.append((op, kwargs))
+        return len(self.steps) - 1
+
+    def remove(self, index: int):
+        del self.steps[index]
+
+    def clear(self):
+        self.steps.clear()
+
+    @staticmethod
+    def describe(op: str, kwargs: dict) -> str:
+        details = ", ".join(f"{k}={v}" for k, v in kwargs.items())
+        return f"{OPERATIONS[op][1]} ({details})"
+
+    def apply(self, assets: dict) -> list:
+        """
+        assets에 모든 단계를 차례로 적용 (저장은 하지 않는다).
+        실패한 단계가 있어도 끝까지 적용해 보고 실패 목록 [(위치, 단계 이름, 반환값), ...]을 돌려준다.
+        """
+        portfolio = Portfolio(assets)
+        failures = []
+        for index, (op, kwargs) in enumerate(self.steps):
+            result = OPERATIONS[op][0](portfolio, **kwargs)
+            if not succeeded(result):
+                failures.append((index, op, result))
+        return failures
+
+    def validate(self) -> list:
+        """지금 저장된 문서에 적용해 보기만 한다. returns 실패 목록 (비어 있으면 commit 가능)"""
+        return self.apply(load_assets())
+
+    @timed_function("batch_commit")
+    def commit(self) -> list:
+        """
+        모두 성공하면 한 번만 저장하고 단계 목록을 비운다. 하나라도 실패하면 저장하지 않고 실패 목록을 돌려준다.
+        다른 세션이 그 사이에 저장했으면 save_assets의 StaleAssetsError가 그대로 올라간다.
+        """
+        assets = load_assets()
+        failures = self.apply(assets)
+        if failures:
+            return failures
+        if self.steps:
+            save_assets(assets)
+        self.clear()
+        return []
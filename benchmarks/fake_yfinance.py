@@ -0,0 +1,84 @@
+# benchmarks/fake_yfinance.py
+"""
+네트워크 없이 쓰는 yfinance 대역.
+
+FakeMarket(latency, failure_rate).install()을 하면 yf.download / yf.Ticker가 이 객체를 거친다.
+- latency: 요청 한 번(일괄 조회도 한 번)마다 기다리는 초
+- failure_rate: 티커별로 값을 못 받을 확률 (그 티커 열이 비어서 옴)
+가격은 티커 이름으로 정해지므로 같은 티커는 항상 같은 값.
+"""
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+def _base_price(ticker: str) -> float:
+    if ticker == "KRW=X":
+        return 1350.0
+    seed = zlib.crc32(ticker.encode("utf-8"))
+    if ticker.endswith((".KS", ".KQ")):
+        return float(1000 + seed % 500_000)
+    return float(1 + seed % 1000) + (seed % 100) / 100
+
+
+class FakeMarket:
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.tickers_requested = 0
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+    def _count(self, tickers):
+        with self._lock:
+            self.requests += 1
+            self.tickers_requested += len(tickers)
+
+    def download(self, tickers, start=None, end=None, period=None, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self._count(tickers)
+        time.sleep(self.latency)
+        if start is None:
+            index = pd.DatetimeIndex([pd.Timestamp.today().normalize()])
+        else:
+            index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        steps = np.linspace(0.9, 1.1, len(index))
+        closes = {}
+        for ticker in tickers:
+            if self._fails():
+                values = np.full(len(index), np.nan)
+            elif start is None:
+                values = np.full(len(index), _base_price(ticker))
+            else:
+                values = _base_price(ticker) * steps
+            closes[("Close", ticker)] = values
+        return pd.DataFrame(closes, index=index)
+
+    def ticker(self, symbol: str):
+        market = self
+
+        class _Ticker:
+            def history(self, period="1d", timeout=None, **kwargs):
+                market._count([symbol])
+                time.sleep(market.latency)
+                if market._fails():
+                    return pd.DataFrame(columns=["Close"])
+                return pd.DataFrame({"Close": [_base_price(symbol)]},
+                                    index=pd.DatetimeIndex([pd.Timestamp.today().normalize()]))
+
+        return _Ticker()
+
+    def install(self):
+        yf.download = self.download
+        yf.Ticker = self.ticker
+        return self
@@ -0,0 +1,53 @@
+# benchmarks/rebalance_speed.py
+"""
+리밸런싱 속도 확인 (목표: 종목 수천 개에서 100 ms 이내).
+
+    python benchmarks/rebalance_speed.py                 # 종목 10000개 (positions 약 2만 3천 줄)
+    python benchmarks/rebalance_speed.py --holdings 2000 --limit-ms 50
+
+make_assets(n) 문서를 가짜 시세로 평가해서 flatten_positions / propose_actions 시간을 각각 재고,
+중앙값이 --limit-ms를 넘으면 AssertionError로 끝난다 (CI나 변경 전후 확인용).
+"""
+import argparse
+
+from run import _measure  # sys.path에 저장소 폴더도 넣어 준다
+
+from fake_yfinance import FakeMarket
+from synthetic import make_assets
+
+TARGETS = {"#Safe Assets": 0.5, "#Investment Assets": 0.2,
+           "#Checking Account": 0.2, "#Receivables and Deposits": 0.1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that rebalancing stays under the time limit")
+    parser.add_argument("--holdings", type=int, default=10000)
+    parser.add_argument("--limit-ms", type=float, default=100.0)
+    parser.add_argument("--repeat", type=int, default=11)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    FakeMarket(0.0, 0.0, seed=args.seed).install()
+    from crypto import value_crypto
+    from quotes import fetch_stock_prices
+    from rebalance import flatten_positions, propose_actions
+
+    assets = make_assets(args.holdings, seed=args.seed)
+    rate = 1350.0
+    prices, _ = fetch_stock_prices(assets["stocks"])
+    crypto_positions = value_crypto(assets["cryptocurrency"], rate)["positions"]
+    positions = flatten_positions(assets, prices, rate, crypto_positions)
+
+    results = {
+        "flatten_positions": _measure(lambda: flatten_positions(assets, prices, rate, crypto_positions), args.repeat),
+        "propose_actions": _measure(lambda: propose_actions(positions, TARGETS), args.repeat),
+    }
+    print(f"{len(positions):,} positions (limit {args.limit_ms:g} ms)")
+    for name, value in results.items():
+        print(f"    {name:<20} {value['median_ms']:>10.3f} ms (min {value['min_ms']:.3f})")
+    for name, value in results.items():
+        assert value["median_ms"] < args.limit_ms, f"{name} took {value['median_ms']:.1f} ms (limit {args.limit_ms:g} ms)"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# benchmarks/run.py
+"""
+오프라인 벤치마크.
+
+    python benchmarks/run.py                       # 10 / 100 / 1000 / 10000 종목
+    python benchmarks/run.py --sizes 100,1000 --latency 0.2 --failure-rate 0.1
+
+규모마다 임시 폴더에 가짜 assets.json을 만들고 (yfinance는 fake_yfinance로 대체)
+저장소 / 평가 / 표 만들기 / 입출금 변경 함수 / 페이지 전체 실행(AppTest) 시간을 잰다.
+결과는 표로 stdout에 출력하고 (Streamlit 경고는 stderr로 나오니 2>/dev/null로 숨기면 된다), --output 파일(JSON lines)에 git revision과 함께 한 줄씩 덧붙여
+버전 사이의 차이를 볼 수 있게 한다.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_DIR, BENCH_DIR]
+
+import pandas as pd  # noqa: E402
+
+from fake_yfinance import FakeMarket  # noqa: E402
+from synthetic import make_assets  # noqa: E402
+
+DEFAULT_SIZES = "10,100,1000,10000"
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.jsonl")
+PAGES = {"home": "Home.py", "liquid": "pages/1_Liquid_Assets.py", "stocks": "pages/3_Stocks.py"}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _load_page(path: str):
+    """페이지 파일을 모듈로 불러온다 (main()은 실행되지 않음)."""
+    name = "bench_" + os.path.splitext(os.path.basename(path))[0].lower()
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _reset_process_state():
+    """규모를 바꿀 때 프로세스 전역 캐시를 비운다 (다른 폴더의 파일을 가리키지 않도록)."""
+    import price_history
+    import snapshots
+    import utils
+    from price_cache import price_cache
+
+    utils._known_state.clear()
+    utils._bases.clear()
+    price_cache.clear()
+    price_history.price_history = price_history.PriceHistory()
+    snapshots._keys = snapshots._last = None
+
+
+def _measure(func, repeat: int, setup=None) -> dict:
+    """func()를 repeat번 실행한 시간 (ms). setup()은 매번 먼저 실행되고 시간에서 빠진다."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(samples), 3), "min_ms": round(min(samples), 3)}
+
+
+def bench_size(n: int, args, market: FakeMarket) -> dict:
+    import liquid
+    import utils
+    from fx import get_usd_krw_rate
+    from portfolio import Portfolio
+    from quotes import fetch_stock_prices
+    from valuation import native_totals, value_positions
+
+    results = {}
+    with open(utils.DATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(make_assets(n, seed=args.seed), f, ensure_ascii=False)
+
+    # 1) 저장소
+    def forget_cache():
+        utils._known_state.clear()
+        utils._bases.clear()
+
+    results["load_assets_cold"] = _measure(utils.load_assets, args.repeat, setup=forget_cache)
+    results["load_assets_warm"] = _measure(utils.load_assets, args.repeat)
+
+    def save_one():
+        assets = utils.load_assets()
+        assets["liquid_assets"]["checking_account"]["details"][0]["amount_krw"] += 1000
+        utils.save_assets(assets)
+
+    results["save_assets"] = _measure(save_one, args.repeat)
+
+    # 2) 평가 (Stocks 페이지의 계좌별 합계) / 보유 표
+    assets = utils.load_assets()
+    prices, _ = fetch_stock_prices(assets["stocks"])
+    rate = get_usd_krw_rate()
+
+    def stock_totals():
+        native_totals(value_positions({"stocks": assets["stocks"]}, prices, rate))
+
+    results["stock_totals"] = _measure(stock_totals, args.repeat)
+
+    stocks_page = _load_page(PAGES["stocks"])
+    positions = value_positions({"stocks": assets["stocks"]}, prices, rate)
+    accounts = [group for _, group in positions.groupby("account", sort=False)]
+
+    def all_tables():
+        for group in accounts:
+            stocks_page.build_stock_dataframe(group)
+
+    results["build_stock_dataframe_all"] = _measure(all_tables, args.repeat)
+
+    # 3) 입출금/예적금 변경 함수 (한 번에 OPS번, 1회 평균)
+    names = [e["name"] for e in assets["liquid_assets"]["checking_account"]["details"]]
+    ops = args.ops
+
+    def liquid_ops():
+        portfolio = Portfolio(utils.load_assets())
+        for i in range(ops):
+            a, b = names[i % len(names)], names[(i + 1) % len(names)]
+            liquid.deposit_to_account(portfolio, "Checking", a, 1000)
+            liquid.withdraw_from_account(portfolio, "Checking", a, 500)
+            liquid.transfer_between_accounts(portfolio, "Checking", a, "Checking", b, 100)
+            liquid.adjust_account_balance(portfolio, "Checking", b, 1_000_000)
+            new_name = liquid.add_new_account_with_tags(portfolio, "Savings", "Bench", 0, [])
+            liquid.delete_account(portfolio, "Savings", new_name)
+
+    timing = _measure(liquid_ops, args.repeat)
+    results["liquid_helpers_per_op"] = {k: round(v / (ops * 6), 4) for k, v in timing.items()}
+
+    # 4) 페이지 전체 실행 (AppTest). 첫 실행은 가격 조회 포함, 두 번째는 캐시 상태
+    if n <= args.apptest_max:
+        from streamlit.testing.v1 import AppTest
+
+        for key, path in PAGES.items():
+            at = AppTest.from_file(os.path.join(REPO_DIR, path), default_timeout=args.page_timeout)
+            started = time.perf_counter()
+            at.run()
+            first = (time.perf_counter() - started) * 1000
+            rerun = _measure(at.run, args.repeat)
+            if at.exception:
+                results[f"page_{key}_error"] = str(at.exception[0].message)
+            results[f"page_{key}_first_ms"] = round(first, 3)
+            results[f"page_{key}_rerun"] = rerun
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks with synthetic portfolios")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated holding counts")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake quote latency per request (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="chance a ticker has no quote")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ops", type=int, default=100, help="liquid-asset operations per sample")
+    parser.add_argument("--apptest-max", type=int, default=1000,
+                        help="largest size that also runs full pages through AppTest")
+    parser.add_argument("--page-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON lines file to append results to")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    market = FakeMarket(args.latency, args.failure_rate, seed=args.seed).install()
+    run = {
+        "ts": time.time(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "sizes": {},
+    }
+    cwd = os.getcwd()
+    try:
+        for n in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            with tempfile.TemporaryDirectory(prefix=f"strawberry-bench-{n}-") as work_dir:
+                os.chdir(work_dir)
+                _reset_process_state()
+                before = market.requests
+                run["sizes"][str(n)] = bench_size(n, args, market)
+                run["sizes"][str(n)]["quote_requests"] = market.requests - before
+                os.chdir(cwd)
+            print(f"{n:>6} holdings")
+            for name, value in run["sizes"][str(n)].items():
+                shown = f"{value['median_ms']:>10.3f} ms (min {value['min_ms']:.3f})" if isinstance(value, dict) else value
+                print(f"    {name:<28} {shown}")
+    finally:
+        os.chdir(cwd)
+
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f"Appended results to {output}")
+
+
+if __name__ == "__main__":
+    main()
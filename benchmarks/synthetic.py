@@ -0,0 +1,77 @@
+# benchmarks/synthetic.py
+"""
+벤치마크용 가짜 assets 문서.
+
+make_assets(n)은 종목 n개(계좌당 STOCKS_PER_ACCOUNT개)와 비슷한 규모의 입출금/예적금 계좌,
+채권/보증금, 코인을 가진 문서를 만든다. 같은 seed면 같은 문서.
+"""
+import random
+
+from summary import empty_summary
+
+STOCKS_PER_ACCOUNT = 25
+TAGS = ["#Checking Account", "#Receivables and Deposits", "#Safe Assets", "#Investment Assets"]
+LIQUID_SECTIONS = ["checking_account", "savings_account", "installment_savings"]
+RD_SECTIONS = ["receivables", "deposits"]
+EXCHANGES = ["Upbit", "Binance", "Coinbase"]
+COINS = ["BTC", "ETH", "SOL", "XRP", "ADA", "DOGE", "DOT", "AVAX", "LINK", "MATIC"]
+
+
+def stock_ticker(i: int) -> tuple:
+    """i번째 종목의 (티커, 통화). 1/3은 KRX, 1/3은 USD, 나머지는 KRW로 표시하는 해외 종목."""
+    kind = i % 3
+    if kind == 0:
+        return f"{100000 + i:06d}.KS", "KRW"
+    if kind == 1:
+        return f"US{i}", "USD"
+    return f"GL{i}", "KRW"
+
+
+def make_assets(n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+
+    def details(count, prefix):
+        return [{"name": f"{prefix} {i}", "amount_krw": rng.randrange(0, 50_000_000, 1000),
+                 "tags": [rng.choice(TAGS)]} for i in range(count)]
+
+    liquid = {"total_krw": 0}
+    for j, section in enumerate(LIQUID_SECTIONS):
+        rows = details(max(1, n // len(LIQUID_SECTIONS)), f"{section} {j}")
+        liquid[section] = {"total_krw": sum(r["amount_krw"] for r in rows), "details": rows}
+        liquid["total_krw"] += liquid[section]["total_krw"]
+
+    rd = {"total_krw": 0}
+    for section in RD_SECTIONS:
+        rows = details(max(1, n // 10), section)
+        rd[section] = {"total_krw": sum(r["amount_krw"] for r in rows), "details": rows}
+        rd["total_krw"] += rd[section]["total_krw"]
+
+    stocks = {"total_krw": 0.0, "total_usd": 0.0}
+    for a in range(max(1, -(-n // STOCKS_PER_ACCOUNT))):
+        holdings = [
+            {"name": "원화 예수금", "amount_krw": rng.randrange(0, 10_000_000, 1000), "tags": ["#Investment Assets"]},
+            {"name": "달러 예수금", "amount_usd": round(rng.uniform(0, 5000), 2), "tags": ["#Investment Assets"]},
+        ]
+        stocks["total_krw"] += holdings[0]["amount_krw"]
+        stocks["total_usd"] += holdings[1]["amount_usd"]
+        for i in range(a * STOCKS_PER_ACCOUNT, min(n, (a + 1) * STOCKS_PER_ACCOUNT)):
+            ticker, currency = stock_ticker(i)
+            holdings.append({"symbol": f"Stock {i}", "ticker": ticker, "currency": currency,
+                             "quantity": rng.randint(1, 500), "tags": [rng.choice(TAGS)]})
+        stocks[f"Account {a}"] = holdings
+
+    crypto = {"total_usd": 0}
+    for k in range(max(1, n // 10)):
+        crypto.setdefault(EXCHANGES[k % len(EXCHANGES)], []).append(
+            {"symbol": COINS[k % len(COINS)], "quantity": round(rng.uniform(0.01, 5), 4),
+             "tags": ["#Investment Assets"]})
+
+    summary = empty_summary()
+    del summary["accounts"], summary["marks"]  # 예전 형식 → Home이 처음 열 때 rebuild
+    return {
+        "summary": summary,
+        "liquid_assets": liquid,
+        "receivables_and_deposits": rd,
+        "stocks": stocks,
+        "cryptocurrency": crypto,
+    }
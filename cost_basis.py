@@ -0,0 +1,97 @@
+# cost_basis.py
+"""
+종목별 매수 lot 장부 (취득원가 / 실현손익).
+
+주식 보유 항목 dict에 그대로 붙는다.
+  "lots": [{"date": "2026-10-17", "quantity": 10, "price": 71000.0}, ...]   # 오래된 순
+  "cost_method": "fifo" 또는 "average"   (없으면 DEFAULT_COST_METHOD)
+  "realized": 12345.0                     # 지금까지의 실현손익 (native 통화)
+price는 그 종목 표시 통화(native)로 1주를 산 가격 (매수 때 예수금에서 빠진 금액 / 수량).
+average는 lot을 늘 하나(평균 단가)로 합쳐 둔다.
+
+장부가 생기기 전부터 있던 수량(quantity - lot 수량 합)은 원가를 모르는 수량이다.
+그 수량은 매도 때 가장 먼저 팔린 것으로 보고, 그 부분의 손익은 계산하지 않는다.
+record_buy / record_sell은 항목의 quantity를 바꾸기 전에 부른다.
+"""
+import os
+from datetime import date
+
+import numpy as np
+
+COST_METHODS = ("fifo", "average")
+DEFAULT_COST_METHOD = os.environ.get("STRAWBERRY_COST_METHOD", "fifo")
+_EPS = 1e-9  # 수량 비교 오차
+
+
+def cost_method(item: dict) -> str:
+    method = item.get("cost_method", DEFAULT_COST_METHOD)
+    return method if method in COST_METHODS else "fifo"
+
+
+def _lot_arrays(item: dict):
+    lots = item.get("lots") or []
+    quantity = np.fromiter((lot["quantity"] for lot in lots), dtype="float64", count=len(lots))
+    price = np.fromiter((lot["price"] for lot in lots), dtype="float64", count=len(lots))
+    return quantity, price
+
+
+def tracked(item: dict):
+    """(원가를 아는 수량, 그 수량의 취득원가 합). lot이 없으면 (0, 0)."""
+    quantity, price = _lot_arrays(item)
+    return float(quantity.sum()), float(quantity @ price)
+
+
+def untracked_quantity(item: dict) -> float:
+    return max(0.0, float(item.get("quantity", 0)) - tracked(item)[0])
+
+
+def record_buy(item: dict, quantity: float, price: float, day: str = None):
+    """매수 lot을 추가한다. average면 기존 lot과 합쳐 평균 단가 lot 하나로 둔다."""
+    lot = {"date": day or date.today().isoformat(), "quantity": quantity, "price": price}
+    lots = item.setdefault("lots", [])
+    if cost_method(item) == "average" and lots:
+        held, cost = tracked(item)
+        total = held + quantity
+        lot = {"date": lots[0]["date"], "quantity": total,
+               "price": (cost + quantity * price) / total if total else price}
+        lots[:] = [lot]
+    else:
+        lots.append(lot)
+
+
+def record_sell(item: dict, quantity: float, price: float):
+    """
+    quantity주 매도를 lot에서 빼고 실현손익을 item["realized"]에 더한다.
+    fifo: 누적 수량에서 searchsorted로 어디까지 팔렸는지 찾고 앞쪽 lot을 잘라낸다.
+    average: 평균 단가로 원가를 잡고 lot 하나의 수량만 줄인다.
+    returns 이번 매도의 실현손익 (원가를 아는 수량이 하나도 안 팔렸으면 None)
+    """
+    from_unknown = min(quantity, untracked_quantity(item))
+    sold = quantity - from_unknown
+    if sold <= _EPS or not item.get("lots"):
+        return None
+
+    lot_qty, lot_price = _lot_arrays(item)
+    lots = item["lots"]
+    if cost_method(item) == "average":
+        held = float(lot_qty.sum())
+        average = float(lot_qty @ lot_price) / held if held else 0.0
+        sold = min(sold, held)
+        cost = sold * average
+        remaining = held - sold
+        item["lots"] = ([{"date": lots[0]["date"], "quantity": remaining, "price": average}]
+                        if remaining > _EPS else [])
+    else:
+        cumulative = np.cumsum(lot_qty)
+        sold = min(sold, float(cumulative[-1]))
+        cut = min(int(np.searchsorted(cumulative, sold - _EPS)), len(lots) - 1)
+        before = float(cumulative[cut - 1]) if cut else 0.0
+        partial = sold - before  # cut번째 lot에서 팔린 수량
+        cost = float(lot_qty[:cut] @ lot_price[:cut]) + partial * float(lot_price[cut])
+        left = float(lot_qty[cut]) - partial
+        rest = lots[cut + 1:]
+        item["lots"] = ([dict(lots[cut], quantity=left)] + rest) if left > _EPS else rest
+
+    realized = sold * price - cost
+    item["realized"] = item.get("realized", 0.0) + realized
+    return realized
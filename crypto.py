@@ -0,0 +1,215 @@
+# crypto.py
+"""
+암호화폐 평가 모듈.
+
+cryptocurrency 섹션의 거래소별 코인 항목({"symbol": "BTC", "quantity": 0.5, "tags": [...]})을
+시세 공급원(QuoteSource)으로 평가해서 거래소별 / 전체 USD·KRW 합계를 만든다.
+
+시세 공급원은 바꿔 끼울 수 있다.
+- YahooQuoteSource: Yahoo Finance "BTC-USD" 형식 티커. 주식과 같은 공유 가격 캐시(price_cache)를 거친다.
+- FileQuoteSource:  {"BTC": 65000.0, ...} 형식의 JSON 파일 (오프라인용 대체 시세)
+STRAWBERRY_CRYPTO_FEED=<파일 경로>를 주면 FileQuoteSource를 쓴다.
+"""
+import json
+import logging
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from profiling import timed_function
+from quotes import cached_price_table
+from summary import apply_delta
+
+logger = logging.getLogger(__name__)
+
+CRYPTO_FEED = os.environ.get("STRAWBERRY_CRYPTO_FEED", "")
+
+
+def iter_exchanges(crypto_data: dict):
+    """cryptocurrency 섹션에서 (거래소명, 코인 목록) 쌍만 골라서 돌려준다."""
+    for exchange_name, coins in crypto_data.items():
+        if exchange_name == "total_usd":
+            continue
+        if isinstance(coins, list):
+            yield exchange_name, coins
+
+
+def collect_symbols(crypto_data: dict) -> list:
+    """모든 거래소의 코인 심볼 (중복 제거, 순서 유지)."""
+    seen = {}
+    for _, coins in iter_exchanges(crypto_data):
+        for coin in coins:
+            symbol = coin.get("symbol", "").strip().upper()
+            if symbol:
+                seen[symbol] = None
+    return list(seen)
+
+
+# ------------------------------------------------------------------------------
+# 시세 공급원
+# ------------------------------------------------------------------------------
+
+class QuoteSource(ABC):
+    """
+    코인 시세 공급원의 공통 형태.
+    quote(symbols) → (prices, status): 둘 다 index=심볼인 pd.Series.
+      prices는 USD 가격 (못 받으면 NaN), status는 quotes.cached_price_table과 같은 값.
+    tickers(symbols)는 주식 가격표와 같이 한 번에 받아둘 티커 목록 (해당 없으면 []).
+    """
+
+    @abstractmethod
+    def quote(self, symbols: list):
+        ...
+
+    def tickers(self, symbols: list) -> list:
+        return []
+
+
+class YahooQuoteSource(QuoteSource):
+    """Yahoo Finance의 "<심볼>-USD" 티커. 일괄 조회 + 공유 가격 캐시."""
+
+    quote_currency = "USD"
+
+    def ticker_for(self, symbol: str) -> str:
+        return f"{symbol}-{self.quote_currency}"
+
+    def tickers(self, symbols: list) -> list:
+        return [self.ticker_for(s) for s in symbols]
+
+    def quote(self, symbols: list):
+        index = pd.Index(symbols, dtype="object")
+        if not symbols:
+            return pd.Series(dtype="float64", index=index), pd.Series(dtype="object", index=index)
+        tickers = self.tickers(symbols)
+        prices, status = cached_price_table(tickers)
+        return (pd.Series(prices.reindex(tickers).to_numpy(), index=index, dtype="float64"),
+                pd.Series(status.reindex(tickers).to_numpy(), index=index, dtype="object"))
+
+
+class FileQuoteSource(QuoteSource):
+    """
+    JSON 파일 {"BTC": 65000.0, "ETH": 3000.0, ...}을 시세로 쓴다 (USD).
+    파일이 바뀌었을 때(mtime)만 다시 읽는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._prices = {}
+
+    def _load(self) -> dict:
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                logger.warning("Crypto quote feed %s not found", self.path)
+                self._mtime, self._prices = None, {}
+                return self._prices
+            if mtime != self._mtime:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                    self._prices = {str(k).upper(): float(v) for k, v in raw.items()}
+                    self._mtime = mtime
+                except (ValueError, TypeError, AttributeError):
+                    logger.warning("Could not read crypto quote feed %s", self.path, exc_info=True)
+            return self._prices
+
+    def quote(self, symbols: list):
+        feed = self._load()
+        index = pd.Index(symbols, dtype="object")
+        prices = pd.Series([feed.get(s, math.nan) for s in symbols], index=index, dtype="float64")
+        status = pd.Series(["unavailable" if pd.isna(p) else "live" for p in prices],
+                           index=index, dtype="object")
+        return prices, status
+
+
+_default_source = None
+
+
+def default_source() -> QuoteSource:
+    """STRAWBERRY_CRYPTO_FEED가 있으면 파일, 아니면 Yahoo (프로세스 전역에서 하나)."""
+    global _default_source
+    if _default_source is None:
+        _default_source = FileQuoteSource(CRYPTO_FEED) if CRYPTO_FEED else YahooQuoteSource()
+    return _default_source
+
+
+# ------------------------------------------------------------------------------
+# 평가
+# ------------------------------------------------------------------------------
+
+@timed_function("value_crypto")
+def value_crypto(crypto_data: dict, rate: float, source: QuoteSource = None) -> dict:
+    """
+    모든 거래소의 코인을 한 번의 시세 조회로 평가.
+    returns {
+        "positions": DataFrame (exchange, symbol, quantity, price_usd, value_usd, value_krw, status, tags),
+        "exchanges": {거래소: {"usd": .., "krw": ..}},
+        "total_usd": .., "total_krw": ..,
+        "status": 심볼별 시세 상태 (pd.Series),
+        "complete": 모든 코인의 시세를 받았는지,
+    }
+    시세를 못 받은 코인은 0으로 평가한다.
+    """
+    source = default_source() if source is None else source
+    prices, status = source.quote(collect_symbols(crypto_data))
+
+    rows = []
+    for exchange_name, coins in iter_exchanges(crypto_data):
+        for coin in coins:
+            symbol = coin.get("symbol", "").strip().upper()
+            rows.append((exchange_name, symbol, float(coin.get("quantity", 0.0)), coin.get("tags", [])))
+    positions = pd.DataFrame(rows, columns=["exchange", "symbol", "quantity", "tags"])
+    positions["price_usd"] = prices.reindex(positions["symbol"]).fillna(0.0).to_numpy()
+    positions["value_usd"] = positions["quantity"] * positions["price_usd"]
+    positions["value_krw"] = positions["value_usd"] * rate
+    positions["status"] = status.reindex(positions["symbol"]).fillna("unavailable").to_numpy()
+    positions = positions[["exchange", "symbol", "quantity", "price_usd",
+                           "value_usd", "value_krw", "status", "tags"]]
+
+    by_exchange = positions.groupby("exchange", sort=False)["value_usd"].sum()
+    exchanges = {}
+    for exchange_name, _ in iter_exchanges(crypto_data):
+        usd = float(by_exchange.get(exchange_name, 0.0))
+        exchanges[exchange_name] = {"usd": usd, "krw": usd * rate}
+
+    total_usd = float(positions["value_usd"].sum())
+    return {
+        "positions": positions,
+        "exchanges": exchanges,
+        "total_usd": total_usd,
+        "total_krw": total_usd * rate,
+        "status": status,
+        "complete": bool((positions["status"] != "unavailable").all()),
+    }
+
+
+def sync_valuation(assets: dict, valuation: dict) -> bool:
+    """
+    value_crypto() 결과를 저장된 합계에 반영. 시세를 못 받은 코인이 있거나 코인이 하나도 없으면
+    (저장된 합계가 더 정확할 수 있으므로) 그대로 둔다. returns 값이 바뀌었는지
+    """
+    if valuation["positions"].empty or not valuation["complete"]:
+        return False
+    return sync_crypto_total(assets, valuation["total_usd"])
+
+
+def sync_crypto_total(assets: dict, total_usd: float) -> bool:
+    """
+    평가한 합계를 cryptocurrency["total_usd"]와 summary에 반영.
+    returns 값이 바뀌었는지 (저장이 필요한지)
+    """
+    crypto_data = assets.get("cryptocurrency")
+    if crypto_data is None:
+        return False
+    old = crypto_data.get("total_usd", 0)
+    if old == total_usd:
+        return False
+    crypto_data["total_usd"] = total_usd
+    apply_delta(assets, "cryptocurrency", usd=total_usd - old)
+    return True
@@ -0,0 +1,43 @@
+# fragments.py
+"""
+변경 탭을 st.fragment로 나눈 페이지에서 쓰는 저장 / 무효화 도우미.
+
+fragment 안의 입력(숫자 칸, 선택 상자 ...)은 그 fragment만 다시 실행하므로 가격 조회나 전체 평가가 없다.
+대신 fragment가 받은 assets / Portfolio는 마지막 전체 실행 때 것이라 화면(선택지)에만 쓰고,
+버튼을 누르면 load_for_change()로 다시 불러온 것을 고친다 (같은 탭을 두 번 저장해도 앞의 변경이 남는다).
+변경이 성공하면 commit_and_refresh()로 저장한 뒤 페이지 전체를 다시 실행해서 합계 / 표를 새로 그린다.
+메시지는 다시 실행된 뒤 같은 탭에서 show_flash()가 보여준다.
+"""
+import streamlit as st
+
+from portfolio import Portfolio
+from utils import STALE_MESSAGE, StaleAssetsError, load_assets, save_assets
+
+FLASH_KEY = "fragment_flash"  # session_state: 탭 key → [(종류, 메시지), ...]
+
+
+def load_for_change():
+    """버튼을 누른 시점의 assets와 그 Portfolio. returns (assets, portfolio)"""
+    assets = load_assets()
+    return assets, Portfolio(assets)
+
+
+def commit_and_refresh(assets: dict, key: str, success: str, info: str = None):
+    """
+    저장하고 메시지를 남긴 뒤 전체를 다시 실행 (이 호출은 돌아오지 않는다).
+    다른 세션이 먼저 저장했으면 저장하지 않고 안내만 남긴다.
+    """
+    try:
+        save_assets(assets)
+    except StaleAssetsError:
+        messages = [("error", STALE_MESSAGE)]
+    else:
+        messages = [("success", success)] + ([("info", info)] if info else [])
+    st.session_state.setdefault(FLASH_KEY, {})[key] = messages
+    st.rerun(scope="app")
+
+
+def show_flash(key: str):
+    """key 탭에 남겨 둔 메시지를 한 번만 보여준다."""
+    for kind, message in st.session_state.get(FLASH_KEY, {}).pop(key, []):
+        getattr(st, kind)(message)
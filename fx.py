@@ -0,0 +1,98 @@
+# fx.py
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+from market_hours import FX, is_open, last_close
+from profiling import timed
+from quotes import fetch_price_table
+
+logger = logging.getLogger(__name__)
+
+USD_KRW_TICKER = "KRW=X"  # Yahoo Finance의 USD/KRW 환율 티커
+DEFAULT_USD_KRW = 1350.0  # 한 번도 환율을 받아본 적 없을 때 쓰는 값
+FX_TTL = float(os.environ.get("STRAWBERRY_FX_TTL", "600"))
+FX_RETRY = 60.0  # 조회 실패 후 다시 시도하기까지 기다리는 시간 (초)
+FX_FILE = "fx_rate.json"  # 마지막으로 받은 환율 저장 파일
+
+_lock = threading.Lock()
+_rate = None  # (rate, fetched_at)
+_failed_at = -math.inf
+_fetching = False  # 지금 누군가 조회 중인지 (single-flight)
+
+
+def _load_last_known():
+    """파일에 저장된 마지막 환율. 없거나 깨졌으면 None."""
+    if not os.path.exists(FX_FILE):
+        return None
+    try:
+        with open(FX_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return float(data["usd_krw"]), float(data["fetched_at"])
+    except Exception:
+        logger.warning("Could not read %s", FX_FILE, exc_info=True)
+        return None
+
+
+def _save_last_known(rate: float, fetched_at: float):
+    tmp_path = FX_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"usd_krw": rate, "fetched_at": fetched_at}, f)
+        os.replace(tmp_path, FX_FILE)
+    except OSError:
+        logger.warning("Could not write %s", FX_FILE, exc_info=True)
+
+
+def _settled(fetched_at: float) -> bool:
+    """외환시장이 닫혀 있고 그 이후(마지막 마감 뒤)에 받은 값인지 → 다음 개장까지 다시 받을 필요 없음."""
+    if is_open(FX):
+        return False
+    closed_at = last_close(FX)
+    return closed_at is not None and fetched_at >= closed_at.timestamp()
+
+
+def _last_known() -> float:
+    return _rate[0] if _rate is not None else DEFAULT_USD_KRW
+
+
+def get_usd_krw_rate() -> float:
+    """
+    USD/KRW 환율. 모든 페이지가 이 값을 쓴다.
+    - FX_TTL 이내에 받은 값이 있으면 그대로 사용 (프로세스 전역 캐시)
+    - 주말처럼 외환시장이 닫혀 있으면 마감 뒤에 받은 값을 다음 개장까지 그대로 사용
+    - 아니면 새로 받아서 캐시 + 파일에 저장
+    - 받기에 실패하면 마지막으로 받은 값(메모리 → 파일 순), 그것도 없으면 DEFAULT_USD_KRW
+      (실패 후 FX_RETRY초 동안은 다시 조회하지 않음)
+    조회는 한 번에 한 호출만 하고 (_fetching) 락 밖에서 한다. 그동안 다른 호출은 기다리지 않고 마지막 값을 쓴다.
+    """
+    global _rate, _failed_at, _fetching
+    with _lock:
+        if _rate is None:
+            _rate = _load_last_known()
+        now = time.time()
+        fresh = _rate is not None and (now - _rate[1] <= FX_TTL or _settled(_rate[1]))
+        if fresh or _fetching or now - _failed_at <= FX_RETRY:
+            return _last_known()
+        _fetching = True
+
+    ok = False
+    try:
+        with timed("fx_fetch"):
+            fetched = fetch_price_table([USD_KRW_TICKER]).get(USD_KRW_TICKER, math.nan)
+        ok = not math.isnan(fetched) and fetched > 0
+    finally:
+        with _lock:
+            _fetching = False
+            if ok:
+                _rate = (float(fetched), time.time())
+                _save_last_known(*_rate)
+            else:
+                _failed_at = now
+            rate = _last_known()
+    if not ok:
+        logger.warning("USD/KRW lookup failed; using last known rate")
+    return rate
@@ -0,0 +1,408 @@
+# importer.py
+"""
+증권사 / 은행 CSV 거래내역 일괄 가져오기.
+
+read_rows()가 CSV를 한 줄씩 읽어 (줄 번호, 중복 판별 키, 원본 행)을 generator로 내보내고,
+import_rows()가 처음 보는 행만 매핑대로 정규화해서 불러온 문서 하나에 차례로 반영하고,
+import_csv()가 마지막에 한 번만 저장한다.
+(중간에 해석할 수 없는 행이 나오면 RowError로 멈추고 아무것도 저장하지 않는다)
+
+매핑(mappings)은 CSV 열 이름 → 필드, 거래 구분 값 → 동작을 정한다.
+  target   "stocks" | "liquid_assets" | "receivables_and_deposits"
+  columns  필드 → CSV 열 이름 (여기 적은 열은 모두 파일에 있어야 한다)
+           stocks: date, account, type, symbol, ticker, quantity, price, amount, currency
+           그 외:   date, account, section, amount (또는 in / out 두 열), memo
+  types    (stocks) 구분 열의 값 → "buy" | "sell" | "deposit" | "withdraw". 없는 값의 행은 건너뛴다.
+  currency / account / section / tags: 열이 없을 때 쓰는 기본값
+  encoding: 파일 인코딩,  ticker_suffix: 숫자만 있는 종목코드에 붙일 접미사
+STRAWBERRY_IMPORT_MAPPINGS=<json 파일>로 매핑을 더하거나 덮어쓸 수 있다.
+
+같은 행을 두 번 가져오지 않도록 행마다 (매핑 이름, 매핑된 열 값, 파일 안에서 같은 내용의 몇 번째 행인지)의
+해시를 imported_rows/<매핑 이름>.txt에 한 줄씩 덧붙이고 다음 가져오기 때 건너뛴다.
+(assets 문서에 두면 저장 / 불러오기마다 계속 커지므로 따로 둔다. 예전 assets["imported_rows"]는
+다음 가져오기를 저장할 때 imported_rows/_legacy.txt로 옮긴다)
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+from cost_basis import record_buy, record_sell
+from portfolio import DEPOSIT_ROWS, Portfolio
+from profiling import timed_function
+from summary import add_account, apply_delta, marked_value
+from utils import load_assets, save_assets
+
+logger = logging.getLogger(__name__)
+
+MAPPINGS_FILE = os.environ.get("STRAWBERRY_IMPORT_MAPPINGS", "")
+IMPORTED_DIR = os.environ.get("STRAWBERRY_IMPORTED_DIR", "imported_rows")  # 매핑별 가져온 행 해시 파일
+IMPORTED_KEY = "imported_rows"  # 예전에 해시 목록을 두던 assets 최상위 키
+LEGACY_IMPORTED = "_legacy"  # 그 목록을 옮겨 두는 파일 (매핑 이름은 해시 안에 있어서 모든 매핑이 함께 본다)
+STOCK_ACTIONS = ("buy", "sell", "deposit", "withdraw")
+_EPS = 1e-9
+
+MAPPINGS = {
+    # 국내 증권사 거래내역 (원화)
+    "broker_krw": {
+        "target": "stocks",
+        "currency": "KRW",
+        "encoding": "utf-8-sig",
+        "ticker_suffix": ".KS",  # 005930 → 005930.KS
+        "columns": {"date": "거래일자", "account": "계좌명", "type": "거래구분", "symbol": "종목명",
+                    "ticker": "종목코드", "quantity": "수량", "price": "단가", "amount": "거래금액"},
+        "types": {"매수": "buy", "매도": "sell", "입금": "deposit", "출금": "withdraw",
+                  "배당금입금": "deposit"},
+    },
+    # 해외 증권사 거래내역 (달러)
+    "broker_usd": {
+        "target": "stocks",
+        "currency": "USD",
+        "encoding": "utf-8-sig",
+        "columns": {"date": "Date", "account": "Account", "type": "Action", "symbol": "Description",
+                    "ticker": "Symbol", "quantity": "Quantity", "price": "Price", "amount": "Amount"},
+        "types": {"Buy": "buy", "Sell": "sell", "Deposit": "deposit", "Withdrawal": "withdraw",
+                  "Dividend": "deposit"},
+    },
+    # 은행 입출금 내역 (입금액 / 출금액 열)
+    "bank": {
+        "target": "liquid_assets",
+        "section": "Checking",
+        "encoding": "utf-8-sig",
+        "tags": ["#Checking Account"],
+        "columns": {"date": "거래일시", "account": "계좌명", "in": "입금액", "out": "출금액", "memo": "적요"},
+    },
+    # 빌려준 돈 / 보증금 내역 (부호 있는 금액 한 열, Type 열은 Receivables / Deposits)
+    "receivables": {
+        "target": "receivables_and_deposits",
+        "section": "Receivables",
+        "encoding": "utf-8-sig",
+        "tags": ["#Receivables and Deposits"],
+        "columns": {"date": "Date", "account": "Name", "section": "Type", "amount": "Amount"},
+    },
+}
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y.%m.%d", "%Y/%m/%d", "%Y%m%d", "%m/%d/%Y")
+
+
+class RowError(ValueError):
+    """가져오기를 멈춰야 하는 행 (메시지에 줄 번호 포함)."""
+
+
+def _load_mappings() -> dict:
+    loaded = dict(MAPPINGS)
+    if MAPPINGS_FILE:
+        try:
+            with open(MAPPINGS_FILE, "r", encoding="utf-8") as f:
+                loaded.update(json.load(f))
+        except (OSError, ValueError):
+            logger.warning("Could not read import mappings from %s", MAPPINGS_FILE, exc_info=True)
+    return loaded
+
+
+mappings = _load_mappings()
+
+
+# ------------------------------------------------------------------------------
+# CSV → 정규화한 행
+# ------------------------------------------------------------------------------
+
+def _number(text: str) -> float:
+    """'1,234.5' / '₩1,000' / '$12.30' / '(12.3)' / '' → float (빈 칸은 0)."""
+    text = (text or "").strip().replace(",", "").replace("₩", "").replace("$", "").replace("원", "")
+    if not text:
+        return 0.0
+    if text.startswith("(") and text.endswith(")"):
+        return -float(text[1:-1])
+    return float(text)
+
+
+@lru_cache(maxsize=4096)  # 거래내역의 날짜는 몇 백 가지뿐이라 strptime을 반복하지 않는다
+def _day(text: str) -> str:
+    """날짜(+시각) 문자열 → "YYYY-MM-DD". 비어 있으면 빈 문자열."""
+    text = (text or "").strip().split(" ")[0]
+    if not text:
+        return ""
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"unknown date format {text!r}")
+
+
+@contextmanager
+def _text_file(file, encoding: str):
+    """경로 / 텍스트 파일 / 바이트 파일(업로드) → 텍스트 파일. 넘겨받은 파일 객체는 닫지 않는다."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "r", encoding=encoding, newline="") as f:
+            yield f
+    elif isinstance(file, io.TextIOBase):
+        yield file
+    else:
+        f = io.TextIOWrapper(file, encoding=encoding, newline="")
+        try:
+            yield f
+        finally:
+            f.detach()
+
+
+def _normalize(raw: dict, mapping: dict) -> dict:
+    """CSV 한 줄 → 반영할 행. 건너뛸 행(모르는 거래 구분)이면 None."""
+    columns = mapping["columns"]
+
+    def field(name, default=""):
+        column = columns.get(name)
+        value = (raw.get(column) or "").strip() if column else ""
+        return value or default
+
+    row = {"day": _day(field("date")), "account": field("account", mapping.get("account", ""))}
+    if not row["account"]:
+        raise ValueError("missing account")
+
+    if mapping["target"] == "stocks":
+        action = mapping.get("types", {}).get(field("type"))
+        if action not in STOCK_ACTIONS:
+            return None
+        quantity = abs(_number(field("quantity")))
+        price = abs(_number(field("price")))
+        amount = abs(_number(field("amount"))) or quantity * price
+        if not price and quantity:
+            price = amount / quantity
+        ticker = field("ticker")
+        if ticker.isdigit() and mapping.get("ticker_suffix"):
+            ticker += mapping["ticker_suffix"]
+        row.update(action=action, symbol=field("symbol", ticker), ticker=ticker,
+                   currency=field("currency", mapping.get("currency", "KRW")),
+                   quantity=quantity, price=price, amount=amount)
+        if action in ("buy", "sell") and (not quantity or not (row["symbol"] or ticker)):
+            raise ValueError("trade without symbol or quantity")
+    else:
+        if "amount" in columns:
+            amount = _number(field("amount"))
+        else:
+            amount = _number(field("in")) - _number(field("out"))
+        row.update(section=field("section", mapping.get("section", "")), amount=int(round(amount)))
+    return row
+
+
+def read_rows(file, name: str):
+    """
+    CSV를 한 줄씩 읽는 generator. yields (줄 번호, 중복 판별 키, 원본 행 dict)
+    파일 전체를 메모리에 올리지 않는다 (같은 내용 행 개수를 세는 dict만 둔다).
+    """
+    mapping = mappings[name]
+    columns = list(mapping["columns"].values())
+    with _text_file(file, mapping.get("encoding", "utf-8-sig")) as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in columns if c not in (reader.fieldnames or [])]
+        if missing:
+            raise RowError(f"Line 1: missing columns {', '.join(missing)}")
+        occurrences = {}
+        for line, raw in enumerate(reader, start=2):
+            values = tuple((raw.get(c) or "").strip() for c in columns)
+            if not any(values):
+                continue
+            n = occurrences.get(values, 0)
+            occurrences[values] = n + 1
+            key = hashlib.blake2b("\x1f".join((name, str(n)) + values).encode("utf-8"),
+                                  digest_size=8).hexdigest()
+            yield line, key, raw
+
+
+# ------------------------------------------------------------------------------
+# 가져온 행 해시 (매핑별 파일)
+# ------------------------------------------------------------------------------
+
+def _imported_path(name: str) -> str:
+    return os.path.join(IMPORTED_DIR, re.sub(r"[^\w.-]", "_", name) + ".txt")
+
+
+def load_imported(name: str) -> set:
+    """name 매핑으로 이미 가져온 행의 해시 (예전 목록 포함)."""
+    seen = set()
+    for path in (_imported_path(name), _imported_path(LEGACY_IMPORTED)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                seen.update(line.strip() for line in f if line.strip())
+        except FileNotFoundError:
+            pass
+    return seen
+
+
+def record_imported(name: str, keys: list):
+    """가져온 행의 해시를 덧붙인다 (assets를 저장한 뒤에 부른다)."""
+    if not keys:
+        return
+    os.makedirs(IMPORTED_DIR, exist_ok=True)
+    with open(_imported_path(name), "a", encoding="utf-8") as f:
+        f.write("".join(key + "\n" for key in keys))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ------------------------------------------------------------------------------
+# 행 → 문서
+# ------------------------------------------------------------------------------
+
+def _stock_account(portfolio: Portfolio, account: str):
+    if not portfolio.has_stock_account(account):
+        portfolio.add_stock_account(account, [
+            {"name": DEPOSIT_ROWS["KRW"], "amount_krw": 0, "tags": ["#Investment Assets"]},
+            {"name": DEPOSIT_ROWS["USD"], "amount_usd": 0.0, "tags": ["#Investment Assets"]},
+        ])
+        add_account(portfolio.assets, "stocks", account)
+
+
+def _apply_stock(portfolio: Portfolio, row: dict, delta: list) -> str:
+    """
+    거래 한 줄을 주식 계좌에 반영. delta([krw, usd])에 summary 변화량을 더한다.
+    예수금은 행의 통화로 움직이므로, 이미 있는 종목의 통화와 다르면 반영하지 않는다.
+    returns "ok" | "insufficient" (가진 것보다 많이 매도) | "no_funds" (예수금 부족)
+            | "currency_mismatch" | "no_deposit"
+    """
+    assets = portfolio.assets
+    account, currency = row["account"], row["currency"]
+    _stock_account(portfolio, account)
+    deposit = portfolio.deposit_item(account, currency)
+    if deposit is None:
+        return "no_deposit"
+
+    cash = 0.0
+    if row["action"] in ("buy", "sell"):
+        item = None
+        if row["ticker"]:
+            item = portfolio.find_by_ticker(account, row["ticker"])
+        if item is None:
+            item = portfolio.find_holding(account, row["symbol"])
+        if item is not None and item.get("currency", "USD") != currency:
+            return "currency_mismatch"
+        quantity = row["quantity"]
+        if row["action"] == "buy":
+            balance = deposit["amount_krw"] if currency == "KRW" else deposit["amount_usd"]
+            if balance < row["amount"] - _EPS:
+                return "no_funds"
+            if item is None:
+                item = {"symbol": row["symbol"], "ticker": row["ticker"], "currency": currency,
+                        "quantity": 0, "tags": ["#Investment Assets"]}
+                portfolio.add_holding(account, item)
+            if row["price"] > 0:
+                record_buy(item, quantity, row["price"], row["day"] or None)
+            item["quantity"] += quantity
+            pos_krw, pos_usd = marked_value(assets, item, quantity)
+            cash = -row["amount"]
+        else:
+            if item is None or item.get("quantity", 0) < quantity - _EPS:
+                return "insufficient"
+            record_sell(item, quantity, row["price"])
+            item["quantity"] -= quantity
+            pos_krw, pos_usd = marked_value(assets, item, -quantity)
+            cash = row["amount"]
+        delta[0] += pos_krw
+        delta[1] += pos_usd
+    else:
+        cash = row["amount"] if row["action"] == "deposit" else -row["amount"]
+
+    stocks_data = assets["stocks"]
+    if currency == "KRW":
+        deposit["amount_krw"] += cash
+        stocks_data["total_krw"] = stocks_data.get("total_krw", 0) + cash
+        delta[0] += cash
+    else:
+        deposit["amount_usd"] += cash
+        stocks_data["total_usd"] = stocks_data.get("total_usd", 0) + cash
+        delta[1] += cash
+    return "ok"
+
+
+def _apply_entry(portfolio: Portfolio, category: str, row: dict, tags: list, delta: list) -> str:
+    """입출금 한 줄을 liquid_assets / receivables_and_deposits 항목에 반영. returns "ok" | "no_section" """
+    section = portfolio.section(category, row["section"])
+    if section is None:
+        return "no_section"
+    entry = portfolio.find_entry(category, row["section"], row["account"])
+    if entry is None:
+        entry = {"name": row["account"], "amount_krw": 0, "tags": list(tags)}
+        portfolio.add_entry(category, row["section"], entry)
+    amount = row["amount"]
+    entry["amount_krw"] += amount
+    section["total_krw"] += amount
+    portfolio.assets[category]["total_krw"] += amount
+    delta[0] += amount
+    return "ok"
+
+
+_ROW_ERRORS = {
+    "insufficient": "selling more shares than held",
+    "no_funds": "the deposit does not cover the purchase",
+    "currency_mismatch": "trade currency differs from the holding's currency",
+    "no_deposit": "account has no deposit row for this currency",
+    "no_section": "unknown section",
+}
+
+
+@timed_function("import_rows")
+def import_rows(assets: dict, rows, name: str, seen: set, imported: list) -> dict:
+    """
+    read_rows()의 행을 assets에 차례로 반영 (저장은 하지 않는다).
+    seen(load_imported)에 있는 행은 해석하지 않고 건너뛰고, 반영한 행의 해시는 seen / imported에 더한다.
+    summary 변화량은 계좌별로 모았다가 끝에 한 번씩 apply_delta.
+    returns {"applied", "duplicates", "skipped"} 행 수
+    """
+    mapping = mappings[name]
+    category = mapping["target"]
+    portfolio = Portfolio(assets)
+    deltas = {}  # summary 계좌(주식) 또는 None → [krw, usd]
+    stats = {"applied": 0, "duplicates": 0, "skipped": 0}
+
+    for line, key, raw in rows:
+        if key in seen:
+            stats["duplicates"] += 1
+            continue
+        try:
+            row = _normalize(raw, mapping)
+        except ValueError as e:
+            raise RowError(f"Line {line}: {e}") from None
+        if row is None:
+            stats["skipped"] += 1
+            continue
+        if category == "stocks":
+            delta = deltas.setdefault(row["account"], [0.0, 0.0])
+            result = _apply_stock(portfolio, row, delta)
+        else:
+            delta = deltas.setdefault(None, [0.0, 0.0])
+            result = _apply_entry(portfolio, category, row, mapping.get("tags", []), delta)
+        if result != "ok":
+            raise RowError(f"Line {line}: {_ROW_ERRORS[result]}")
+        seen.add(key)
+        imported.append(key)
+        stats["applied"] += 1
+
+    for account, (krw, usd) in deltas.items():
+        apply_delta(assets, category, account, krw=krw, usd=usd)
+    return stats
+
+
+def import_csv(file, name: str, dry_run: bool = False) -> dict:
+    """
+    CSV 하나를 가져와서 한 번에 저장한다. dry_run이면 반영 결과만 세고 저장하지 않는다.
+    returns import_rows()의 통계. 행 오류는 RowError, 다른 세션이 먼저 저장했으면 StaleAssetsError.
+    """
+    assets = load_assets()
+    legacy = assets.get(IMPORTED_KEY, [])
+    seen = load_imported(name) | set(legacy)
+    imported = []
+    stats = import_rows(assets, read_rows(file, name), name, seen, imported)
+    if stats["applied"] and not dry_run:
+        assets.pop(IMPORTED_KEY, None)
+        save_assets(assets)
+        # assets 저장이 끝난 뒤에 기록한다 (저장이 실패한 행은 다음에 다시 가져올 수 있게)
+        record_imported(LEGACY_IMPORTED, legacy)
+        record_imported(name, imported)
+    return stats
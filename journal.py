@@ -0,0 +1,132 @@
+# journal.py
+"""
+assets.json 변경 기록(append-only journal)용 도우미.
+
+한 줄이 저장 한 번: {"rev": 12, "ts": "...", "ops": [[op, path, value], ...]}
+- ["set", path, value]    path 위치에 value를 넣음 (dict 키 추가/변경, list 항목 변경)
+- ["del", path]           path 위치를 지움
+- ["append", path, items] path의 list 뒤에 items를 붙임
+path는 dict 키 / list 인덱스의 목록.
+"""
+import json
+import os
+import time
+
+
+def clone(obj):
+    """JSON 구조(dict/list/스칼라) 전용 깊은 복사. copy.deepcopy보다 훨씬 빠르다."""
+    if isinstance(obj, dict):
+        return {k: clone(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [clone(v) for v in obj]
+    return obj
+
+
+def diff(old, new, path=None, ops=None, skip=()):
+    """old → new로 바꾸는 최소한의 op 목록. skip: 최상위에서 비교하지 않을 키."""
+    path = [] if path is None else path
+    ops = [] if ops is None else ops
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key in skip:
+                continue
+            if key not in new:
+                ops.append(["del", path + [key]])
+        for key, value in new.items():
+            if key in skip:
+                continue
+            if key not in old:
+                ops.append(["set", path + [key], clone(value)])
+            else:
+                diff(old[key], value, path + [key], ops)
+    elif isinstance(old, list) and isinstance(new, list):
+        if len(old) <= len(new) and all(_same(a, b) or _container_pair(a, b)
+                                        for a, b in zip(old, new)):
+            # 같은 길이의 항목 변경 + 뒤에 추가된 항목
+            for i, (a, b) in enumerate(zip(old, new)):
+                diff(a, b, path + [i], ops)
+            if len(new) > len(old):
+                ops.append(["append", path, clone(new[len(old):])])
+        else:
+            # 중간 삭제 등은 list를 통째로 교체
+            ops.append(["set", path, clone(new)])
+    elif not _same(old, new):
+        ops.append(["set", path, clone(new)])
+    return ops
+
+
+def _same(a, b) -> bool:
+    return type(a) is type(b) and a == b
+
+
+def _container_pair(a, b) -> bool:
+    return (isinstance(a, dict) and isinstance(b, dict)) or (isinstance(a, list) and isinstance(b, list))
+
+
+def apply_ops(doc: dict, ops: list):
+    """diff()로 만든 op 목록을 doc에 그대로 적용 (doc을 직접 수정)."""
+    for op in ops:
+        kind, path = op[0], op[1]
+        parent = doc
+        for key in path[:-1]:
+            parent = parent[key]
+        last = path[-1]
+        if kind == "set":
+            parent[last] = clone(op[2])
+        elif kind == "del":
+            del parent[last]
+        elif kind == "append":
+            parent[last].extend(clone(op[2]))
+        else:
+            raise ValueError(f"Unknown journal op: {kind}")
+    return doc
+
+
+def read_entries(path: str) -> list:
+    """journal 파일의 모든 항목. 마지막 줄이 중간에 끊겼으면(저장 중 종료) 그 줄은 버린다."""
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+    return entries
+
+
+def _drop_partial_tail(f):
+    """저장 도중 끊긴 마지막 줄이 있으면 잘라낸다 (다음 줄이 거기 이어 붙지 않도록)."""
+    end = f.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        return
+    pos = end
+    while pos > 0:
+        step = min(4096, pos)
+        f.seek(pos - step)
+        chunk = f.read(step)
+        idx = chunk.rfind(b"\n")
+        if idx != -1:
+            f.truncate(pos - step + idx + 1)
+            return
+        pos -= step
+    f.truncate(0)
+
+
+def append_entry(path: str, rev: int, ops: list):
+    """항목 하나를 journal 끝에 붙이고 디스크까지 flush."""
+    entry = {"rev": rev, "ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "ops": ops}
+    line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+    with open(path, "a+b") as f:
+        _drop_partial_tail(f)
+        f.seek(0, os.SEEK_END)
+        f.write(line.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    return entry
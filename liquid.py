@@ -0,0 +1,126 @@
+# liquid.py
+"""
+입출금 / 예적금 계좌(liquid_assets) 변경 함수.
+
+acct_type은 페이지의 종류 이름 ("Checking", "Savings", "Installment").
+반환값은 페이지에서 쓰던 그대로: 성공 True / "ok" / 새 이름, 실패 False / None / "insufficient".
+"""
+from portfolio import Portfolio
+from summary import apply_delta
+
+
+def get_account_list(portfolio: Portfolio, acct_type: str):
+    return portfolio.entry_names("liquid_assets", acct_type)
+
+def get_category_dict(portfolio: Portfolio, acct_type: str):
+    return portfolio.section("liquid_assets", acct_type)
+
+def deposit_to_account(portfolio: Portfolio, acct_type: str, acct_name: str, amount: int):
+    assets = portfolio.assets
+    category = get_category_dict(portfolio, acct_type)
+    if not category:
+        return False
+    entry = portfolio.find_entry("liquid_assets", acct_type, acct_name)
+    if entry is None:
+        return False
+    entry["amount_krw"] += amount
+    category["total_krw"] += amount
+    assets["liquid_assets"]["total_krw"] += amount
+    apply_delta(assets, "liquid_assets", krw=amount)
+    return True
+
+def withdraw_from_account(portfolio: Portfolio, acct_type: str, acct_name: str, amount: int):
+    assets = portfolio.assets
+    category = get_category_dict(portfolio, acct_type)
+    if not category:
+        return False
+    entry = portfolio.find_entry("liquid_assets", acct_type, acct_name)
+    if entry is None:
+        return False
+    if entry["amount_krw"] < amount:
+        return "insufficient"
+    entry["amount_krw"] -= amount
+    category["total_krw"] -= amount
+    assets["liquid_assets"]["total_krw"] -= amount
+    apply_delta(assets, "liquid_assets", krw=-amount)
+    return "ok"
+
+def transfer_between_accounts(portfolio: Portfolio, from_type: str, from_name: str,
+                             to_type: str, to_name: str, amount: int):
+    wd_result = withdraw_from_account(portfolio, from_type, from_name, amount)
+    if wd_result == "insufficient":
+        return "insufficient"
+    elif wd_result is False:
+        return False
+
+    dp_result = deposit_to_account(portfolio, to_type, to_name, amount)
+    if not dp_result:
+        return False
+    return "ok"
+
+def add_new_account_with_tags(portfolio: Portfolio, acct_type: str, acct_name: str, initial_balance: int, tags: list):
+    """
+    계좌를 새로 추가하되, 사용자가 multiselect로 선택한 tags도 함께 저장.
+    """
+    assets = portfolio.assets
+    category = get_category_dict(portfolio, acct_type)
+    if not category:
+        return None
+
+    new_name = acct_name.strip()
+    if not new_name:
+        return None
+
+    # 같은 이름이 있으면 " (1)", " (2)" ... 를 붙임
+    new_name = portfolio.unique_entry_name("liquid_assets", acct_type, new_name)
+
+    # 선택된 태그가 없다면 빈 리스트
+    if not tags:
+        tags = []
+
+    new_entry = {
+        "name": new_name,
+        "amount_krw": initial_balance,
+        "tags": tags
+    }
+    portfolio.add_entry("liquid_assets", acct_type, new_entry)
+
+    # 금액 합계 반영
+    category["total_krw"] += initial_balance
+    assets["liquid_assets"]["total_krw"] += initial_balance
+    apply_delta(assets, "liquid_assets", krw=initial_balance)
+
+    return new_name
+
+def delete_account(portfolio: Portfolio, acct_type: str, acct_name: str):
+    assets = portfolio.assets
+    category = get_category_dict(portfolio, acct_type)
+    if not category:
+        return False
+
+    entry = portfolio.remove_entry("liquid_assets", acct_type, acct_name)
+    if entry is None:
+        return False
+    balance = entry["amount_krw"]
+    category["total_krw"] -= balance
+    assets["liquid_assets"]["total_krw"] -= balance
+    apply_delta(assets, "liquid_assets", krw=-balance)
+    return True
+
+def adjust_account_balance(portfolio: Portfolio, acct_type: str, acct_name: str, new_balance: int):
+    assets = portfolio.assets
+    category = get_category_dict(portfolio, acct_type)
+    if not category:
+        return False
+
+    entry = portfolio.find_entry("liquid_assets", acct_type, acct_name)
+    if entry is None:
+        return False
+    old_balance = entry["amount_krw"]
+    diff = new_balance - old_balance
+    entry["amount_krw"] = new_balance
+
+    category["total_krw"] += diff
+    assets["liquid_assets"]["total_krw"] += diff
+    apply_delta(assets, "liquid_assets", krw=diff)
+    return True
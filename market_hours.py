@@ -0,0 +1,162 @@
+# market_hours.py
+"""
+거래소 장 시간 / 휴장일.
+
+티커 → 시장: .KS/.KQ는 KRX, 코인 티커는 CRYPTO(24시간), 나머지 주식은 US, 환율(KRW=X)은 FX.
+휴장일 표는 아래 HOLIDAYS에 있고, 표에 없는 해는 주말만 쉬는 것으로 본다.
+STRAWBERRY_MARKET_HOLIDAYS=<JSON 파일>({"KRX": ["2027-01-01", ...], "US": [...]})로 날짜를 더할 수 있다.
+"""
+import json
+import logging
+import os
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from portfolio import is_krx_ticker
+
+logger = logging.getLogger(__name__)
+
+HOLIDAYS_FILE = os.environ.get("STRAWBERRY_MARKET_HOLIDAYS", "")
+
+# 시장: (시간대, 개장, 폐장)
+SESSIONS = {
+    "KRX": (ZoneInfo("Asia/Seoul"), dtime(9, 0), dtime(15, 30)),
+    "US": (ZoneInfo("America/New_York"), dtime(9, 30), dtime(16, 0)),
+}
+ALWAYS_OPEN = "CRYPTO"
+FX = "FX"  # 일요일 17:00 ~ 금요일 17:00 (뉴욕 시간)
+_FX_TZ = ZoneInfo("America/New_York")
+_FX_CUTOFF = dtime(17, 0)
+
+HOLIDAYS = {
+    "KRX": """
+        2025-01-01 2025-01-27 2025-01-28 2025-01-29 2025-01-30 2025-03-03 2025-05-01 2025-05-05
+        2025-05-06 2025-06-03 2025-06-06 2025-08-15 2025-10-03 2025-10-06 2025-10-07 2025-10-08
+        2025-10-09 2025-12-25 2025-12-31
+        2026-01-01 2026-02-16 2026-02-17 2026-02-18 2026-03-02 2026-05-01 2026-05-05 2026-05-25
+        2026-06-03 2026-08-17 2026-09-24 2026-09-25 2026-10-05 2026-10-09 2026-12-25 2026-12-31
+    """,
+    "US": """
+        2025-01-01 2025-01-09 2025-01-20 2025-02-17 2025-04-18 2025-05-26 2025-06-19 2025-07-04
+        2025-09-01 2025-11-27 2025-12-25
+        2026-01-01 2026-01-19 2026-02-16 2026-04-03 2026-05-25 2026-06-19 2026-07-03 2026-09-07
+        2026-11-26 2026-12-25
+        2027-01-01 2027-01-18 2027-02-15 2027-03-26 2027-05-31 2027-06-18 2027-07-05 2027-09-06
+        2027-11-25 2027-12-24
+    """,
+}
+# 일찍 끝나는 날: 날짜 → 폐장 시각
+EARLY_CLOSES = {
+    "US": {
+        "2025-07-03": dtime(13, 0), "2025-11-28": dtime(13, 0), "2025-12-24": dtime(13, 0),
+        "2026-11-27": dtime(13, 0), "2026-12-24": dtime(13, 0),
+        "2027-11-26": dtime(13, 0),
+    },
+}
+
+
+def _load_holidays() -> dict:
+    holidays = {m: {date.fromisoformat(d) for d in text.split()} for m, text in HOLIDAYS.items()}
+    if HOLIDAYS_FILE:
+        try:
+            with open(HOLIDAYS_FILE, "r", encoding="utf-8") as f:
+                for market, days in json.load(f).items():
+                    holidays.setdefault(market, set()).update(date.fromisoformat(d) for d in days)
+        except (OSError, ValueError, AttributeError):
+            logger.warning("Could not read market holidays from %s", HOLIDAYS_FILE, exc_info=True)
+    return holidays
+
+
+_holidays = _load_holidays()
+_early = {m: {date.fromisoformat(d): t for d, t in days.items()} for m, days in EARLY_CLOSES.items()}
+
+
+def market_of(ticker: str, crypto_tickers=()) -> str:
+    """티커가 거래되는 시장 이름."""
+    if ticker in crypto_tickers:
+        return ALWAYS_OPEN
+    if ticker.endswith("=X"):
+        return FX
+    return "KRX" if is_krx_ticker(ticker) else "US"
+
+
+def is_trading_day(market: str, day: date) -> bool:
+    return day.weekday() < 5 and day not in _holidays.get(market, ())
+
+
+def session(market: str, day: date):
+    """그날 정규장의 (개장, 폐장) 시각 (시간대 포함). 쉬는 날이면 None."""
+    if market not in SESSIONS or not is_trading_day(market, day):
+        return None
+    tz, open_at, close_at = SESSIONS[market]
+    close_at = _early.get(market, {}).get(day, close_at)
+    return datetime.combine(day, open_at, tz), datetime.combine(day, close_at, tz)
+
+
+def _now(now: datetime = None) -> datetime:
+    return now or datetime.now(timezone.utc)
+
+
+def _fx_is_open(local: datetime) -> bool:
+    weekday = local.weekday()
+    if weekday == 5:
+        return False
+    if weekday == 4:
+        return local.time() < _FX_CUTOFF
+    if weekday == 6:
+        return local.time() >= _FX_CUTOFF
+    return True
+
+
+def is_open(market: str, now: datetime = None) -> bool:
+    """market이 지금 거래 중인지 (휴장일 / 조기 폐장 반영)."""
+    now = _now(now)
+    if market == FX:
+        return _fx_is_open(now.astimezone(_FX_TZ))
+    if market not in SESSIONS:
+        return True
+    bounds = session(market, now.astimezone(SESSIONS[market][0]).date())
+    return bounds is not None and bounds[0] <= now < bounds[1]
+
+
+def last_close(market: str, now: datetime = None):
+    """now 이전에 가장 최근에 끝난 장의 폐장 시각. 항상 열려 있는 시장이면 None."""
+    now = _now(now)
+    if market == FX:
+        local = now.astimezone(_FX_TZ)
+        friday = local.date() - timedelta(days=(local.weekday() - 4) % 7)
+        close_at = datetime.combine(friday, _FX_CUTOFF, _FX_TZ)
+        return close_at if close_at <= now else close_at - timedelta(days=7)
+    if market not in SESSIONS:
+        return None
+    day = now.astimezone(SESSIONS[market][0]).date()
+    for _ in range(15):
+        bounds = session(market, day)
+        if bounds is not None and bounds[1] <= now:
+            return bounds[1]
+        day -= timedelta(days=1)
+    return None
+
+
+def next_open(market: str, now: datetime = None):
+    """now 이후 처음 열리는 장의 개장 시각 (지금 열려 있으면 now). 항상 열려 있는 시장이면 now."""
+    now = _now(now)
+    if market == FX:
+        if _fx_is_open(now.astimezone(_FX_TZ)):
+            return now
+        local = now.astimezone(_FX_TZ)
+        sunday = local.date() + timedelta(days=(6 - local.weekday()) % 7)
+        return datetime.combine(sunday, _FX_CUTOFF, _FX_TZ)
+    if market not in SESSIONS or is_open(market, now):
+        return now
+    day = now.astimezone(SESSIONS[market][0]).date()
+    for _ in range(15):
+        bounds = session(market, day)
+        if bounds is not None and bounds[0] > now:
+            return bounds[0]
+        day += timedelta(days=1)
+    return now + timedelta(days=1)
+
+
+def any_open(markets, now: datetime = None) -> bool:
+    return any(is_open(m, now) for m in markets)
@@ -2,7 +2,12 @@
 
 import streamlit as st
 import pandas as pd
-from utils import load_assets, save_assets
+from utils import load_assets
+from profiling import profiled_run
+from fragments import commit_and_refresh, load_for_change, show_flash
+from portfolio import Portfolio
+from liquid import (add_new_account_with_tags, adjust_account_balance, delete_account, deposit_to_account,
+                    get_account_list, transfer_between_accounts, withdraw_from_account)
 
 def main():
     # 간단한 CSS 삽입: 특정 요소 사이 간격을 조정
@@ -32,6 +37,7 @@ def main():
 
     # 1) Load data
     assets = load_assets()  # 예: "assets.json"
+    portfolio = Portfolio(assets)  # 이름 → 계좌 인덱스
     liquid_assets = assets.get("liquid_assets", {})
     
     checking_data = liquid_assets.get("checking_account", {})
@@ -111,280 +117,172 @@ def main():
 
     # 6) Tabs for Deposit, Withdraw, Transfer, Add, Delete, Adjust
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Deposit", "Withdraw", "Transfer", "Add New Account", "Delete Existing Account", "Adjust"])
-
-    # (A) Deposit
+    # 탭마다 따로 다시 실행되는 fragment. 변경이 성공하면 commit_and_refresh가 전체를 다시 실행한다.
     with tab1:
-        st.write("Deposit money into one of the existing accounts.")
-        deposit_account_type = st.selectbox("Account Type", ["Checking", "Savings", "Installment"], key="dep_type")
-        account_list = get_account_list(assets, deposit_account_type)
-        deposit_account_name = st.selectbox("Select an account", account_list, key="dep_name")
-        deposit_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="dep_amt")
-
-        if st.button("Deposit"):
-            if deposit_amount > 0 and deposit_account_name:
-                success = deposit_to_account(assets, deposit_account_type, deposit_account_name, deposit_amount)
-                if success is True:
-                    save_assets(assets)
-                    st.success(f"Deposited ₩ {deposit_amount:,} to [{deposit_account_name}].")
-                else:
-                    st.error("Deposit failed. Account not found?")
-            else:
-                st.warning("Please enter a valid amount and select an account.")
-
-    # (B) Withdraw
+        deposit_tab(portfolio)
     with tab2:
-        st.write("Withdraw money from an existing account.")
-        withdraw_account_type = st.selectbox("Account Type", ["Checking", "Savings", "Installment"], key="wd_type")
-        wd_account_list = get_account_list(assets, withdraw_account_type)
-        withdraw_account_name = st.selectbox("Select an account", wd_account_list, key="wd_name")
-        withdraw_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="wd_amt")
-
-        if st.button("Withdraw"):
-            if withdraw_amount > 0 and withdraw_account_name:
-                result = withdraw_from_account(assets, withdraw_account_type, withdraw_account_name, withdraw_amount)
-                if result == "ok":
-                    save_assets(assets)
-                    st.success(f"Withdrew ₩ {withdraw_amount:,} from [{withdraw_account_name}].")
-                elif result == "insufficient":
-                    st.error("Withdrawal failed: amount exceeds balance. 금액을 다시 확인해주세요.")
-                else:
-                    st.error("Withdrawal failed. Account not found?")
-            else:
-                st.warning("Please enter a valid amount and select an account.")
-
-    # (C) Transfer
+        withdraw_tab(portfolio)
     with tab3:
-        st.write("Transfer money between accounts.")
-        col_from, col_to = st.columns(2)
-        with col_from:
-            from_type = st.selectbox("From Account Type", ["Checking", "Savings", "Installment"], key="tf_from_type")
-            from_list = get_account_list(assets, from_type)
-            from_name = st.selectbox("From Account", from_list, key="tf_from_name")
-        with col_to:
-            to_type = st.selectbox("To Account Type", ["Checking", "Savings", "Installment"], key="tf_to_type")
-            to_list = get_account_list(assets, to_type)
-            to_name = st.selectbox("To Account", to_list, key="tf_to_name")
-
-        transfer_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="tf_amt")
-
-        if st.button("Transfer"):
-            if transfer_amount > 0 and from_name and to_name:
-                if from_type == to_type and from_name == to_name:
-                    st.error("Cannot transfer to the same account.")
-                else:
-                    result = transfer_between_accounts(assets, from_type, from_name, to_type, to_name, transfer_amount)
-                    if result == "ok":
-                        save_assets(assets)
-                        st.success(f"Transferred ₩ {transfer_amount:,} from [{from_name}] to [{to_name}].")
-                    elif result == "insufficient":
-                        st.error("Transfer failed: amount exceeds balance. 금액을 다시 확인해주세요.")
-                    else:
-                        st.error("Transfer failed. Possibly account not found?")
-            else:
-                st.warning("Please enter a valid amount and select valid accounts.")
-
-    # (D) Add new account
+        transfer_tab(portfolio)
     with tab4:
-        st.write("Add a new account under Checking / Savings / Installment.")
-        new_type = st.selectbox("New Account Type", ["Checking", "Savings", "Installment"], key="new_type")
-        new_name = st.text_input("Account/Bank Name", key="new_name")
-        new_balance = st.number_input("Initial Balance (KRW)", min_value=0, step=1000, key="new_balance")
-
-        # ▼▼▼ 추가된 부분: Tags 선택 multiselect ▼▼▼
-        possible_tags = [
-            "#Checking Account",
-            "#Receivables and Deposits",
-            "#Safe Assets",
-            "#Investment Assets"
-        ]
-        selected_tags = st.multiselect("Select tags (optional)", possible_tags, key="new_tags")
-        # ▲▲▲
-
-        if st.button("Add New Account"):
-            if new_name.strip():
-                created_name = add_new_account_with_tags(assets, new_type, new_name, new_balance, selected_tags)
-                if created_name:  # 반환값이 최종 생성된 계좌명
-                    save_assets(assets)
-                    st.success(f"New account [{created_name}] added with ₩ {new_balance:,}, Tags={selected_tags}.")
-                else:
-                    st.error("Failed to add new account.")
-            else:
-                st.warning("Please enter a valid account/bank name.")
-
-    # (E) Delete account
+        add_account_tab(portfolio)
     with tab5:
-        st.write("Delete an existing account from Checking / Savings / Installment.")
-        del_type = st.selectbox("Account Type to delete", ["Checking", "Savings", "Installment"], key="del_type")
-        del_list = get_account_list(assets, del_type)
-        del_name = st.selectbox("Which account to delete?", del_list, key="del_name")
-
-        if st.button("Delete Account"):
-            if del_name:
-                success = delete_account(assets, del_type, del_name)
-                if success:
-                    save_assets(assets)
-                    st.success(f"Account [{del_name}] has been deleted.")
-                else:
-                    st.error("Delete failed. Account not found?")
-            else:
-                st.warning("No account selected.")
-
-    # (F) Adjust (잔액 직접 설정)
+        delete_account_tab(portfolio)
     with tab6:
-        st.write("Adjust an account's balance to a new specific amount.")
-        adj_type = st.selectbox("Account Type", ["Checking", "Savings", "Installment"], key="adj_type")
-        adj_list = get_account_list(assets, adj_type)
-        adj_name = st.selectbox("Select an account", adj_list, key="adj_name")
-        adj_amount = st.number_input("New Balance (KRW)", min_value=0, step=1000, key="adj_amt")
-
-        if st.button("Adjust Balance"):
-            if adj_name:
-                result = adjust_account_balance(assets, adj_type, adj_name, adj_amount)
-                if result:
-                    save_assets(assets)
-                    st.success(f"Account [{adj_name}] balance has been set to ₩ {adj_amount:,}.")
-                else:
-                    st.error("Failed to adjust balance. Account not found?")
-            else:
-                st.warning("Please select an account to adjust.")
+        adjust_tab(portfolio)
 
 # ------------------------------------------------------------------------------
-# 아래는 로직 함수들
+# FRAGMENTS
 # ------------------------------------------------------------------------------
 
-def get_account_list(assets: dict, acct_type: str):
-    if acct_type == "Checking":
-        return [d["name"] for d in assets["liquid_assets"]["checking_account"]["details"]]
-    elif acct_type == "Savings":
-        return [d["name"] for d in assets["liquid_assets"]["savings_account"]["details"]]
-    elif acct_type == "Installment":
-        return [d["name"] for d in assets["liquid_assets"]["installment_savings"]["details"]]
-    else:
-        return []
-
-def get_category_dict(assets: dict, acct_type: str):
-    if acct_type == "Checking":
-        return assets["liquid_assets"]["checking_account"]
-    elif acct_type == "Savings":
-        return assets["liquid_assets"]["savings_account"]
-    elif acct_type == "Installment":
-        return assets["liquid_assets"]["installment_savings"]
-    return None
-
-def deposit_to_account(assets: dict, acct_type: str, acct_name: str, amount: int):
-    category = get_category_dict(assets, acct_type)
-    if not category:
-        return False
-    for entry in category["details"]:
-        if entry["name"] == acct_name:
-            entry["amount_krw"] += amount
-            category["total_krw"] += amount
-            assets["liquid_assets"]["total_krw"] += amount
-            assets["summary"]["liquid_assets_krw"] += amount
-            assets["summary"]["converted_total_krw"] += amount
-            return True
-    return False
-
-def withdraw_from_account(assets: dict, acct_type: str, acct_name: str, amount: int):
-    category = get_category_dict(assets, acct_type)
-    if not category:
-        return False
-    for entry in category["details"]:
-        if entry["name"] == acct_name:
-            if entry["amount_krw"] < amount:
-                return "insufficient"
-            entry["amount_krw"] -= amount
-            category["total_krw"] -= amount
-            assets["liquid_assets"]["total_krw"] -= amount
-            assets["summary"]["liquid_assets_krw"] -= amount
-            assets["summary"]["converted_total_krw"] -= amount
-            return "ok"
-    return False
-
-def transfer_between_accounts(assets: dict, from_type: str, from_name: str,
-                             to_type: str, to_name: str, amount: int):
-    wd_result = withdraw_from_account(assets, from_type, from_name, amount)
-    if wd_result == "insufficient":
-        return "insufficient"
-    elif wd_result is False:
-        return False
-
-    dp_result = deposit_to_account(assets, to_type, to_name, amount)
-    if not dp_result:
-        return False
-    return "ok"
-
-def add_new_account_with_tags(assets: dict, acct_type: str, acct_name: str, initial_balance: int, tags: list):
-    """
-    계좌를 새로 추가하되, 사용자가 multiselect로 선택한 tags도 함께 저장.
-    """
-    category = get_category_dict(assets, acct_type)
-    if not category:
-        return None
-
-    existing_names = [e["name"] for e in category["details"]]
-    new_name = acct_name.strip()
-    if not new_name:
-        return None
-
-    original_name = new_name
-    counter = 1
-    while new_name in existing_names:
-        new_name = f"{original_name} ({counter})"
-        counter += 1
-
-    # 선택된 태그가 없다면 빈 리스트
-    if not tags:
-        tags = []
-
-    new_entry = {
-        "name": new_name,
-        "amount_krw": initial_balance,
-        "tags": tags
-    }
-    category["details"].append(new_entry)
-
-    # 금액 합계 반영
-    category["total_krw"] += initial_balance
-    assets["liquid_assets"]["total_krw"] += initial_balance
-    assets["summary"]["liquid_assets_krw"] += initial_balance
-    assets["summary"]["converted_total_krw"] += initial_balance
-
-    return new_name
-
-def delete_account(assets: dict, acct_type: str, acct_name: str):
-    category = get_category_dict(assets, acct_type)
-    if not category:
-        return False
-
-    for i, entry in enumerate(category["details"]):
-        if entry["name"] == acct_name:
-            balance = entry["amount_krw"]
-            category["total_krw"] -= balance
-            assets["liquid_assets"]["total_krw"] -= balance
-            assets["summary"]["liquid_assets_krw"] -= balance
-            assets["summary"]["converted_total_krw"] -= balance
-            del category["details"][i]
-            return True
-    return False
-
-def adjust_account_balance(assets: dict, acct_type: str, acct_name: str, new_balance: int):
-    category = get_category_dict(assets, acct_type)
-    if not category:
-        return False
-
-    for entry in category["details"]:
-        if entry["name"] == acct_name:
-            old_balance = entry["amount_krw"]
-            diff = new_balance - old_balance
-            entry["amount_krw"] = new_balance
-
-            category["total_krw"] += diff
-            assets["liquid_assets"]["total_krw"] += diff
-            assets["summary"]["liquid_assets_krw"] += diff
-            assets["summary"]["converted_total_krw"] += diff
-            return True
-    return False
+# (A) Deposit
+@st.fragment
+def deposit_tab(portfolio: Portfolio):
+    st.write("Deposit money into one of the existing accounts.")
+    show_flash("liquid_deposit")
+    deposit_account_type = st.selectbox("Account Type", ["Checking", "Savings", "Installment"], key="dep_type")
+    account_list = get_account_list(portfolio, deposit_account_type)
+    deposit_account_name = st.selectbox("Select an account", account_list, key="dep_name")
+    deposit_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="dep_amt")
+
+    if st.button("Deposit"):
+        assets, portfolio = load_for_change()
+        if deposit_amount > 0 and deposit_account_name:
+            success = deposit_to_account(portfolio, deposit_account_type, deposit_account_name, deposit_amount)
+            if success is True:
+                commit_and_refresh(assets, "liquid_deposit", f"Deposited ₩ {deposit_amount:,} to [{deposit_account_name}].")
+            else:
+                st.error("Deposit failed. Account not found?")
+        else:
+            st.warning("Please enter a valid amount and select an account.")
+
+# (B) Withdraw
+@st.fragment
+def withdraw_tab(portfolio: Portfolio):
+    st.write("Withdraw money from an existing account.")
+    show_flash("liquid_withdraw")
+    withdraw_account_type = st.selectbox("Account Type", ["Checking", "Savings", "Installment"], key="wd_type")
+    wd_account_list = get_account_list(portfolio, withdraw_account_type)
+    withdraw_account_name = st.selectbox("Select an account", wd_account_list, key="wd_name")
+    withdraw_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="wd_amt")
+
+    if st.button("Withdraw"):
+        assets, portfolio = load_for_change()
+        if withdraw_amount > 0 and withdraw_account_name:
+            result = withdraw_from_account(portfolio, withdraw_account_type, withdraw_account_name, withdraw_amount)
+            if result == "ok":
+                commit_and_refresh(assets, "liquid_withdraw", f"Withdrew ₩ {withdraw_amount:,} from [{withdraw_account_name}].")
+            elif result == "insufficient":
+                st.error("Withdrawal failed: amount exceeds balance. 금액을 다시 확인해주세요.")
+            else:
+                st.error("Withdrawal failed. Account not found?")
+        else:
+            st.warning("Please enter a valid amount and select an account.")
+
+# (C) Transfer
+@st.fragment
+def transfer_tab(portfolio: Portfolio):
+    st.write("Transfer money between accounts.")
+    show_flash("liquid_transfer")
+    col_from, col_to = st.columns(2)
+    with col_from:
+        from_type = st.selectbox("From Account Type", ["Checking", "Savings", "Installment"], key="tf_from_type")
+        from_list = get_account_list(portfolio, from_type)
+        from_name = st.selectbox("From Account", from_list, key="tf_from_name")
+    with col_to:
+        to_type = st.selectbox("To Account Type", ["Checking", "Savings", "Installment"], key="tf_to_type")
+        to_list = get_account_list(portfolio, to_type)
+        to_name = st.selectbox("To Account", to_list, key="tf_to_name")
+
+    transfer_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="tf_amt")
+
+    if st.button("Transfer"):
+        assets, portfolio = load_for_change()
+        if transfer_amount > 0 and from_name and to_name:
+            if from_type == to_type and from_name == to_name:
+                st.error("Cannot transfer to the same account.")
+            else:
+                result = transfer_between_accounts(portfolio, from_type, from_name, to_type, to_name, transfer_amount)
+                if result == "ok":
+                    commit_and_refresh(assets, "liquid_transfer", f"Transferred ₩ {transfer_amount:,} from [{from_name}] to [{to_name}].")
+                elif result == "insufficient":
+                    st.error("Transfer failed: amount exceeds balance. 금액을 다시 확인해주세요.")
+                else:
+                    st.error("Transfer failed. Possibly account not found?")
+        else:
+            st.warning("Please enter a valid amount and select valid accounts.")
+
+# (D) Add new account
+@st.fragment
+def add_account_tab(portfolio: Portfolio):
+    st.write("Add a new account under Checking / Savings / Installment.")
+    show_flash("liquid_add_account")
+    new_type = st.selectbox("New Account Type", ["Checking", "Savings", "Installment"], key="new_type")
+    new_name = st.text_input("Account/Bank Name", key="new_name")
+    new_balance = st.number_input("Initial Balance (KRW)", min_value=0, step=1000, key="new_balance")
+
+    # ▼▼▼ 추가된 부분: Tags 선택 multiselect ▼▼▼
+    possible_tags = [
+        "#Checking Account",
+        "#Receivables and Deposits",
+        "#Safe Assets",
+        "#Investment Assets"
+    ]
+    selected_tags = st.multiselect("Select tags (optional)", possible_tags, key="new_tags")
+    # ▲▲▲
+
+    if st.button("Add New Account"):
+        assets, portfolio = load_for_change()
+        if new_name.strip():
+            created_name = add_new_account_with_tags(portfolio, new_type, new_name, new_balance, selected_tags)
+            if created_name:  # 반환값이 최종 생성된 계좌명
+                commit_and_refresh(assets, "liquid_add_account", f"New account [{created_name}] added with ₩ {new_balance:,}, Tags={selected_tags}.")
+            else:
+                st.error("Failed to add new account.")
+        else:
+            st.warning("Please enter a valid account/bank name.")
+
+# (E) Delete account
+@st.fragment
+def delete_account_tab(portfolio: Portfolio):
+    st.write("Delete an existing account from Checking / Savings / Installment.")
+    show_flash("liquid_delete_account")
+    del_type = st.selectbox("Account Type to delete", ["Checking", "Savings", "Installment"], key="del_type")
+    del_list = get_account_list(portfolio, del_type)
+    del_name = st.selectbox("Which account to delete?", del_list, key="del_name")
+
+    if st.button("Delete Account"):
+        assets, portfolio = load_for_change()
+        if del_name:
+            success = delete_account(portfolio, del_type, del_name)
+            if success:
+                commit_and_refresh(assets, "liquid_delete_account", f"Account [{del_name}] has been deleted.")
+            else:
+                st.error("Delete failed. Account not found?")
+        else:
+            st.warning("No account selected.")
+
+# (F) Adjust (잔액 직접 설정)
+@st.fragment
+def adjust_tab(portfolio: Portfolio):
+    st.write("Adjust an account's balance to a new specific amount.")
+    show_flash("liquid_adjust")
+    adj_type = st.selectbox("Account Type", ["Checking", "Savings", "Installment"], key="adj_type")
+    adj_list = get_account_list(portfolio, adj_type)
+    adj_name = st.selectbox("Select an account", adj_list, key="adj_name")
+    adj_amount = st.number_input("New Balance (KRW)", min_value=0, step=1000, key="adj_amt")
+
+    if st.button("Adjust Balance"):
+        assets, portfolio = load_for_change()
+        if adj_name:
+            result = adjust_account_balance(portfolio, adj_type, adj_name, adj_amount)
+            if result:
+                commit_and_refresh(assets, "liquid_adjust", f"Account [{adj_name}] balance has been set to ₩ {adj_amount:,}.")
+            else:
+                st.error("Failed to adjust balance. Account not found?")
+        else:
+            st.warning("Please select an account to adjust.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with profiled_run("Liquid Assets"):
+        main()
@@ -2,7 +2,11 @@
 
 import streamlit as st
 import pandas as pd
-from utils import load_assets, save_assets
+from utils import load_assets
+from profiling import profiled_run
+from fragments import commit_and_refresh, load_for_change, show_flash
+from portfolio import Portfolio
+from receivables import get_rd_list, rd_adjust, rd_delete, rd_loan_out, rd_withdraw
 
 def main():
     # 간단한 CSS로 간격/디자인 조정
@@ -26,6 +30,7 @@ def main():
 
     # 1) 데이터 로드
     assets = load_assets()  
+    portfolio = Portfolio(assets)  # 이름 → 항목 인덱스
     r_d = assets.get("receivables_and_deposits", {})
     
     receivables_data = r_d.get("receivables", {})
@@ -87,224 +92,120 @@ def main():
 
     # 5) Tabs: Loan out, Repaying, Settlement, Adjust
     tab1, tab2, tab3, tab4 = st.tabs(["Loan out", "Repaying", "Settlement", "Adjust"])
-
-    # (A) Loan out (기존 Deposit + AddNew 통합)
+    # 탭마다 따로 다시 실행되는 fragment. 변경이 성공하면 commit_and_refresh가 전체를 다시 실행한다.
     with tab1:
-        st.write("Loan out money to Receivables or Deposits. If the name already exists, add to existing balance; otherwise create a new entry.")
-
-        loan_type = st.selectbox("Type", ["Receivables", "Deposits"], key="rd_loan_type")
-        loan_name = st.text_input("Counterparty / Contract Name", key="rd_loan_name")
-        loan_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="rd_loan_amt")
-
-        # ▼▼▼ 추가: Tags 멀티셀렉트 ▼▼▼
-        possible_tags = [
-            "#Checking Account",
-            "#Receivables and Deposits",
-            "#Safe Assets",
-            "#Investment Assets"
-        ]
-        selected_tags = st.multiselect("Select tags (only if creating new)", possible_tags, key="rd_loan_tags")
-        # ▲▲▲
-
-        if st.button("Loan out"):
-            if loan_amount > 0 and loan_name.strip():
-                # rd_loan_out에 tags도 인자로 넘김
-                success_name = rd_loan_out(assets, loan_type, loan_name.strip(), loan_amount, selected_tags)
-                if success_name:
-                    save_assets(assets)
-                    if success_name == loan_name.strip():
-                        st.success(f"Loaned out ₩ {loan_amount:,} to **existing** [{success_name}]. Tags ignored for existing entry.")
-                    else:
-                        st.success(f"Created a new entry [{success_name}] with tags={selected_tags} and loaned out ₩ {loan_amount:,}.")
-                else:
-                    st.error("Loan out failed for unknown reason.")
-            else:
-                st.warning("Please enter a valid name and amount.")
-
-    # (B) Repaying (기존 Withdraw)
+        loan_out_tab(portfolio)
     with tab2:
-        st.write("Repaying: return money from existing Receivables or Deposits.")
-        repay_type = st.selectbox("Type", ["Receivables", "Deposits"], key="rd_repay_type")
-        repay_list = get_rd_list(assets, repay_type)
-        repay_name = st.selectbox("Select a target", repay_list, key="rd_repay_name")
-        repay_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="rd_repay_amt")
-
-        if st.button("Repaying"):
-            if repay_amount > 0 and repay_name:
-                result = rd_withdraw(assets, repay_type, repay_name, repay_amount)
-                if result == "ok":
-                    save_assets(assets)
-                    st.success(f"Repaying ₩ {repay_amount:,} from [{repay_name}].")
-                elif result == "insufficient":
-                    st.error("Repaying failed: amount exceeds balance. 금액을 다시 확인해주세요.")
-                else:
-                    st.error("Repaying failed. Target not found?")
-            else:
-                st.warning("Please select a target and enter amount.")
-
-    # (C) Settlement (기존 Delete)
+        repay_tab(portfolio)
     with tab3:
-        st.write("Settlement: remove an existing entry from Receivables or Deposits completely.")
-        settle_type = st.selectbox("Type", ["Receivables", "Deposits"], key="rd_settle_type")
-        settle_list = get_rd_list(assets, settle_type)
-        settle_name = st.selectbox("Which to settle?", settle_list, key="rd_settle_name")
-
-        if st.button("Settle"):
-            if settle_name:
-                success = rd_delete(assets, settle_type, settle_name)
-                if success:
-                    save_assets(assets)
-                    st.success(f"Settlement done. [{settle_name}] removed.")
-                else:
-                    st.error("Settlement failed. Target not found?")
-            else:
-                st.warning("No target selected.")
-
-    # (D) Adjust
+        settle_tab(portfolio)
     with tab4:
-        st.write("Adjust a balance directly.")
-        adj_type = st.selectbox("Type to adjust", ["Receivables", "Deposits"], key="rd_adj_type")
-        adj_list = get_rd_list(assets, adj_type)
-        adj_name = st.selectbox("Which entry to adjust?", adj_list, key="rd_adj_name")
-        adj_amount = st.number_input("New Balance (KRW)", min_value=0, step=1000, key="rd_adj_amt")
-
-        if st.button("Adjust"):
-            if adj_name:
-                result = rd_adjust(assets, adj_type, adj_name, adj_amount)
-                if result:
-                    save_assets(assets)
-                    st.success(f"[{adj_name}] balance adjusted to ₩ {adj_amount:,}.")
-                else:
-                    st.error("Adjust failed. Target not found?")
-            else:
-                st.warning("Please select an entry to adjust.")
+        adjust_tab(portfolio)
 
 # ------------------------------------------------------------------------------
-# 아래는 Receivables & Deposits용 로직 함수들 (수정된 rd_loan_out 포함)
+# FRAGMENTS
 # ------------------------------------------------------------------------------
 
-def get_rd_list(assets: dict, rd_type: str):
-    """Return a list of names in 'receivables' or 'deposits'."""
-    r_d = assets.get("receivables_and_deposits", {})
-    if rd_type == "Receivables":
-        return [d["name"] for d in r_d["receivables"]["details"]]
-    else:
-        return [d["name"] for d in r_d["deposits"]["details"]]
-
-def get_rd_category(assets: dict, rd_type: str):
-    """Helper: return the dict for 'receivables' or 'deposits'."""
-    r_d = assets.get("receivables_and_deposits", {})
-    if rd_type == "Receivables":
-        return r_d["receivables"]
-    else:
-        return r_d["deposits"]
-
-def rd_loan_out(assets: dict, rd_type: str, rd_name: str, amount: int, tags: list):
-    """
-    Loan out money:
-    - If rd_name already exists, just add 'amount' to existing balance (ignore 'tags').
-    - If not, create a new entry with that name + the provided 'tags' (if any).
-      If the same name is also taken, attach (1), (2), etc. until unique.
-    Return the final name if success, or None if fail.
-    """
-    category = get_rd_category(assets, rd_type)
-    if not category:
-        return None
-
-    existing_names = [e["name"] for e in category["details"]]
-
-    if rd_name in existing_names:
-        # 이미 존재 -> 금액만 추가, tags는 무시
-        for entry in category["details"]:
-            if entry["name"] == rd_name:
-                entry["amount_krw"] += amount
-                category["total_krw"] += amount
-                assets["receivables_and_deposits"]["total_krw"] += amount
-                assets["summary"]["receivables_and_deposits_krw"] += amount
-                assets["summary"]["converted_total_krw"] += amount
-                return rd_name  # same name
-    else:
-        # 새 항목 -> tags 반영
-        new_name = rd_name
-        original = new_name
-        counter = 1
-        while new_name in existing_names:
-            new_name = f"{original} ({counter})"
-            counter += 1
-
-        new_entry = {
-            "name": new_name,
-            "amount_krw": amount,
-            "tags": tags if tags else []
-        }
-        category["details"].append(new_entry)
-        category["total_krw"] += amount
-        assets["receivables_and_deposits"]["total_krw"] += amount
-        assets["summary"]["receivables_and_deposits_krw"] += amount
-        assets["summary"]["converted_total_krw"] += amount
-
-        return new_name
-
-    return None
-
-def rd_withdraw(assets: dict, rd_type: str, rd_name: str, amount: int):
-    """
-    Repaying: subtract amount from existing. 
-    return "ok" | "insufficient" | False
-    """
-    category = get_rd_category(assets, rd_type)
-    if not category:
-        return False
-    for entry in category["details"]:
-        if entry["name"] == rd_name:
-            if entry["amount_krw"] < amount:
-                return "insufficient"
-            entry["amount_krw"] -= amount
-            category["total_krw"] -= amount
-            assets["receivables_and_deposits"]["total_krw"] -= amount
-            assets["summary"]["receivables_and_deposits_krw"] -= amount
-            assets["summary"]["converted_total_krw"] -= amount
-            return "ok"
-    return False
-
-def rd_delete(assets: dict, rd_type: str, rd_name: str):
-    """
-    Settlement: remove the entry entirely.
-    Return True if success, False if not found.
-    """
-    category = get_rd_category(assets, rd_type)
-    if not category:
-        return False
-    for i, entry in enumerate(category["details"]):
-        if entry["name"] == rd_name:
-            balance = entry["amount_krw"]
-            category["total_krw"] -= balance
-            assets["receivables_and_deposits"]["total_krw"] -= balance
-            assets["summary"]["receivables_and_deposits_krw"] -= balance
-            assets["summary"]["converted_total_krw"] -= balance
-            del category["details"][i]
-            return True
-    return False
-
-def rd_adjust(assets: dict, rd_type: str, rd_name: str, new_balance: int):
-    """
-    Adjust the entry to new_balance directly.
-    Return True if success, False if not found.
-    """
-    category = get_rd_category(assets, rd_type)
-    if not category:
-        return False
-    for entry in category["details"]:
-        if entry["name"] == rd_name:
-            old_balance = entry["amount_krw"]
-            diff = new_balance - old_balance
-            entry["amount_krw"] = new_balance
-            category["total_krw"] += diff
-            assets["receivables_and_deposits"]["total_krw"] += diff
-            assets["summary"]["receivables_and_deposits_krw"] += diff
-            assets["summary"]["converted_total_krw"] += diff
-            return True
-    return False
+# (A) Loan out (기존 Deposit + AddNew 통합)
+@st.fragment
+def loan_out_tab(portfolio: Portfolio):
+    st.write("Loan out money to Receivables or Deposits. If the name already exists, add to existing balance; otherwise create a new entry.")
+    show_flash("rd_loan_out")
+
+    loan_type = st.selectbox("Type", ["Receivables", "Deposits"], key="rd_loan_type")
+    loan_name = st.text_input("Counterparty / Contract Name", key="rd_loan_name")
+    loan_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="rd_loan_amt")
+
+    # ▼▼▼ 추가: Tags 멀티셀렉트 ▼▼▼
+    possible_tags = [
+        "#Checking Account",
+        "#Receivables and Deposits",
+        "#Safe Assets",
+        "#Investment Assets"
+    ]
+    selected_tags = st.multiselect("Select tags (only if creating new)", possible_tags, key="rd_loan_tags")
+    # ▲▲▲
+
+    if st.button("Loan out"):
+        assets, portfolio = load_for_change()
+        if loan_amount > 0 and loan_name.strip():
+            # rd_loan_out에 tags도 인자로 넘김
+            success_name = rd_loan_out(portfolio, loan_type, loan_name.strip(), loan_amount, selected_tags)
+            if success_name:
+                if success_name == loan_name.strip():
+                    message = f"Loaned out ₩ {loan_amount:,} to **existing** [{success_name}]. Tags ignored for existing entry."
+                else:
+                    message = f"Created a new entry [{success_name}] with tags={selected_tags} and loaned out ₩ {loan_amount:,}."
+                commit_and_refresh(assets, "rd_loan_out", message)
+            else:
+                st.error("Loan out failed for unknown reason.")
+        else:
+            st.warning("Please enter a valid name and amount.")
+
+# (B) Repaying (기존 Withdraw)
+@st.fragment
+def repay_tab(portfolio: Portfolio):
+    st.write("Repaying: return money from existing Receivables or Deposits.")
+    show_flash("rd_repay")
+    repay_type = st.selectbox("Type", ["Receivables", "Deposits"], key="rd_repay_type")
+    repay_list = get_rd_list(portfolio, repay_type)
+    repay_name = st.selectbox("Select a target", repay_list, key="rd_repay_name")
+    repay_amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="rd_repay_amt")
+
+    if st.button("Repaying"):
+        assets, portfolio = load_for_change()
+        if repay_amount > 0 and repay_name:
+            result = rd_withdraw(portfolio, repay_type, repay_name, repay_amount)
+            if result == "ok":
+                commit_and_refresh(assets, "rd_repay", f"Repaying ₩ {repay_amount:,} from [{repay_name}].")
+            elif result == "insufficient":
+                st.error("Repaying failed: amount exceeds balance. 금액을 다시 확인해주세요.")
+            else:
+                st.error("Repaying failed. Target not found?")
+        else:
+            st.warning("Please select a target and enter amount.")
+
+# (C) Settlement (기존 Delete)
+@st.fragment
+def settle_tab(portfolio: Portfolio):
+    st.write("Settlement: remove an existing entry from Receivables or Deposits completely.")
+    show_flash("rd_settle")
+    settle_type = st.selectbox("Type", ["Receivables", "Deposits"], key="rd_settle_type")
+    settle_list = get_rd_list(portfolio, settle_type)
+    settle_name = st.selectbox("Which to settle?", settle_list, key="rd_settle_name")
+
+    if st.button("Settle"):
+        assets, portfolio = load_for_change()
+        if settle_name:
+            success = rd_delete(portfolio, settle_type, settle_name)
+            if success:
+                commit_and_refresh(assets, "rd_settle", f"Settlement done. [{settle_name}] removed.")
+            else:
+                st.error("Settlement failed. Target not found?")
+        else:
+            st.warning("No target selected.")
+
+# (D) Adjust
+@st.fragment
+def adjust_tab(portfolio: Portfolio):
+    st.write("Adjust a balance directly.")
+    show_flash("rd_adjust")
+    adj_type = st.selectbox("Type to adjust", ["Receivables", "Deposits"], key="rd_adj_type")
+    adj_list = get_rd_list(portfolio, adj_type)
+    adj_name = st.selectbox("Which entry to adjust?", adj_list, key="rd_adj_name")
+    adj_amount = st.number_input("New Balance (KRW)", min_value=0, step=1000, key="rd_adj_amt")
+
+    if st.button("Adjust"):
+        assets, portfolio = load_for_change()
+        if adj_name:
+            result = rd_adjust(portfolio, adj_type, adj_name, adj_amount)
+            if result:
+                commit_and_refresh(assets, "rd_adjust", f"[{adj_name}] balance adjusted to ₩ {adj_amount:,}.")
+            else:
+                st.error("Adjust failed. Target not found?")
+        else:
+            st.warning("Please select an entry to adjust.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with profiled_run("Receivables and Deposits"):
+        main()
@@ -1,9 +1,13 @@
 # pages/4_Cryptocurrency.py
 
 import streamlit as st
-import pandas as pd
 
-from utils import load_assets, save_assets
+from utils import load_assets, save_from_page
+from profiling import profiled_run
+from fx import get_usd_krw_rate
+from quotes import delayed_tickers
+from crypto import iter_exchanges, sync_crypto_total, sync_valuation, value_crypto
+from refresher import freshness_text, start_refresher
 
 def main():
     st.title("Cryptocurrency")
@@ -11,32 +15,51 @@ def main():
     # 1) Load crypto data from JSON
     assets = load_assets()
     crypto_data = assets.get("cryptocurrency", {})
-    
-    # 2) Get total_usd (optional, if you want an overall sum)
-    total_usd = crypto_data.get("total_usd", 0.0)
+
+    # 2) 모든 거래소의 코인을 한 번의 시세 조회로 평가 (백그라운드 갱신기가 채운 캐시)
+    start_refresher()
+    exch_rate = get_usd_krw_rate()
+    # 평가액은 화면용. 저장된 total_usd는 거래소를 지울 때만 고치고, Home은 자체 평가로 합계를 맞춘다
+    valuation = value_crypto(crypto_data, exch_rate)
 
     # 3) Summary
     st.subheader("Summary of Cryptocurrency")
-    st.metric("Total Crypto (USD)", f"${total_usd:,.2f}")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Crypto (USD)", f"${valuation['total_usd']:,.2f}")
+    with col2:
+        st.metric("Total Crypto (KRW)", f"₩ {valuation['total_krw']:,.0f}")
+    st.caption(f"USD/KRW {exch_rate:,.2f} · {freshness_text()}")
+
+    stale_symbols, unavailable_symbols = delayed_tickers(valuation["status"])
+    if stale_symbols:
+        st.caption(f"Showing last known prices for: {', '.join(stale_symbols)}")
+    if unavailable_symbols:
+        st.caption(f"Prices unavailable (valued at 0): {', '.join(unavailable_symbols)}")
 
     st.write("---")
 
     # 4) Display each Exchange as an expander
-    for exchange_name, data_or_list in crypto_data.items():
-        if exchange_name == "total_usd":
-            continue  # skip
-        if not isinstance(data_or_list, list):
-            continue  # skip anything that's not a list
+    positions = valuation["positions"]
+    for exchange_name, coins in iter_exchanges(crypto_data):
+        totals = valuation["exchanges"][exchange_name]
         st.markdown(f"### {exchange_name}")
+        st.write(f"**Exchange Total**: $ {totals['usd']:,.2f} / ₩ {totals['krw']:,.0f}")
         with st.expander(f"{exchange_name} Details", expanded=False):
-            if not data_or_list:
+            if not coins:
                 st.write("No coins in this exchange yet.")
             else:
-                df = pd.DataFrame(data_or_list)
-                if df.empty:
-                    st.write("Empty details.")
-                else:
-                    st.dataframe(df, use_container_width=True)
+                df = positions[positions["exchange"] == exchange_name].drop(columns="exchange")
+                st.dataframe(
+                    df.reset_index(drop=True),
+                    use_container_width=True,
+                    column_config={
+                        "quantity": st.column_config.NumberColumn("Quantity", format="%g"),
+                        "price_usd": st.column_config.NumberColumn("USD Price", format="%.2f"),
+                        "value_usd": st.column_config.NumberColumn("USD Value", format="%.2f"),
+                        "value_krw": st.column_config.NumberColumn("KRW Value", format="%.0f"),
+                    },
+                )
 
     st.write("---")
     st.subheader("Operations")
@@ -55,8 +78,8 @@ def main():
                     st.warning(f"Exchange '{name_stripped}' already exists.")
                 else:
                     crypto_data[name_stripped] = []
-                    save_assets(assets)
-                    st.success(f"Exchange '{name_stripped}' created!")
+                    if save_from_page(assets):
+                        st.success(f"Exchange '{name_stripped}' created!")
             else:
                 st.warning("Please enter a valid exchange name.")
 
@@ -68,13 +91,22 @@ def main():
             del_exch_name = st.selectbox("Select an Exchange to delete", existing_exchanges, key="del_exchange_name")
             if st.button("Delete Exchange"):
                 if del_exch_name in crypto_data:
+                    had_coins = bool((positions["exchange"] == del_exch_name).any())
                     del crypto_data[del_exch_name]
-                    save_assets(assets)
-                    st.success(f"Exchange '{del_exch_name}' has been deleted.")
+                    # 지운 거래소의 평가액을 합계에서 뺌 (시세는 캐시에 있으므로 다시 받지 않음)
+                    remaining = value_crypto(crypto_data, exch_rate)
+                    if remaining["positions"].empty:
+                        if had_coins:
+                            sync_crypto_total(assets, 0.0)
+                    else:
+                        sync_valuation(assets, remaining)
+                    if save_from_page(assets):
+                        st.success(f"Exchange '{del_exch_name}' has been deleted.")
                 else:
                     st.error("Exchange not found? Possibly already deleted.")
         else:
             st.info("No exchanges to delete.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with profiled_run("Cryptocurrency"):
+        main()
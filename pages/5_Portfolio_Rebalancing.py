@@ -0,0 +1,120 @@
+# pages/5_Portfolio_Rebalancing.py
+
+import time
+
+import streamlit as st
+
+from utils import load_assets, save_from_page
+from profiling import profiled_run
+from fx import get_usd_krw_rate
+from quotes import fetch_stock_prices
+from crypto import value_crypto
+from refresher import freshness_text, start_refresher
+from rebalance import DEFAULT_LOTS, allocation, flatten_positions, propose_actions
+
+def main():
+    st.title("Portfolio Rebalancing")
+
+    # 1) Load data + 가격 (주식/코인 모두 공유 캐시에서)
+    assets = load_assets()
+    start_refresher()
+    exch_rate = get_usd_krw_rate()
+    prices, _ = fetch_stock_prices(assets.get("stocks", {}))
+    crypto_positions = value_crypto(assets.get("cryptocurrency", {}), exch_rate)["positions"]
+    positions = flatten_positions(assets, prices, exch_rate, crypto_positions)
+
+    if positions.empty:
+        st.info("No assets to rebalance yet.")
+        return
+
+    # 2) 현재 비중
+    st.subheader("Current Allocation by Tag")
+    current = allocation(positions)
+    st.dataframe(
+        current[["current_krw", "current_weight"]].reset_index(),
+        use_container_width=True,
+        column_config={
+            "tag": "Tag",
+            "current_krw": st.column_config.NumberColumn("Value (KRW)", format="%.0f"),
+            "current_weight": st.column_config.NumberColumn("Weight", format="percent"),
+        },
+    )
+
+    # 3) 목표 비중 입력 (저장해 둔 값이 있으면 그것, 없으면 현재 비중)
+    st.subheader("Target Weights")
+    possible_tags = [
+        "#Checking Account",
+        "#Receivables and Deposits",
+        "#Safe Assets",
+        "#Investment Assets"
+    ]
+    saved_targets = assets.get("rebalancing", {}).get("targets", {})
+    all_tags = list(dict.fromkeys(possible_tags + list(current.index) + list(saved_targets)))
+
+    targets = {}
+    cols = st.columns(2)
+    for i, tag in enumerate(all_tags):
+        default = saved_targets.get(tag, current["current_weight"].get(tag, 0.0))
+        with cols[i % 2]:
+            targets[tag] = st.number_input(f"{tag} (%)", min_value=0.0, max_value=100.0,
+                                           value=round(float(default) * 100, 1), step=1.0,
+                                           key=f"target_{tag}") / 100
+    target_sum = sum(targets.values())
+    if abs(target_sum - 1.0) > 1e-6:
+        st.warning(f"Targets add up to {target_sum * 100:.1f}%. They will be scaled to 100%.")
+
+    with st.expander("Options", expanded=False):
+        tolerance = st.number_input("Ignore drift below (%)", min_value=0.0, max_value=50.0,
+                                    value=1.0, step=0.5, key="rb_tolerance") / 100
+        stock_lot = st.number_input("Stock lot size (shares)", min_value=0.0001, format="%g",
+                                    value=DEFAULT_LOTS["stock"], key="rb_stock_lot")
+        crypto_lot = st.number_input("Crypto lot size (coins)", min_value=0.00000001, format="%g",
+                                     value=DEFAULT_LOTS["crypto"], key="rb_crypto_lot")
+        cash_lot = st.number_input("Cash transfer unit (KRW)", min_value=1.0, format="%g",
+                                   value=DEFAULT_LOTS["cash"], step=1000.0, key="rb_cash_lot")
+
+    if st.button("Save Targets"):
+        assets.setdefault("rebalancing", {})["targets"] = targets
+        if save_from_page(assets):
+            st.success("Target weights saved.")
+
+    # 4) 제안 거래
+    started = time.perf_counter()
+    actions, table = propose_actions(
+        positions, targets, tolerance=tolerance,
+        lots={"stock": stock_lot, "crypto": crypto_lot, "cash": cash_lot},
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    st.subheader("Drift")
+    st.dataframe(
+        table.reset_index(),
+        use_container_width=True,
+        column_config={
+            "tag": "Tag",
+            "current_krw": st.column_config.NumberColumn("Current (KRW)", format="%.0f"),
+            "current_weight": st.column_config.NumberColumn("Current", format="percent"),
+            "target_weight": st.column_config.NumberColumn("Target", format="percent"),
+            "target_krw": st.column_config.NumberColumn("Target (KRW)", format="%.0f"),
+            "gap_krw": st.column_config.NumberColumn("Gap (KRW)", format="%.0f"),
+        },
+    )
+
+    st.subheader("Proposed Actions")
+    if actions.empty:
+        st.success("Portfolio is within the target range. No actions needed.")
+    else:
+        st.dataframe(
+            actions,
+            use_container_width=True,
+            column_config={
+                "quantity": st.column_config.NumberColumn("Quantity", format="%g"),
+                "amount_krw": st.column_config.NumberColumn("Amount (KRW)", format="%.0f"),
+            },
+        )
+        st.caption("Receivables and deposits are not moved. Buys are funded only by the sells and transfers above.")
+    st.caption(f"{len(positions):,} positions, solved in {elapsed_ms:.1f} ms · {freshness_text()}")
+
+if __name__ == "__main__":
+    with profiled_run("Portfolio Rebalancing"):
+        main()
@@ -0,0 +1,53 @@
+# pages/6_Import.py
+
+import streamlit as st
+import pandas as pd
+from utils import STALE_MESSAGE, StaleAssetsError
+from profiling import profiled_run
+from importer import RowError, import_csv, mappings
+
+TARGET_LABELS = {
+    "stocks": "Stock accounts",
+    "liquid_assets": "Liquid assets",
+    "receivables_and_deposits": "Receivables and deposits",
+}
+
+def main():
+    st.title("Import Statements")
+    st.write("Import broker or bank CSV exports in one go. "
+             "Rows imported before are skipped, and nothing is saved if any row fails.")
+
+    name = st.selectbox("Statement format", list(mappings), key="import_mapping")
+    mapping = mappings[name]
+    st.caption(f"Imports into: {TARGET_LABELS.get(mapping['target'], mapping['target'])}")
+
+    with st.expander("Expected columns", expanded=False):
+        st.dataframe(pd.DataFrame({"field": list(mapping["columns"]),
+                                   "CSV column": list(mapping["columns"].values())}),
+                     hide_index=True, use_container_width=True)
+        if mapping.get("types"):
+            st.write("Transaction types: " + ", ".join(f"{k} → {v}" for k, v in mapping["types"].items()))
+
+    uploaded = st.file_uploader("CSV file", type=["csv"], key="import_file")
+    dry_run = st.checkbox("Dry run (check only, don't save)", key="import_dry_run")
+
+    if uploaded is not None and st.button("Import"):
+        try:
+            stats = import_csv(uploaded, name, dry_run=dry_run)
+        except RowError as e:
+            st.error(f"Import failed, nothing was saved. {e}")
+            return
+        except StaleAssetsError:
+            st.error(STALE_MESSAGE)
+            return
+        except UnicodeDecodeError:
+            st.error(f"Could not decode the file as {mapping.get('encoding', 'utf-8-sig')}.")
+            return
+
+        verb = "Would import" if dry_run else "Imported"
+        st.success(f"{verb} {stats['applied']:,} rows "
+                   f"({stats['duplicates']:,} already imported, {stats['skipped']:,} skipped).")
+
+if __name__ == "__main__":
+    with profiled_run("Import"):
+        main()
@@ -0,0 +1,200 @@
+# pages/7_Staged_Changes.py
+
+import streamlit as st
+import pandas as pd
+from utils import STALE_MESSAGE, StaleAssetsError, load_assets
+from profiling import profiled_run
+from portfolio import SECTION_KEYS, Portfolio
+from batch import OPERATIONS, Batch
+from cost_basis import COST_METHODS
+
+POSSIBLE_TAGS = [
+    "#Checking Account",
+    "#Receivables and Deposits",
+    "#Safe Assets",
+    "#Investment Assets"
+]
+
+def main():
+    st.title("Staged Changes")
+    st.write("Queue many edits, check them together, then save them all at once. "
+             "If any step fails, nothing is saved.")
+
+    # 세션 동안 쌓아 두는 단계 목록 (저장은 Commit 때 한 번)
+    if "staged_batch" not in st.session_state:
+        st.session_state["staged_batch"] = Batch()
+    batch = st.session_state["staged_batch"]
+
+    assets = load_assets()
+    portfolio = Portfolio(assets)
+
+    # 1) 단계 추가
+    st.subheader("Add a step")
+    op = st.selectbox("Operation", list(OPERATIONS), format_func=lambda o: OPERATIONS[o][1], key="stage_op")
+    kwargs = stage_form(portfolio, op)
+    if st.button("Add to batch", key="stage_add"):
+        if kwargs is None:
+            st.warning("Please fill in the fields for this step.")
+        else:
+            batch.add(op, **kwargs)
+            st.success(f"Staged: {Batch.describe(op, kwargs)}")
+
+    st.write("---")
+
+    # 2) 쌓인 단계 / 검증 / 저장
+    st.subheader(f"Staged steps ({len(batch)})")
+    if not len(batch):
+        st.info("Nothing staged yet.")
+        return
+
+    st.dataframe(pd.DataFrame({"#": range(1, len(batch) + 1),
+                               "step": [Batch.describe(o, kw) for o, kw in batch.steps]}),
+                 hide_index=True, use_container_width=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        remove_at = st.number_input("Step #", min_value=1, max_value=len(batch), step=1, key="stage_remove_at")
+    with col2:
+        if st.button("Remove step", key="stage_remove"):
+            batch.remove(int(remove_at) - 1)
+            st.rerun()
+    with col3:
+        if st.button("Validate", key="stage_validate"):
+            show_failures(batch, batch.validate(), "All steps can be applied.")
+    with col4:
+        if st.button("Commit all", type="primary", key="stage_commit"):
+            count = len(batch)
+            try:
+                failures = batch.commit()
+            except StaleAssetsError:
+                st.error(STALE_MESSAGE)
+                return
+            show_failures(batch, failures, f"Saved {count} steps in one write.")
+
+    if st.button("Discard all", key="stage_clear"):
+        batch.clear()
+        st.rerun()
+
+# ------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+# ------------------------------------------------------------------------------
+
+def show_failures(batch: Batch, failures: list, ok_message: str):
+    if not failures:
+        st.success(ok_message)
+        return
+    st.error(f"{len(failures)} step(s) would fail, so nothing was saved:")
+    for index, op, result in failures:
+        reason = result if isinstance(result, str) else "not found"
+        st.write(f"- #{index + 1} {Batch.describe(op, batch.steps[index][1])}: {reason}")
+
+def _entry_pick(portfolio: Portfolio, category: str, label: str, key: str):
+    """(종류, 이름) 고르기. 항목이 없으면 이름은 None."""
+    kind = st.selectbox(f"{label} type", list(SECTION_KEYS[category]), key=f"{key}_type")
+    names = portfolio.entry_names(category, kind)
+    name = st.selectbox(f"{label} name", names, key=f"{key}_name") if names else None
+    return kind, name
+
+def stage_form(portfolio: Portfolio, op: str):
+    """단계 종류별 입력칸. returns 변경 함수 인자 dict (입력이 모자라면 None)"""
+    if op in ("liquid_deposit", "liquid_withdraw", "liquid_adjust"):
+        kind, name = _entry_pick(portfolio, "liquid_assets", "Account", "stage_liq")
+        label = "New balance (KRW)" if op == "liquid_adjust" else "Amount (KRW)"
+        amount = st.number_input(label, min_value=0, step=1000, key="stage_liq_amount")
+        if name is None or (amount <= 0 and op != "liquid_adjust"):
+            return None
+        if op == "liquid_adjust":
+            return {"acct_type": kind, "acct_name": name, "new_balance": amount}
+        return {"acct_type": kind, "acct_name": name, "amount": amount}
+
+    if op == "liquid_transfer":
+        from_type, from_name = _entry_pick(portfolio, "liquid_assets", "From", "stage_from")
+        to_type, to_name = _entry_pick(portfolio, "liquid_assets", "To", "stage_to")
+        amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="stage_tr_amount")
+        if from_name is None or to_name is None or amount <= 0:
+            return None
+        return {"from_type": from_type, "from_name": from_name, "to_type": to_type,
+                "to_name": to_name, "amount": amount}
+
+    if op == "liquid_add_account":
+        kind = st.selectbox("Account type", list(SECTION_KEYS["liquid_assets"]), key="stage_new_type")
+        name = st.text_input("Account name", key="stage_new_name").strip()
+        balance = st.number_input("Initial balance (KRW)", min_value=0, step=1000, key="stage_new_balance")
+        tags = st.multiselect("Tags", POSSIBLE_TAGS, key="stage_new_tags")
+        if not name:
+            return None
+        return {"acct_type": kind, "acct_name": name, "initial_balance": balance, "tags": tags}
+
+    if op == "rd_loan_out":
+        kind = st.selectbox("Type", list(SECTION_KEYS["receivables_and_deposits"]), key="stage_rd_new_type")
+        name = st.text_input("Counterparty / Contract Name", key="stage_rd_new_name").strip()
+        amount = st.number_input("Amount (KRW)", min_value=0, step=1000, key="stage_rd_new_amount")
+        tags = st.multiselect("Tags (only if creating new)", POSSIBLE_TAGS, key="stage_rd_new_tags")
+        if not name or amount <= 0:
+            return None
+        return {"rd_type": kind, "rd_name": name, "amount": amount, "tags": tags}
+
+    if op in ("rd_repay", "rd_adjust"):
+        kind, name = _entry_pick(portfolio, "receivables_and_deposits", "Entry", "stage_rd")
+        label = "New balance (KRW)" if op == "rd_adjust" else "Amount (KRW)"
+        amount = st.number_input(label, min_value=0, step=1000, key="stage_rd_amount")
+        if name is None or (amount <= 0 and op != "rd_adjust"):
+            return None
+        if op == "rd_adjust":
+            return {"rd_type": kind, "rd_name": name, "new_balance": amount}
+        return {"rd_type": kind, "rd_name": name, "amount": amount}
+
+    # 주식 계좌 단계
+    accounts = portfolio.stock_accounts()
+    if not accounts:
+        st.info("No stock accounts available.")
+        return None
+    account = st.selectbox("Stock account", accounts, key="stage_stock_acc")
+
+    if op in ("stock_deposit", "stock_withdraw"):
+        currency = st.selectbox("Currency", ["KRW", "USD"], key="stage_stock_cur")
+        amount = st.number_input("Amount", min_value=0.0, format="%g", step=1000.0, key="stage_stock_amount")
+        if amount <= 0:
+            return None
+        return {"account_name": account, "currency": currency, "amount": amount}
+
+    if op == "stock_exchange":
+        from_cur = st.selectbox("From Currency", ["KRW", "USD"], key="stage_ex_from")
+        to_cur = "KRW" if from_cur == "USD" else "USD"
+        from_amt = st.number_input(f"{from_cur} amount", min_value=0.0, format="%g", step=1000.0, key="stage_ex_from_amt")
+        to_amt = st.number_input(f"Resulting {to_cur} amount", min_value=0.0, format="%g", step=1000.0, key="stage_ex_to_amt")
+        if from_amt <= 0 or to_amt <= 0:
+            return None
+        return {"account_name": account, "from_cur": from_cur, "to_cur": to_cur,
+                "from_amt": from_amt, "to_amt": to_amt}
+
+    if op == "stock_sell":
+        symbols = portfolio.holding_symbols(account)
+        symbol = st.selectbox("Stock", symbols, key="stage_sell_symbol") if symbols else None
+        price = st.number_input("Sell share price", min_value=0.0, format="%g", step=1.0, key="stage_sell_price")
+        quantity = st.number_input("Quantity to sell", min_value=0.0, format="%g", step=1.0, key="stage_sell_qty")
+        if symbol is None or quantity <= 0:
+            return None
+        return {"account_name": account, "symbol": symbol, "quantity": quantity, "price": price}
+
+    # stock_buy: 기존 종목이면 이름만, 새 종목이면 티커 / 통화 / 태그 / 원가 방식까지
+    symbols = portfolio.holding_symbols(account)
+    choice = st.selectbox("Stock", ["[New Stock]"] + symbols, key="stage_buy_symbol")
+    kwargs = {"account_name": account}
+    if choice == "[New Stock]":
+        kwargs["symbol"] = st.text_input("Symbol (name)", key="stage_buy_new_symbol").strip()
+        kwargs["ticker"] = st.text_input("Ticker (e.g. AAPL, 005930.KS)", key="stage_buy_new_ticker").strip()
+        kwargs["currency"] = st.selectbox("Currency", ["KRW", "USD"], key="stage_buy_new_cur")
+        kwargs["tags"] = st.multiselect("Tags", POSSIBLE_TAGS, default=["#Investment Assets"], key="stage_buy_new_tags")
+        kwargs["method"] = st.selectbox("Cost basis method", COST_METHODS, key="stage_buy_new_method")
+    else:
+        kwargs["symbol"] = choice
+    kwargs["price"] = st.number_input("Per share price", min_value=0.0, format="%g", step=1.0, key="stage_buy_price")
+    kwargs["quantity"] = st.number_input("Quantity (shares)", min_value=0.0, format="%g", step=1.0, key="stage_buy_qty")
+    if not kwargs["symbol"] or kwargs["quantity"] <= 0:
+        return None
+    return kwargs
+
+if __name__ == "__main__":
+    with profiled_run("Staged Changes"):
+        main()
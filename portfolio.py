@@ -0,0 +1,239 @@
+# portfolio.py
+"""
+불러온 assets 문서에 이름 인덱스를 붙인 객체.
+
+페이지의 변경 함수들은 목록을 처음부터 훑지 않고 이 인덱스로 계좌/항목/종목/예수금을 찾는다 (O(1)).
+인덱스는 섹션을 처음 쓸 때 한 번 만들고, 항목 추가/삭제도 이 객체를 거쳐야 맞게 유지된다.
+(금액/수량 변경은 항목 dict를 직접 고쳐도 된다)
+"""
+# 페이지에서 고르는 종류 → 문서의 섹션 키
+SECTION_KEYS = {
+    "liquid_assets": {
+        "Checking": "checking_account",
+        "Savings": "savings_account",
+        "Installment": "installment_savings",
+    },
+    "receivables_and_deposits": {
+        "Receivables": "receivables",
+        "Deposits": "deposits",
+    },
+}
+DEPOSIT_ROWS = {"KRW": "원화 예수금", "USD": "달러 예수금"}  # 통화 → 예수금 항목 이름
+DEPOSIT_NAMES = tuple(DEPOSIT_ROWS.values())  # 예수금 항목 이름
+
+
+def is_krx_ticker(ticker: str) -> bool:
+    """한국거래소 종목(.KS / .KQ) 여부."""
+    return ticker.endswith(".KS") or ticker.endswith(".KQ")
+
+
+def is_krw_quoted(currency: str, ticker: str) -> bool:
+    """
+    시세가 원화로 나오는 종목인지 (KRW로 표시하는 .KS/.KQ 종목).
+    나머지는 USD 시세이고, KRW로 표시하는 종목이면 환율을 곱해 원화로 본다.
+    summary.unit_value / valuation / price_history가 모두 이 규칙 하나를 쓴다.
+    """
+    return currency == "KRW" and is_krx_ticker(ticker)
+
+
+def iter_stock_accounts(stocks_data: dict):
+    """stocks 섹션에서 (계좌명, 보유목록) 쌍만 골라서 돌려준다."""
+    for account_name, holdings in stocks_data.items():
+        if account_name in ["total_krw", "total_usd"]:
+            continue
+        if isinstance(holdings, list):
+            yield account_name, holdings
+
+
+class NameIndex:
+    """
+    list 하나에 대한 이름 → 항목 인덱스.
+    이름이 겹치는 항목이 있으면 앞쪽 항목을 돌려준다 (예전 선형 탐색과 같은 결과).
+    """
+
+    def __init__(self, items: list, key):
+        self.items = items
+        self.key = key
+        self.by_name = {}
+        self.counts = {}
+        self.suffix = {}  # 이름 → 다음에 붙여볼 " (n)" 번호
+        for item in items:
+            self.track(item)
+
+    def track(self, item):
+        name = self.key(item)
+        if name is None:
+            return
+        self.by_name.setdefault(name, item)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def names(self) -> list:
+        return list(self.by_name)
+
+    def append(self, item):
+        self.items.append(item)
+        self.track(item)
+
+    def remove(self, item) -> bool:
+        """item(같은 객체)을 list와 인덱스에서 지운다. list 안의 위치를 찾는 데만 O(n)."""
+        for i, x in enumerate(self.items):
+            if x is item:
+                del self.items[i]
+                break
+        else:
+            return False
+        self.forget(item)
+        return True
+
+    def forget(self, item):
+        """이미 list에서 빠진 item을 인덱스에서만 지운다."""
+        name = self.key(item)
+        if name is None:
+            return
+        self.counts[name] -= 1
+        if self.counts[name] == 0:
+            del self.counts[name]
+            del self.by_name[name]
+        elif self.by_name[name] is item:
+            self.by_name[name] = next(x for x in self.items if self.key(x) == name)
+
+    def unique_name(self, name: str) -> str:
+        """이미 있는 이름이면 " (1)", " (2)" ... 를 붙여 겹치지 않는 이름을 만든다."""
+        if name not in self.by_name:
+            return name
+        counter = self.suffix.get(name, 1)
+        candidate = f"{name} ({counter})"
+        while candidate in self.by_name:
+            counter += 1
+            candidate = f"{name} ({counter})"
+        self.suffix[name] = counter
+        return candidate
+
+
+def _symbol_key(item: dict):
+    return None if "name" in item else item.get("symbol")
+
+
+def _ticker_key(item: dict):
+    return None if "name" in item else (item.get("ticker") or None)
+
+
+class Portfolio:
+    """assets 문서(dict)와 그 위의 인덱스. 저장은 그대로 save_assets(portfolio.assets)."""
+
+    def __init__(self, assets: dict):
+        self.assets = assets
+        self._entries = {}   # (category, kind) → NameIndex (name)
+        self._symbols = {}   # account → NameIndex (symbol)
+        self._tickers = {}   # account → NameIndex (ticker)
+        self._deposits = {}  # account → {"KRW": item, "USD": item}
+
+    # --------------------------------------------------------------------------
+    # 입출금/예적금, 채권/보증금 (category → section → details)
+    # --------------------------------------------------------------------------
+
+    def section(self, category: str, kind: str):
+        """kind는 페이지의 종류 이름 (예: "Checking", "Receivables"). 없으면 None."""
+        section_key = SECTION_KEYS.get(category, {}).get(kind)
+        if section_key is None:
+            return None
+        return self.assets.get(category, {}).get(section_key)
+
+    def _entry_index(self, category: str, kind: str):
+        section = self.section(category, kind)
+        if section is None:
+            return None
+        index = self._entries.get((category, kind))
+        if index is None or index.items is not section["details"]:
+            index = NameIndex(section["details"], lambda e: e.get("name"))
+            self._entries[(category, kind)] = index
+        return index
+
+    def entry_names(self, category: str, kind: str) -> list:
+        index = self._entry_index(category, kind)
+        return index.names() if index is not None else []
+
+    def find_entry(self, category: str, kind: str, name: str):
+        index = self._entry_index(category, kind)
+        return index.get(name) if index is not None else None
+
+    def unique_entry_name(self, category: str, kind: str, name: str) -> str:
+        return self._entry_index(category, kind).unique_name(name)
+
+    def add_entry(self, category: str, kind: str, entry: dict):
+        self._entry_index(category, kind).append(entry)
+
+    def remove_entry(self, category: str, kind: str, name: str):
+        """이름으로 항목을 지우고 지운 항목을 돌려준다 (없으면 None)."""
+        index = self._entry_index(category, kind)
+        entry = index.get(name) if index is not None else None
+        if entry is not None:
+            index.remove(entry)
+        return entry
+
+    # --------------------------------------------------------------------------
+    # 주식 계좌 (stocks → account → [예수금 + 종목])
+    # --------------------------------------------------------------------------
+
+    def stock_accounts(self) -> list:
+        return [name for name, _ in iter_stock_accounts(self.assets.get("stocks", {}))]
+
+    def has_stock_account(self, account: str) -> bool:
+        return isinstance(self.assets.get("stocks", {}).get(account), list)
+
+    def holdings(self, account: str) -> list:
+        return self.assets["stocks"][account]
+
+    def _symbol_index(self, account: str) -> NameIndex:
+        holdings = self.holdings(account)
+        index = self._symbols.get(account)
+        if index is None or index.items is not holdings:
+            index = NameIndex(holdings, _symbol_key)
+            self._symbols[account] = index
+            self._tickers[account] = NameIndex(holdings, _ticker_key)
+            deposits = {}
+            for item in holdings:
+                for currency, row_name in DEPOSIT_ROWS.items():
+                    if item.get("name") == row_name:
+                        deposits.setdefault(currency, item)
+            self._deposits[account] = deposits
+        return index
+
+    def holding_symbols(self, account: str) -> list:
+        return self._symbol_index(account).names()
+
+    def find_holding(self, account: str, symbol: str):
+        return self._symbol_index(account).get(symbol)
+
+    def find_by_ticker(self, account: str, ticker: str):
+        self._symbol_index(account)
+        return self._tickers[account].get(ticker)
+
+    def deposit_item(self, account: str, currency: str):
+        """계좌의 원화("KRW") / 달러("USD") 예수금 항목. 없으면 None."""
+        self._symbol_index(account)
+        return self._deposits[account].get(currency)
+
+    def add_holding(self, account: str, item: dict):
+        self._symbol_index(account).append(item)
+        self._tickers[account].track(item)
+
+    def remove_holding(self, account: str, item: dict) -> bool:
+        removed = self._symbol_index(account).remove(item)
+        if removed:
+            # 같은 list를 공유하므로 항목은 이미 빠졌고, ticker 인덱스만 맞춘다
+            self._tickers[account].forget(item)
+        return removed
+
+    def add_stock_account(self, account: str, holdings: list):
+        self.assets["stocks"][account] = holdings
+
+    def remove_stock_account(self, account: str) -> list:
+        holdings = self.assets["stocks"].pop(account)
+        self._symbols.pop(account, None)
+        self._tickers.pop(account, None)
+        self._deposits.pop(account, None)
+        return holdings
@@ -0,0 +1,170 @@
+# price_cache.py
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 환경변수로 조정 가능한 기본값 (초 단위)
+PRICE_TTL = float(os.environ.get("STRAWBERRY_PRICE_TTL", "60"))
+PRICE_STALE_TTL = float(os.environ.get("STRAWBERRY_PRICE_STALE_TTL", "600"))
+PRICE_CACHE_SIZE = int(os.environ.get("STRAWBERRY_PRICE_CACHE_SIZE", "2000"))
+
+
+class PriceCache:
+    """
+    티커별 가격 캐시 (프로세스 전역에서 공유).
+    - ttl 이내: 그대로 사용 (fresh hit)
+    - ttl ~ ttl + stale_ttl: 일단 옛 값을 돌려주고 백그라운드에서 갱신 (stale hit)
+    - 그 이후: 없는 것으로 취급 (miss)
+      단, ttl 안에 조회가 실패했던 티커는 다시 기다리지 않고 마지막 값을 쓰면서 백그라운드에서 재시도
+    max_entries를 넘으면 가장 오래 안 쓴 티커부터 버린다 (LRU).
+    manage()로 넘긴 티커는 백그라운드 갱신기(refresher.py)가 주기적으로 채우므로,
+    값이 있으면 나이와 상관없이 그대로 쓰고, 값이 아직 없어도 페이지에서는 받지 않는다.
+    """
+
+    def __init__(self, ttl: float = PRICE_TTL, stale_ttl: float = PRICE_STALE_TTL,
+                 max_entries: int = PRICE_CACHE_SIZE):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # ticker -> (price, fetched_at)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._failed = {}  # ticker -> 마지막 조회 실패 시각
+        self._managed = frozenset()  # 갱신기가 맡고 있는 티커
+        self._settled = frozenset()  # 그중 장이 닫혀 있고 마지막 종가를 받아둔 티커
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def lookup(self, tickers, now: float = None):
+        """
+        returns (found, stale, missing)
+        found: {ticker: price} (fresh + stale 모두 포함)
+        stale: found 중 백그라운드 갱신이 필요한 티커 목록
+        missing: 지금 새로 받아야 하는 티커 목록 (갱신기가 맡은 티커는 값이 없어도 빠진다)
+        """
+        now = time.time() if now is None else now
+        found, stale, missing = {}, [], []
+        with self._lock:
+            for ticker in tickers:
+                entry = self._entries.get(ticker)
+                if entry is None:
+                    self.misses += 1
+                    if ticker not in self._managed:
+                        missing.append(ticker)
+                    continue
+                price, fetched_at = entry
+                age = now - fetched_at
+                if age <= self.ttl or ticker in self._managed:
+                    self.hits += 1
+                elif (age <= self.ttl + self.stale_ttl
+                      or now - self._failed.get(ticker, -math.inf) <= self.ttl):
+                    self.stale_hits += 1
+                    stale.append(ticker)
+                else:
+                    # 너무 오래된 값은 miss로 취급 (last_known()용으로 남겨둠)
+                    self.misses += 1
+                    missing.append(ticker)
+                    continue
+                self._entries.move_to_end(ticker)
+                found[ticker] = price
+        return found, stale, missing
+
+    def store(self, prices: dict, now: float = None):
+        """
+        새로 받은 가격을 저장.
+        가격을 못 받은 티커(NaN)는 실패 시각을 기록하고, 기존 값이 있으면 건드리지 않는다.
+        기존 값이 없으면 NaN으로 기록해 ttl 동안 같은 티커를 반복 요청하지 않게 한다.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for ticker, price in prices.items():
+                if price is None or (isinstance(price, float) and math.isnan(price)):
+                    self._failed[ticker] = now
+                    if ticker in self._entries:
+                        continue
+                    price = math.nan
+                else:
+                    self._failed.pop(ticker, None)
+                self._entries[ticker] = (float(price), now)
+                self._entries.move_to_end(ticker)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._failed.pop(evicted, None)
+
+    def manage(self, tickers, settled=()):
+        """
+        갱신기가 맡을 티커 목록을 바꾼다 (빈 목록이면 예전처럼 페이지가 직접 갱신).
+        settled: 장이 닫혀 있어 다음 개장까지 값이 바뀌지 않는 티커
+        """
+        with self._lock:
+            self._managed = frozenset(tickers)
+            self._settled = frozenset(settled) & self._managed
+
+    def is_settled(self, ticker: str) -> bool:
+        return ticker in self._settled
+
+    def ages(self, tickers, now: float = None) -> dict:
+        """캐시에 있는 티커별 값의 나이(초)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {t: now - self._entries[t][1] for t in tickers if t in self._entries}
+
+    def last_known(self, tickers) -> dict:
+        """나이와 상관없이 마지막으로 받은 가격 (NaN 제외). 조회가 늦어질 때 대신 쓰는 값."""
+        with self._lock:
+            known = {}
+            for ticker in tickers:
+                entry = self._entries.get(ticker)
+                if entry is not None and not math.isnan(entry[0]):
+                    known[ticker] = entry[0]
+            return known
+
+    def revalidate(self, tickers, fetcher):
+        """stale 티커들을 백그라운드 스레드에서 fetcher(tickers) -> {ticker: price}로 갱신."""
+        with self._lock:
+            todo = [t for t in tickers if t not in self._refreshing]
+            self._refreshing.update(todo)
+        if not todo:
+            return None
+
+        def _run():
+            try:
+                self.store(dict(fetcher(todo)))
+            except Exception:
+                logger.warning("Background price refresh failed", exc_info=True)
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(todo)
+
+        thread = threading.Thread(target=_run, name="price-revalidate", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._failed.clear()
+            self._managed = frozenset()
+            self._settled = frozenset()
+            self.hits = self.stale_hits = self.misses = 0
+
+
+# Home.py와 모든 페이지가 공유하는 프로세스 전역 캐시
+price_cache = PriceCache()
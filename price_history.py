@@ -0,0 +1,327 @@
+# price_history.py
+"""
+일별 종가 저장소 (티커 / 환율 티커별).
+
+price_history/<티커>.npy 파일 하나에 (day, close) 구조 배열을 날짜순으로 저장하고,
+읽을 때는 np.load(mmap_mode="r")로 메모리 매핑해서 필요한 구간만 복사 없이 잘라 쓴다.
+_coverage.json에는 티커별로 이미 조회한 날짜 구간을 적어둔다 (주말/휴일처럼 데이터가 없는 날도
+다시 묻지 않도록). 새로 받는 것은 그 구간 밖의 날짜뿐이다.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from crypto import iter_exchanges
+from fx import USD_KRW_TICKER
+from profiling import timed_function
+from portfolio import is_krw_quoted
+from quotes import DEPOSIT_NAMES, PAGE_BUDGET, REQUEST_TIMEOUT, iter_stock_accounts
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = os.environ.get("STRAWBERRY_HISTORY_DIR", "price_history")
+HISTORY_DAYS = int(os.environ.get("STRAWBERRY_HISTORY_DAYS", "365"))  # 처음 받을 때 과거 며칠치
+HISTORY_PERIODS = {"1M": 30, "3M": 91, "6M": 182, "1Y": 365}  # 차트 기간 선택지 (일)
+HISTORY_RECHECK = 3600.0  # 오늘(아직 확정 안 된 날) 데이터를 다시 확인하는 간격 (초)
+HISTORY_WORKERS = int(os.environ.get("STRAWBERRY_HISTORY_WORKERS", "2"))
+
+# 과거 종가 backfill 전용 스레드 풀 (크기 제한). 몇 년치 요청이 quotes의 실시간 시세 풀을 막지 않도록 따로 둔다.
+_history_executor = ThreadPoolExecutor(max_workers=HISTORY_WORKERS, thread_name_prefix="history-fetch")
+
+ROW_DTYPE = np.dtype([("day", "<i4"), ("close", "<f8")])  # day: 1970-01-01부터의 일 수
+_EPOCH = date(1970, 1, 1)
+
+
+def _day(d: date) -> int:
+    return (d - _EPOCH).days
+
+
+def _date(day: int) -> date:
+    return _EPOCH + timedelta(days=int(day))
+
+
+def period_start(label: str) -> date:
+    """차트 기간 이름("3M" 등) → 시작 날짜. HISTORY_DAYS보다 길게는 보지 않는다."""
+    return date.today() - timedelta(days=min(HISTORY_PERIODS.get(label, HISTORY_DAYS), HISTORY_DAYS))
+
+
+def _file_name(ticker: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._=^-]", "_", ticker) + ".npy"
+
+
+def _download_range(tickers: list, start: date, end: date, timeout: float) -> pd.DataFrame:
+    """start~end(포함) 일별 종가. columns=ticker, index=날짜."""
+    df = yf.download(tickers, start=start.isoformat(), end=(end + timedelta(days=1)).isoformat(),
+                     interval="1d", progress=False, auto_adjust=False, threads=True, timeout=timeout)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=tickers, dtype="float64")
+    closes = df["Close"]
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(name=tickers[0])
+    return closes
+
+
+class PriceHistory:
+    """일별 종가 저장소. 프로세스 전역에서 하나(price_history)를 공유한다."""
+
+    def __init__(self, directory: str = HISTORY_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._maps = {}       # ticker -> (파일 식별값, memmap 배열)
+        self._coverage = None  # ticker -> [from_day, to_day]
+        self._checked = {}    # ticker -> 마지막으로 요청한 시각
+        self._pending = set()  # 지금 받고 있는 티커 (중복 요청 방지)
+        self._no_rows = set()  # 마지막 요청에서 한 줄도 못 받은 티커 (HISTORY_RECHECK마다만 다시 시도)
+
+    # --------------------------------------------------------------------------
+    # 파일
+    # --------------------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_coverage(self) -> dict:
+        if self._coverage is None:
+            try:
+                with open(self._path("_coverage.json"), "r", encoding="utf-8") as f:
+                    self._coverage = json.load(f)
+            except FileNotFoundError:
+                self._coverage = {}
+            except ValueError:
+                logger.warning("Price history coverage file is corrupt; refetching", exc_info=True)
+                self._coverage = {}
+        return self._coverage
+
+    def _write_atomic(self, name: str, write):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".history-", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _rows(self, ticker: str) -> np.ndarray:
+        """티커의 전체 (day, close) 배열 (읽기 전용 memmap). 없으면 빈 배열."""
+        path = self._path(_file_name(ticker))
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=ROW_DTYPE)
+        ident = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._maps.get(ticker)
+        if cached is not None and cached[0] == ident:
+            return cached[1]
+        rows = np.load(path, mmap_mode="r")
+        self._maps[ticker] = (ident, rows)
+        return rows
+
+    def _merge(self, ticker: str, new_rows: np.ndarray):
+        """새 행을 기존 파일에 합친다 (같은 날짜는 새 값). 잠금 안에서 호출."""
+        old = np.asarray(self._rows(ticker))
+        both = np.concatenate([new_rows, old])  # 앞쪽(새 값)이 남도록
+        _, first = np.unique(both["day"], return_index=True)
+        merged = both[first]  # np.unique → 날짜순 정렬
+        self._write_atomic(_file_name(ticker), lambda f: np.save(f, merged))
+        self._maps.pop(ticker, None)
+
+    # --------------------------------------------------------------------------
+    # 증분 백필
+    # --------------------------------------------------------------------------
+
+    def missing_ranges(self, ticker: str, start: date, end: date) -> list:
+        """start~end 중 아직 조회하지 않은 구간들 [(from, to), ...]."""
+        covered = self._load_coverage().get(ticker)
+        if covered is None:
+            return [(start, end)]
+        lo, hi = _date(covered[0]), _date(covered[1])
+        ranges = []
+        if start < lo:
+            ranges.append((start, lo - timedelta(days=1)))
+        if end > hi:
+            ranges.append((max(start, hi + timedelta(days=1)), end))
+        return ranges
+
+    def _fetch_group(self, tickers: list, start: date, end: date, timeout: float):
+        closes = _download_range(tickers, start, end, timeout)
+        today = date.today()
+        with self._lock:
+            coverage = self._load_coverage()
+            for ticker in tickers:
+                self._checked[ticker] = time.time()
+                col = closes[ticker].dropna() if ticker in closes.columns else None
+                if col is None or not len(col):
+                    # 네트워크 오류여도 yf.download는 빈 표를 돌려주곤 한다 → 조회 완료로 치지 않는다
+                    self._no_rows.add(ticker)
+                    continue
+                self._no_rows.discard(ticker)
+                rows = np.empty(len(col), dtype=ROW_DTYPE)
+                rows["day"] = [_day(ts.date()) for ts in col.index]
+                rows["close"] = col.to_numpy(dtype="float64")
+                self._merge(ticker, rows)
+                # 오늘은 아직 장이 끝나지 않았을 수 있으므로 조회 완료로 치지 않는다
+                done_to = min(end, today - timedelta(days=1))
+                old = coverage.get(ticker)
+                lo, hi = _day(start), _day(done_to)
+                if old is not None:
+                    lo, hi = min(lo, old[0]), max(hi, old[1])
+                if hi >= lo:
+                    coverage[ticker] = [lo, hi]
+            self._write_atomic("_coverage.json",
+                               lambda f: f.write(json.dumps(coverage).encode("utf-8")))
+
+    @timed_function("history_backfill")
+    def backfill(self, tickers: list, start: date, end: date = None,
+                 budget: float = PAGE_BUDGET, timeout: float = REQUEST_TIMEOUT) -> int:
+        """
+        tickers의 start~end 중 빠진 구간만 받아 저장. 같은 구간이 빠진 티커끼리 한 번에 요청한다.
+        budget초 안에 끝나지 않으면 기다리지 않고 돌아온다 (받는 중인 것은 끝나면 저장됨).
+        returns 요청한 티커 수
+        """
+        end = end or date.today()
+        now = time.time()
+        groups = {}
+        with self._lock:
+            for ticker in dict.fromkeys(tickers):
+                if not ticker or ticker in self._pending:
+                    continue
+                for lo, hi in self.missing_ranges(ticker, start, end):
+                    if lo > hi:
+                        continue
+                    # 오늘치만 빠졌거나 지난번에 아무것도 못 받은 티커는 HISTORY_RECHECK마다 한 번만 확인
+                    recent = now - self._checked.get(ticker, 0) < HISTORY_RECHECK
+                    if recent and (lo >= date.today() or ticker in self._no_rows):
+                        continue
+                    groups.setdefault((lo, hi), []).append(ticker)
+            for group in groups.values():
+                self._pending.update(group)
+
+        def run(group, lo, hi):
+            try:
+                self._fetch_group(group, lo, hi, timeout)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(group)
+
+        futures = [_history_executor.submit(run, group, lo, hi) for (lo, hi), group in groups.items()]
+        done, not_done = wait(futures, timeout=budget)
+        for future in done:
+            try:
+                future.result()
+            except Exception:
+                logger.warning("Price history backfill failed", exc_info=True)
+        if not_done and budget > 0:
+            logger.warning("Price history backfill still running after %.1fs", budget)
+        return sum(len(g) for g in groups.values())
+
+    # --------------------------------------------------------------------------
+    # 구간 조회
+    # --------------------------------------------------------------------------
+
+    def closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        """start~end 일별 종가 (index=날짜). 값 배열은 memmap 구간을 그대로 쓴다 (복사 없음)."""
+        rows = self._rows(ticker)
+        days = rows["day"]
+        lo = np.searchsorted(days, _day(start), side="left")
+        hi = np.searchsorted(days, _day(end), side="right")
+        part = rows[lo:hi]
+        index = pd.to_datetime(np.asarray(part["day"], dtype="int64"), unit="D")
+        return pd.Series(part["close"], index=index, name=ticker, copy=False)
+
+    def frame(self, tickers: list, start: date, end: date) -> pd.DataFrame:
+        """여러 티커의 종가를 날짜 기준으로 맞춘 표 (빈 날은 직전 값으로 채움)."""
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return pd.DataFrame(dtype="float64")
+        df = pd.concat([self.closes(t, start, end) for t in tickers], axis=1)
+        df.columns = tickers
+        return df.sort_index().ffill()
+
+
+price_history = PriceHistory()
+
+
+@timed_function("stock_value_history")
+def stock_value_history(stocks_data: dict, start: date, end: date = None,
+                        history: PriceHistory = None, budget: float = PAGE_BUDGET) -> pd.DataFrame:
+    """
+    지금 보유 수량 그대로 과거 종가로 평가한 계좌별 가치 (KRW, 예수금 포함).
+    budget: backfill을 기다릴 시간. 0이면 기다리지 않고 이미 저장된 종가만 쓴다.
+    returns DataFrame(index=날짜, columns=계좌)
+    """
+    history = price_history if history is None else history
+    end = end or date.today()
+    accounts = list(iter_stock_accounts(stocks_data))
+    tickers = list(dict.fromkeys(item.get("ticker", "") for _, holdings in accounts
+                                 for item in holdings if item.get("name") not in DEPOSIT_NAMES))
+    tickers = [t for t in tickers if t]
+    history.backfill(tickers + [USD_KRW_TICKER], start, end, budget=budget)
+
+    prices = history.frame(tickers + [USD_KRW_TICKER], start, end)
+    if prices.empty:
+        return pd.DataFrame(columns=[name for name, _ in accounts], dtype="float64")
+    fx = prices.pop(USD_KRW_TICKER) if USD_KRW_TICKER in prices else pd.Series(np.nan, index=prices.index)
+    fx = fx.ffill().bfill().to_numpy()
+    closes = prices.reindex(columns=tickers).fillna(0.0).to_numpy()
+
+    # 계좌 × 티커 수량 행렬: KRW로 바로 더하는 부분 / 환율을 곱해야 하는 부분
+    col = {t: i for i, t in enumerate(tickers)}
+    w_krw = np.zeros((len(tickers), len(accounts)))
+    w_usd = np.zeros((len(tickers), len(accounts)))
+    cash_krw = np.zeros(len(accounts))
+    cash_usd = np.zeros(len(accounts))
+    for j, (_, holdings) in enumerate(accounts):
+        for item in holdings:
+            if item.get("name") in DEPOSIT_NAMES:
+                cash_krw[j] += item.get("amount_krw", 0)
+                cash_usd[j] += item.get("amount_usd", 0)
+                continue
+            ticker = item.get("ticker", "")
+            if ticker not in col:
+                continue
+            if is_krw_quoted(item.get("currency", "USD"), ticker):
+                w_krw[col[ticker], j] += item.get("quantity", 0.0)
+            else:
+                w_usd[col[ticker], j] += item.get("quantity", 0.0)
+
+    values = closes @ w_krw + (closes @ w_usd) * fx[:, None] + cash_krw + np.outer(fx, cash_usd)
+    return pd.DataFrame(values, index=prices.index, columns=[name for name, _ in accounts])
+
+
+@timed_function("crypto_value_history")
+def crypto_value_history(crypto_data: dict, tickers: dict, start: date, end: date = None,
+                         history: PriceHistory = None, budget: float = PAGE_BUDGET) -> pd.Series:
+    """
+    지금 보유한 코인 수량을 과거 종가(USD)로 평가한 합계 (KRW).
+    tickers: {심볼: 가격 티커} (예: YahooQuoteSource.tickers). 티커가 없는 코인은 빠진다.
+    """
+    history = price_history if history is None else history
+    end = end or date.today()
+    quantities = {}
+    for _, coins in iter_exchanges(crypto_data):
+        for coin in coins:
+            ticker = tickers.get(coin.get("symbol", "").strip().upper())
+            if ticker:
+                quantities[ticker] = quantities.get(ticker, 0.0) + float(coin.get("quantity", 0.0))
+    if not quantities:
+        return pd.Series(dtype="float64")
+    history.backfill(list(quantities) + [USD_KRW_TICKER], start, end, budget=budget)
+    prices = history.frame(list(quantities) + [USD_KRW_TICKER], start, end)
+    if prices.empty:
+        return pd.Series(dtype="float64")
+    fx = prices.pop(USD_KRW_TICKER) if USD_KRW_TICKER in prices else pd.Series(np.nan, index=prices.index)
+    usd = prices.reindex(columns=list(quantities)).fillna(0.0).to_numpy() @ np.fromiter(quantities.values(), float)
+    return pd.Series(usd * fx.ffill().bfill().to_numpy(), index=prices.index)
@@ -0,0 +1,199 @@
+# profiling.py
+"""
+페이지 렌더링 / I/O 시간 측정.
+
+- timed("이름"): 구간 시간을 잰다 (with 문 또는 @timed_function)
+- lap("이름"): 스크립트 맨 위부터 이어지는 페이지 구간을 들여쓰기 없이 나눠 잰다
+- profiled_run("페이지"): 페이지 실행(rerun) 하나를 묶어서, 끝나면 구간별 합계 / 캐시 적중률 /
+  가장 느린 티커를 모은다.
+  STRAWBERRY_PROFILE_LOG=<경로>를 주면 rerun마다 JSON 한 줄을 덧붙이고,
+  STRAWBERRY_DEBUG=1 또는 주소에 ?debug=1을 붙이면 사이드바에 같은 내용을 보여준다.
+페이지 실행 밖(백그라운드 갱신기 등)에서 잰 시간은 최근 BACKGROUND_KEEP개만 따로 남긴다.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+PROFILE_LOG = os.environ.get("STRAWBERRY_PROFILE_LOG", "")
+DEBUG_PANEL = os.environ.get("STRAWBERRY_DEBUG", "") == "1"
+SLOWEST_TICKERS = 10
+BACKGROUND_KEEP = 200
+
+_local = threading.local()
+_background = deque(maxlen=BACKGROUND_KEEP)  # (시각, 스레드 이름, 구간, ms)
+_log_lock = threading.Lock()
+
+
+class Run:
+    """페이지 실행 한 번 동안 모은 시간."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started = time.perf_counter()
+        self.last_lap = self.started
+        self.stages = {}   # 구간 → [합계 ms, 횟수]
+        self.tickers = {}  # 티커 → 가장 오래 걸린 조회 ms
+
+    def add(self, name: str, ms: float):
+        stage = self.stages.setdefault(name, [0.0, 0])
+        stage[0] += ms
+        stage[1] += 1
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def record(name: str, ms: float):
+    run = current_run()
+    if run is not None:
+        run.add(name, ms)
+    else:
+        _background.append((time.time(), threading.current_thread().name, name, ms))
+
+
+def record_tickers(tickers, ms: float):
+    """티커별 조회 시간 (일괄 조회면 같은 시간이 모두에게 들어간다)."""
+    run = current_run()
+    if run is None:
+        return
+    for ticker in tickers:
+        run.tickers[ticker] = max(run.tickers.get(ticker, 0.0), ms)
+
+
+@contextmanager
+def timed(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - started) * 1000)
+
+
+def timed_function(name: str = None):
+    """함수 전체를 timed()로 감싸는 데코레이터."""
+    def decorate(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def lap(name: str):
+    """직전 lap(또는 실행 시작) 이후 지난 시간을 "section:이름"으로 기록."""
+    run = current_run()
+    if run is None:
+        return
+    now = time.perf_counter()
+    run.add(f"section:{name}", (now - run.last_lap) * 1000)
+    run.last_lap = now
+
+
+# ------------------------------------------------------------------------------
+# 실행 단위 보고
+# ------------------------------------------------------------------------------
+
+def begin_run(page: str) -> Run:
+    _local.run = Run(page)
+    return _local.run
+
+
+def _report(run: Run) -> dict:
+    from price_cache import price_cache  # 이 모듈은 utils / quotes에서도 쓰므로 여기서만 가져온다
+    from utils import load_stats
+
+    total_ms = (time.perf_counter() - run.started) * 1000
+    slowest = sorted(run.tickers.items(), key=lambda kv: kv[1], reverse=True)[:SLOWEST_TICKERS]
+    return {
+        "ts": time.time(),
+        "page": run.page,
+        "total_ms": round(total_ms, 2),
+        "stages": {name: {"ms": round(ms, 2), "count": count}
+                   for name, (ms, count) in sorted(run.stages.items(), key=lambda kv: -kv[1][0])},
+        "price_cache": price_cache.stats(),
+        "assets_cache": load_stats(),
+        "slowest_tickers": [{"ticker": t, "ms": round(ms, 2)} for t, ms in slowest],
+    }
+
+
+def _write_log(report: dict):
+    if not PROFILE_LOG:
+        return
+    try:
+        with _log_lock, open(PROFILE_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    except OSError:
+        # logging은 여기서만 쓴다 (모든 모듈이 이 파일을 import하므로 명령줄 도구 시작 시간을 아끼려고 필요할 때 import)
+        import logging
+        logging.getLogger(__name__).warning("Could not write profile log %s", PROFILE_LOG, exc_info=True)
+
+
+def debug_enabled() -> bool:
+    if DEBUG_PANEL:
+        return True
+    import streamlit as st
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def render_debug_panel(report: dict):
+    """사이드바의 Performance 패널."""
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("Performance", expanded=True):
+        st.metric("Rerun total", f"{report['total_ms']:,.1f} ms")
+        stages = pd.DataFrame([{"stage": k, "ms": v["ms"], "count": v["count"]}
+                               for k, v in report["stages"].items()])
+        if not stages.empty:
+            st.dataframe(stages, hide_index=True, use_container_width=True,
+                         column_config={"ms": st.column_config.NumberColumn("ms", format="%.1f")})
+        prices, assets = report["price_cache"], report["assets_cache"]
+        st.caption(f"Price cache hit ratio {prices['hit_ratio']:.0%} "
+                   f"({prices['hits']} fresh, {prices['stale_hits']} stale, {prices['misses']} miss)")
+        st.caption(f"Assets cache hit ratio {assets['hit_ratio']:.0%}, avg load {assets['avg_ms']:.1f} ms")
+        if report["slowest_tickers"]:
+            st.caption("Slowest tickers: " + ", ".join(
+                f"{t['ticker']} {t['ms']:.0f} ms" for t in report["slowest_tickers"]))
+        if _background:
+            recent = pd.DataFrame(list(_background)[-20:], columns=["ts", "thread", "stage", "ms"])
+            recent["ts"] = pd.to_datetime(recent["ts"], unit="s")
+            st.caption("Background work (latest 20)")
+            st.dataframe(recent, hide_index=True, use_container_width=True)
+
+
+def end_run(render: bool = True) -> dict:
+    """지금 실행을 마무리: 로그 기록 + (켜져 있으면) 사이드바 패널. returns 보고 dict"""
+    run = current_run()
+    if run is None:
+        return {}
+    _local.run = None
+    report = _report(run)
+    _write_log(report)
+    if render and debug_enabled():
+        render_debug_panel(report)
+    return report
+
+
+@contextmanager
+def profiled_run(page: str):
+    """
+    페이지 main()을 감싼다. st.rerun / st.stop 같은 중단 예외로 끝나면 패널은 그리지 않고 로그만 남긴다.
+    """
+    begin_run(page)
+    try:
+        yield
+    except BaseException:
+        end_run(render=False)
+        raise
+    end_run()
@@ -0,0 +1,173 @@
+# quotes.py
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
+
+import pandas as pd
+import yfinance as yf
+
+from portfolio import DEPOSIT_NAMES, is_krx_ticker, iter_stock_accounts  # noqa: F401 (예전 import 경로)
+from price_cache import price_cache
+from profiling import record_tickers, timed_function
+
+logger = logging.getLogger(__name__)
+
+# 환경변수로 조정 가능한 기본값 (초 단위)
+FETCH_WORKERS = int(os.environ.get("STRAWBERRY_FETCH_WORKERS", "8"))
+REQUEST_TIMEOUT = float(os.environ.get("STRAWBERRY_REQUEST_TIMEOUT", "5"))
+PAGE_BUDGET = float(os.environ.get("STRAWBERRY_PAGE_BUDGET", "8"))
+
+# 가격 조회 전용 스레드 풀 (프로세스 전역, 크기 제한)
+_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="quote-fetch")
+# 일괄 요청이 실패했을 때의 티커별 요청은 따로 작은 풀에서 (끝나지 않은 요청이 위 풀을 막지 않도록)
+FALLBACK_WORKERS = int(os.environ.get("STRAWBERRY_FALLBACK_WORKERS", "4"))
+_fallback_executor = ThreadPoolExecutor(max_workers=FALLBACK_WORKERS, thread_name_prefix="quote-fallback")
+
+
+def collect_tickers(stocks_data: dict) -> list:
+    """모든 계좌의 보유 종목에서 중복 없는 티커 목록을 모은다 (순서 유지)."""
+    seen = {}
+    for _, holdings in iter_stock_accounts(stocks_data):
+        for item in holdings:
+            if item.get("name") in DEPOSIT_NAMES:
+                continue
+            ticker = item.get("ticker", "")
+            if ticker:
+                seen[ticker] = None
+    return list(seen)
+
+
+def _download_closes(tickers: list, timeout: float) -> pd.Series:
+    """yf.download 한 번으로 여러 티커의 최근 종가를 받는다."""
+    df = yf.download(tickers, period="1d", progress=False,
+                     auto_adjust=False, threads=True, timeout=timeout)
+    if df is None or df.empty:
+        return pd.Series(dtype="float64")
+    closes = df["Close"]
+    if isinstance(closes, pd.Series):
+        # 티커가 하나뿐이면 Series로 내려오는 버전이 있음
+        closes = closes.to_frame(name=tickers[0])
+    return closes.ffill().iloc[-1].astype("float64")
+
+
+def _history_close(ticker: str, timeout: float):
+    """티커 하나의 최근 종가와 걸린 시간(ms). 데이터가 없으면 NaN."""
+    started = time.perf_counter()
+    hist = yf.Ticker(ticker).history(period="1d", timeout=timeout)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if hist.empty:
+        return math.nan, elapsed_ms
+    return float(hist["Close"].iloc[-1]), elapsed_ms
+
+
+@timed_function("fetch_price_table")
+def fetch_price_table(tickers: list, budget: float = PAGE_BUDGET,
+                      timeout: float = REQUEST_TIMEOUT) -> pd.Series:
+    """
+    티커별 최근 가격표(pd.Series, index=ticker)를 반환.
+    - 먼저 전체를 한 번에 받는다 (budget의 절반까지만 기다림).
+    - 일괄 요청이 실패했거나, 끝났지만 열이 없거나 값이 전부 NaN인 티커가 있으면
+      그 티커만 별도 풀(_fallback_executor)에 하나씩 나눠 보내고 남은 budget 안에 끝난 것만 모은다.
+      각 요청은 timeout초로 제한.
+    - 일괄 요청이 시간 안에 끝나지 않았으면 (아직 도는 중이므로) 티커별 요청을 더 얹지 않는다.
+      이미 실행 중인 요청은 cancel()로 멈출 수 없어서, 겹쳐 보내면 풀만 더 오래 막힌다.
+    가격을 얻지 못한 티커는 NaN (부분 결과).
+    """
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    table = pd.Series(math.nan, index=pd.Index(tickers, dtype="object"), dtype="float64")
+    if not tickers:
+        return table
+
+    started = time.monotonic()
+    deadline = started + budget
+    batch = _executor.submit(_download_closes, tickers, timeout)
+    missing = tickers
+    try:
+        table.update(batch.result(timeout=budget / 2))
+        record_tickers(tickers, (time.monotonic() - started) * 1000)
+        missing = list(table.index[table.isna()])
+    except FuturesTimeout:
+        logger.warning("Batch quote download for %d tickers exceeded %.1fs", len(tickers), budget / 2)
+        record_tickers(tickers, budget / 2 * 1000)
+        return table
+    except Exception:
+        logger.warning("Batch quote download failed", exc_info=True)
+    if not missing:
+        return table
+
+    futures = {_fallback_executor.submit(_history_close, t, timeout): t for t in missing}
+    done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    for future in done:
+        ticker = futures[future]
+        try:
+            table[ticker], elapsed_ms = future.result()
+            record_tickers([ticker], elapsed_ms)
+        except Exception:
+            logger.warning("Quote fetch failed for %s", ticker, exc_info=True)
+    for future in not_done:
+        future.cancel()
+    record_tickers([futures[f] for f in not_done], budget * 1000)
+    if not_done:
+        logger.warning("Quote fetch missed the %.1fs budget for: %s", budget,
+                       ", ".join(sorted(futures[f] for f in not_done)))
+    return table
+
+
+def _quote_status(ticker: str, price: float, age, cache) -> str:
+    if pd.isna(price):
+        return "unavailable"
+    if cache.is_settled(ticker):
+        return "closed"
+    if age <= cache.ttl:
+        return "live"
+    if age <= cache.ttl + cache.stale_ttl:
+        return "cached"
+    return "stale"
+
+
+def cached_price_table(tickers: list, cache=None):
+    """
+    공유 캐시를 거쳐 가격표를 만든다.
+    캐시에 없는 티커만 한 번에 받아오고, 오래된(stale) 티커는 옛 값을 쓰면서
+    백그라운드에서 갱신한다.
+    returns (prices, status)
+    status: 티커별 "live" | "cached" | "closed" | "stale" | "unavailable"
+      - cached: 갱신 주기가 지나 백그라운드에서 다시 받는 중인 값
+      - closed: 장이 닫혀 있어서 마지막 종가를 쓰는 중 (갱신기가 다음 개장까지 다시 받지 않음)
+      - stale: 시간 안에 못 받아서 마지막으로 알던 값을 대신 쓴 경우
+      - unavailable: 받지도 못했고 알던 값도 없음
+    """
+    cache = price_cache if cache is None else cache
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    found, stale, missing = cache.lookup(tickers)
+    if missing:
+        cache.store(fetch_price_table(missing).to_dict())
+        found.update(cache.last_known(missing))
+    if stale:
+        cache.revalidate(stale, lambda todo: fetch_price_table(todo).to_dict())
+
+    index = pd.Index(tickers, dtype="object")
+    prices = pd.Series([found.get(t, math.nan) for t in tickers], index=index, dtype="float64")
+    ages = cache.ages(tickers)
+    status = [_quote_status(t, prices[t], ages.get(t, math.inf), cache) for t in tickers]
+    return prices, pd.Series(status, index=index, dtype="object")
+
+
+def fetch_stock_prices(stocks_data: dict):
+    """stocks 섹션 전체의 가격표를 한 번에 만든다 (공유 캐시 사용). returns (prices, status)"""
+    return cached_price_table(collect_tickers(stocks_data))
+
+
+def delayed_tickers(status: pd.Series):
+    """status에서 (stale 티커 목록, unavailable 티커 목록)을 뽑는다. 화면 경고용."""
+    return list(status.index[status == "stale"]), list(status.index[status == "unavailable"])
+
+
+def price_of(prices: pd.Series, ticker: str) -> float:
+    """가격표에서 한 티커의 가격. 없으면 0.0."""
+    if not ticker:
+        return 0.0
+    value = prices.get(ticker, math.nan)
+    return 0.0 if pd.isna(value) else float(value)
@@ -0,0 +1,173 @@
+# rebalance.py
+"""
+포트폴리오 리밸런싱 계산.
+
+모든 자산(입출금/예적금, 채권/보증금, 주식 예수금·종목, 코인)을 한 줄씩 펼친 positions 표를 만들고,
+태그(#Safe Assets, #Investment Assets ...)별 목표 비중과의 차이와 제안 거래를 numpy로 한 번에 계산한다.
+태그가 여러 개인 항목은 첫 번째 태그로 분류한다.
+"""
+import numpy as np
+import pandas as pd
+
+from profiling import timed_function
+from valuation import UNTAGGED, value_positions  # noqa: F401 (UNTAGGED: 예전 import 경로)
+
+# kind별 성격
+#   cash:  금액을 옮길 수 있는 계좌/예수금 (Transfer)
+#   fixed: 채권/보증금 → 리밸런싱으로 움직이지 않음
+#   stock / crypto: 사고팔 수 있는 종목 (Buy / Sell)
+TRADEABLE_KINDS = ("stock", "crypto")
+DEFAULT_LOTS = {"stock": 1.0, "crypto": 0.0001, "cash": 1000.0}  # 거래 단위 (cash는 KRW 단위)
+
+POSITION_COLUMNS = ["category", "account", "name", "ticker", "kind",
+                    "quantity", "unit_krw", "value_krw", "tag"]
+ACTION_COLUMNS = ["action", "tag", "category", "account", "name", "ticker", "quantity", "amount_krw"]
+
+
+def flatten_positions(assets: dict, prices, rate: float, crypto_positions: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    리밸런싱에 쓰는 positions 표 (valuation.value_positions에서 필요한 열만, 금액은 모두 KRW).
+    prices: 주식 가격표 (quotes.fetch_stock_prices), crypto_positions: crypto.value_crypto()["positions"]
+    """
+    return value_positions(assets, prices, rate, crypto_positions, columns=POSITION_COLUMNS)
+
+
+def _tag_codes(positions: pd.DataFrame, targets: dict = None):
+    """(태그 목록, 항목별 태그 번호). 태그 순서는 처음 나온 순서, 목표에만 있는 태그는 뒤에."""
+    codes, uniques = pd.factorize(positions["tag"].to_numpy(dtype=object))
+    tags = list(uniques)
+    seen = set(tags)
+    tags += [t for t in (targets or {}) if t not in seen]
+    return tags, codes
+
+
+def _allocation(positions: pd.DataFrame, targets: dict = None):
+    tags, codes = _tag_codes(positions, targets)
+    current = np.bincount(codes, weights=positions["value_krw"].to_numpy(), minlength=len(tags))
+    total = current.sum()
+    current_weight = current / total if total else np.zeros(len(tags))
+
+    if targets:
+        target_weight = np.array([max(float(targets.get(t, 0.0)), 0.0) for t in tags])
+        if target_weight.sum() > 0:
+            target_weight = target_weight / target_weight.sum()
+    else:
+        target_weight = current_weight.copy()
+
+    table = pd.DataFrame({
+        "current_krw": current,
+        "current_weight": current_weight,
+        "target_weight": target_weight,
+        "target_krw": target_weight * total,
+    }, index=pd.Index(tags, name="tag"))
+    table["gap_krw"] = table["target_krw"] - table["current_krw"]
+    return table, codes
+
+
+def allocation(positions: pd.DataFrame, targets: dict = None) -> pd.DataFrame:
+    """
+    태그별 현재 금액/비중과 목표 비중.
+    targets: {태그: 목표 비중} (합이 1이 아니면 비율대로 맞춤). 없으면 현재 비중을 그대로 목표로.
+    returns DataFrame(index=tag): current_krw, current_weight, target_weight, target_krw, gap_krw
+    """
+    return _allocation(positions, targets)[0]
+
+
+def _lot_sizes(kind: np.ndarray, unit: np.ndarray, lots: dict):
+    """항목별 (거래 단위 수량, 거래 단위 금액 KRW). cash는 금액 자체가 수량."""
+    lot_qty = np.select([kind == "stock", kind == "crypto"],
+                        [lots["stock"], lots["crypto"]], default=lots["cash"])
+    lot_qty = np.where(kind == "cash", lots["cash"] / np.where(unit > 0, unit, 1.0), lot_qty)
+    return lot_qty, lot_qty * unit
+
+
+def _empty_actions() -> pd.DataFrame:
+    return pd.DataFrame(columns=ACTION_COLUMNS).astype({"quantity": "float64", "amount_krw": "float64"})
+
+
+@timed_function("propose_actions")
+def propose_actions(positions: pd.DataFrame, targets: dict, tolerance: float = 0.01,
+                    lots: dict = None):
+    """
+    목표 비중에 맞추는 최소한의 거래 목록.
+    - 비중 차이가 tolerance 이하인 태그는 건드리지 않는다.
+    - 비중이 넘치는 태그: 큰 항목부터 필요한 만큼만 Sell (종목) / Transfer out (계좌·예수금)
+    - 모자라는 태그: 그 태그에서 가장 큰 종목을 Buy (종목이 없으면 가장 큰 계좌로 Transfer in)
+      많이 모자라는 태그부터, 위에서 마련한 현금을 넘지 않게 나눈다.
+    - 수량/금액은 거래 단위(lots)로 내림. 채권/보증금(fixed)은 움직이지 않는다.
+    항목 / 태그 단위 반복 없이 배열 연산(정렬 + 누적합)으로 계산하고, 결과 표는 마지막에 한 번 만든다.
+    returns (actions DataFrame, allocation DataFrame)
+    """
+    lots = dict(DEFAULT_LOTS, **(lots or {}))
+    table, all_codes = _allocation(positions, targets)
+    tags = np.array(table.index, dtype=object)
+    drift = (table["target_weight"] - table["current_weight"]).to_numpy()
+    gap = table["gap_krw"].to_numpy()
+    active = np.abs(drift) > tolerance
+    excess = np.where(active & (gap < 0), -gap, 0.0)
+    deficit = np.where(active & (gap > 0), gap, 0.0)
+
+    kind_all = positions["kind"].to_numpy(dtype=object)
+    value_all = positions["value_krw"].to_numpy()
+    rows = np.flatnonzero((kind_all != "fixed") & (value_all > 0))  # 움직일 수 있는 항목 (positions 행 번호)
+    if not len(rows):
+        return _empty_actions(), table
+    codes = all_codes[rows]
+    values = value_all[rows]
+    kind = kind_all[rows]
+    lot_qty, lot_krw = _lot_sizes(kind, positions["unit_krw"].to_numpy()[rows], lots)
+    tradeable = np.isin(kind, TRADEABLE_KINDS)
+
+    # 1) 넘치는 태그 줄이기: 태그 안에서 큰 항목부터 누적해서 excess만큼
+    order = np.lexsort((-values, codes))
+    s_codes, s_values = codes[order], values[order]
+    cum = np.cumsum(s_values)
+    group_start = np.r_[True, s_codes[1:] != s_codes[:-1]]
+    start_cum = (cum - s_values)[group_start]
+    before = cum - s_values - start_cum[np.cumsum(group_start) - 1]  # 같은 태그 안에서 앞선 항목들의 합
+    take = np.clip(excess[s_codes] - before, 0.0, s_values)
+    n_lots = np.floor(take / lot_krw[order] + 1e-9)
+    sell_amount = n_lots * lot_krw[order]
+    sold = sell_amount > 0
+    sell_idx = order[sold]
+    pool = float(sell_amount.sum())
+
+    # 2) 모자라는 태그 채우기: 태그마다 대표 항목 하나 (종목 우선, 그중 가장 큰 것)
+    order = np.lexsort((values, tradeable, codes))
+    last_of_group = np.r_[codes[order][1:] != codes[order][:-1], True]
+    target_row = np.full(len(tags), -1)
+    target_row[codes[order][last_of_group]] = order[last_of_group]
+
+    # 많이 모자라는 태그부터 pool을 누적합으로 나눈다
+    wanted = np.argsort(-deficit, kind="stable")
+    wanted = wanted[deficit[wanted] > 0]
+    want = deficit[wanted]
+    share = np.clip(pool - (np.cumsum(want) - want), 0.0, want)
+    buy_row = target_row[wanted]
+    known = buy_row >= 0  # 아니면 그 태그에 움직일 수 있는 항목이 없음 → 새 종목/계좌를 골라야 함
+    safe_row = np.where(known, buy_row, 0)
+    lot = np.where(known, lot_krw[safe_row], lots["cash"])
+    n_buy = np.floor(share / lot + 1e-9)
+    buy_amount = n_buy * lot
+    bought = buy_amount > 0
+
+    # 3) 결과 표: 행 정보(계좌/이름 ...)는 고른 행만 한 번에 가져온다
+    act_rows = np.r_[sell_idx, safe_row[bought]]
+    if not len(act_rows):
+        return _empty_actions(), table
+    is_new = np.r_[np.zeros(len(sell_idx), dtype=bool), ~known[bought]]
+    picked = positions.iloc[rows[act_rows]]
+    text = {c: np.where(is_new, "", picked[c].to_numpy(dtype=object)) for c in ("category", "account", "ticker")}
+    result = pd.DataFrame({
+        "action": np.r_[np.where(tradeable[sell_idx], "Sell", "Transfer out"),
+                        np.where(~known[bought] | tradeable[safe_row[bought]], "Buy", "Transfer in")],
+        "tag": np.r_[tags[codes[sell_idx]], tags[wanted[bought]]],
+        "category": text["category"],
+        "account": text["account"],
+        "name": np.where(is_new, "(new position)", picked["name"].to_numpy(dtype=object)),
+        "ticker": text["ticker"],
+        "quantity": np.r_[n_lots[sold] * lot_qty[sell_idx],
+                          np.where(known, n_buy * lot_qty[safe_row], np.nan)[bought]],
+        "amount_krw": np.r_[sell_amount[sold], buy_amount[bought]],
+    })
+    return result.astype({"quantity": "float64", "amount_krw": "float64"}), table
@@ -0,0 +1,111 @@
+# receivables.py
+"""
+빌려준 돈 / 보증금(receivables_and_deposits) 변경 함수.
+
+rd_type은 페이지의 종류 이름 ("Receivables", "Deposits").
+"""
+from portfolio import Portfolio
+from summary import apply_delta
+
+
+def get_rd_list(portfolio: Portfolio, rd_type: str):
+    """Return a list of names in 'receivables' or 'deposits'."""
+    return portfolio.entry_names("receivables_and_deposits", rd_type)
+
+def get_rd_category(portfolio: Portfolio, rd_type: str):
+    """Helper: return the dict for 'receivables' or 'deposits'."""
+    return portfolio.section("receivables_and_deposits", rd_type)
+
+def rd_loan_out(portfolio: Portfolio, rd_type: str, rd_name: str, amount: int, tags: list):
+    """
+    Loan out money:
+    - If rd_name already exists, just add 'amount' to existing balance (ignore 'tags').
+    - If not, create a new entry with that name + the provided 'tags' (if any).
+      If the same name is also taken, attach (1), (2), etc. until unique.
+    Return the final name if success, or None if fail.
+    """
+    assets = portfolio.assets
+    category = get_rd_category(portfolio, rd_type)
+    if not category:
+        return None
+
+    entry = portfolio.find_entry("receivables_and_deposits", rd_type, rd_name)
+    if entry is not None:
+        # 이미 존재 -> 금액만 추가, tags는 무시
+        entry["amount_krw"] += amount
+        category["total_krw"] += amount
+        assets["receivables_and_deposits"]["total_krw"] += amount
+        apply_delta(assets, "receivables_and_deposits", krw=amount)
+        return rd_name  # same name
+
+    # 새 항목 -> tags 반영
+    new_name = portfolio.unique_entry_name("receivables_and_deposits", rd_type, rd_name)
+    new_entry = {
+        "name": new_name,
+        "amount_krw": amount,
+        "tags": tags if tags else []
+    }
+    portfolio.add_entry("receivables_and_deposits", rd_type, new_entry)
+    category["total_krw"] += amount
+    assets["receivables_and_deposits"]["total_krw"] += amount
+    apply_delta(assets, "receivables_and_deposits", krw=amount)
+
+    return new_name
+
+def rd_withdraw(portfolio: Portfolio, rd_type: str, rd_name: str, amount: int):
+    """
+    Repaying: subtract amount from existing. 
+    return "ok" | "insufficient" | False
+    """
+    assets = portfolio.assets
+    category = get_rd_category(portfolio, rd_type)
+    if not category:
+        return False
+    entry = portfolio.find_entry("receivables_and_deposits", rd_type, rd_name)
+    if entry is None:
+        return False
+    if entry["amount_krw"] < amount:
+        return "insufficient"
+    entry["amount_krw"] -= amount
+    category["total_krw"] -= amount
+    assets["receivables_and_deposits"]["total_krw"] -= amount
+    apply_delta(assets, "receivables_and_deposits", krw=-amount)
+    return "ok"
+
+def rd_delete(portfolio: Portfolio, rd_type: str, rd_name: str):
+    """
+    Settlement: remove the entry entirely.
+    Return True if success, False if not found.
+    """
+    assets = portfolio.assets
+    category = get_rd_category(portfolio, rd_type)
+    if not category:
+        return False
+    entry = portfolio.remove_entry("receivables_and_deposits", rd_type, rd_name)
+    if entry is None:
+        return False
+    balance = entry["amount_krw"]
+    category["total_krw"] -= balance
+    assets["receivables_and_deposits"]["total_krw"] -= balance
+    apply_delta(assets, "receivables_and_deposits", krw=-balance)
+    return True
+
+def rd_adjust(portfolio: Portfolio, rd_type: str, rd_name: str, new_balance: int):
+    """
+    Adjust the entry to new_balance directly.
+    Return True if success, False if not found.
+    """
+    assets = portfolio.assets
+    category = get_rd_category(portfolio, rd_type)
+    if not category:
+        return False
+    entry = portfolio.find_entry("receivables_and_deposits", rd_type, rd_name)
+    if entry is None:
+        return False
+    old_balance = entry["amount_krw"]
+    diff = new_balance - old_balance
+    entry["amount_krw"] = new_balance
+    category["total_krw"] += diff
+    assets["receivables_and_deposits"]["total_krw"] += diff
+    apply_delta(assets, "receivables_and_deposits", krw=diff)
+    return True
@@ -0,0 +1,190 @@
+# refresher.py
+"""
+백그라운드 가격 갱신기.
+
+assets의 주식 티커 + 코인 티커를 직접 모아서 주기적으로 한 번에 받아 공유 가격 캐시(price_cache)에 넣는다.
+- 장중인 시장(KRX / US, 코인은 항상)의 티커: REFRESH_OPEN초마다
+- 장이 닫힌 시장의 티커: 마지막 폐장 후 종가를 한 번 받고 나면 다음 개장까지 다시 받지 않는다
+  (주말/휴장일에는 요청이 없음. 장 시간/휴장일은 market_hours.py)
+페이지는 캐시에 있는 값을 그대로 쓰므로 화면을 그리는 동안 네트워크를 기다리지 않는다.
+첫 바퀴가 끝나기 전에 열린 페이지도 기다리지 않고, 아직 값이 없는 티커는 unavailable로 보여준다.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from crypto import collect_symbols, default_source
+from fx import get_usd_krw_rate
+from market_hours import is_open, last_close, market_of, next_open
+from price_cache import price_cache
+from quotes import PAGE_BUDGET, collect_tickers, fetch_price_table
+from utils import load_assets
+
+logger = logging.getLogger(__name__)
+
+REFRESH_OPEN = float(os.environ.get("STRAWBERRY_REFRESH_OPEN", "60"))
+CLOSE_GRACE = 900.0  # 폐장 후 종가가 확정될 때까지 기다리는 시간 (초)
+REFRESH_IDLE = 300.0  # 모든 시장이 닫혀 있어도 티커 목록(assets)은 이 간격으로 다시 본다 (네트워크 없음)
+REFRESH_MIN_SLEEP = 1.0
+
+
+class PriceRefresher:
+    """티커 목록을 스스로 관리하면서 price_cache를 주기적으로 채우는 데몬 스레드."""
+
+    def __init__(self, cache=None):
+        self.cache = price_cache if cache is None else cache
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.refreshed_at = None  # 마지막으로 가격을 받은 시각 (time.time())
+        self.tickers = []
+        self.markets = {}  # ticker -> 시장
+        self.settled = []  # 장이 닫혀 있고 종가까지 받아둔 티커
+        self._attempted = {}  # ticker -> 마지막으로 요청한 시각 (실패해도 REFRESH_OPEN 안에는 다시 안 함)
+
+    # --------------------------------------------------------------------------
+    # 티커 / 주기
+    # --------------------------------------------------------------------------
+
+    def _collect(self):
+        """지금 assets에 있는 주식 + 코인 티커와 각 티커의 시장."""
+        assets = load_assets()
+        source = default_source()
+        crypto_tickers = source.tickers(collect_symbols(assets.get("cryptocurrency", {})))
+        tickers = list(dict.fromkeys(collect_tickers(assets.get("stocks", {})) + crypto_tickers))
+        crypto = set(crypto_tickers)
+        return tickers, {t: market_of(t, crypto) for t in tickers}
+
+    def _claim(self, settled=()):
+        """
+        티커를 다시 모아 price_cache에 갱신기가 맡는다고 알린다 (네트워크 없음).
+        맡은 티커는 값이 아직 없어도 페이지가 직접 받지 않는다.
+        returns (tickers, markets)
+        """
+        tickers, markets = self._collect()
+        self.cache.manage(tickers, [t for t in settled if t in markets])
+        return tickers, markets
+
+    def _schedule(self, ticker: str, fetched_at: float, now: datetime):
+        """
+        티커 하나의 다음 조회까지 남은 초. 0 이하면 지금 받아야 함.
+        returns (남은 초, 종가까지 받아둔 상태인지)
+        """
+        market = self.markets.get(ticker, "US")
+        ts = now.timestamp()
+        if is_open(market, now):
+            return fetched_at + REFRESH_OPEN - ts, False
+        closed_at = last_close(market, now)
+        settle_at = closed_at.timestamp() + CLOSE_GRACE if closed_at is not None else -math.inf
+        if ts < settle_at:
+            # 막 닫힘: 종가가 확정되면 한 번 받는다
+            return settle_at - ts, False
+        if fetched_at < settle_at:
+            return 0.0, False
+        return next_open(market, now).timestamp() - ts, True
+
+    def _due(self, now: datetime = None):
+        """(지금 받아야 할 티커, 종가까지 받아둔 티커, 다음 바퀴까지 쉴 초)."""
+        now = now or datetime.now(timezone.utc)
+        ts = now.timestamp()
+        ages = self.cache.ages(self.tickers, now=ts)
+        due, settled, wait_for = [], [], REFRESH_IDLE
+        for ticker in self.tickers:
+            left, done = self._schedule(ticker, ts - ages.get(ticker, math.inf), now)
+            # 방금 요청했는데 못 받은 티커는 REFRESH_OPEN 뒤에 다시
+            left = max(left, self._attempted.get(ticker, -math.inf) + REFRESH_OPEN - ts)
+            if done:
+                settled.append(ticker)
+            if left <= 0:
+                due.append(ticker)
+            else:
+                wait_for = min(wait_for, left)
+        return due, settled, wait_for
+
+    # --------------------------------------------------------------------------
+    # 루프
+    # --------------------------------------------------------------------------
+
+    def refresh_once(self) -> float:
+        """한 바퀴: 만기된 티커만 한 번에 받는다. returns 다음 바퀴까지 쉴 시간(초)"""
+        with self._lock:
+            settled = list(self.settled)
+        tickers, markets = self._claim(settled)
+        with self._lock:
+            self.tickers, self.markets = tickers, markets
+        get_usd_krw_rate()  # 환율은 fx 모듈이 FX_TTL / 외환시장 시간으로 알아서 거른다
+
+        due, settled, wait_for = self._due()
+        if due:
+            started = time.time()
+            self._attempted.update((t, started) for t in due)
+            self.cache.store(fetch_price_table(due, budget=PAGE_BUDGET).to_dict())
+            self.refreshed_at = time.time()
+            due, settled, wait_for = self._due()
+        elif self.refreshed_at is None:
+            self.refreshed_at = time.time()
+        with self._lock:
+            self.settled = settled
+        self.cache.manage(tickers, settled)
+        return max(wait_for, REFRESH_MIN_SLEEP)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sleep_for = self.refresh_once()
+            except Exception:
+                logger.warning("Background price refresh failed", exc_info=True)
+                self.cache.manage([])  # 다음 바퀴까지는 페이지가 직접 받는다
+                sleep_for = REFRESH_OPEN
+            self._wake.wait(sleep_for)
+            self._wake.clear()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                # 첫 바퀴 전에 티커를 맡아 두어 페이지가 같은 티커를 따로 받느라 기다리지 않게 한다
+                self._claim()
+                self._thread = threading.Thread(target=self._run, name="price-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self.cache.manage([])
+
+    def wake(self):
+        """티커가 바뀌었을 때 (종목 추가 등) 다음 바퀴를 바로 돌린다."""
+        self._wake.set()
+
+    def snapshot(self) -> dict:
+        """화면 표시용 상태."""
+        with self._lock:
+            tickers, markets = list(self.tickers), dict(self.markets)
+        open_markets = sorted({m for m in markets.values() if is_open(m)})
+        return {"refreshed_at": self.refreshed_at, "tickers": tickers, "open_markets": open_markets,
+                "settled": list(self.settled)}
+
+
+refresher = PriceRefresher()
+
+
+def start_refresher() -> PriceRefresher:
+    """갱신기를 (처음 한 번) 띄운다. 첫 갱신을 기다리지 않고 바로 돌아온다."""
+    return refresher.start()
+
+
+def freshness_text() -> str:
+    """"Prices as of 2026-10-16 14:03:12 (refreshing every 60s: KRX open)" 형태의 안내 문구."""
+    snap = refresher.snapshot()
+    if snap["refreshed_at"] is None:
+        return "Prices are loading in the background."
+    stamp = datetime.fromtimestamp(snap["refreshed_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    if not snap["open_markets"]:
+        return f"Prices as of {stamp} (markets closed: showing last close)"
+    return f"Prices as of {stamp} (refreshing every {REFRESH_OPEN:g}s: {', '.join(snap['open_markets'])} open)"
@@ -0,0 +1,215 @@
+# snapshots.py
+"""
+순자산 스냅샷 기록 (카테고리별 / 주식 계좌별 KRW 합계).
+
+snapshots.bin은 (day, key, krw) 고정 길이 행을 날짜순으로 쌓는 파일이고,
+key 번호 → 이름은 snapshots.keys.json에 둔다. 날짜마다 한 묶음만 두고, 같은 날 다시 기록하면
+그날 묶음을 덮어쓴다 (합계가 바뀌었을 때만). 예전 파일처럼 같은 날 묶음이 여럿이면 그날의 마지막 값을 쓴다.
+기록은 변경이 저장된 뒤(utils.save_assets → record_committed)와 strawberry.py의 --live 평가에서만 한다.
+페이지를 열기만 해서는 기록하지 않는다.
+여러 프로세스(Streamlit, cron의 strawberry.py)가 함께 쓰므로 기록은 snapshots.bin.lock을 잡고 하고,
+key 목록 / 마지막 값은 파일이 바뀌었으면 다시 읽는다.
+타임라인은 이 파일을 메모리 매핑해서 바로 만들므로 과거 가격을 다시 조회하지 않는다.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from profiling import timed_function
+from summary import is_incremental
+from utils import _file_lock
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = os.environ.get("STRAWBERRY_SNAPSHOT_FILE", "snapshots.bin")
+SNAPSHOT_KEYS_FILE = os.path.splitext(SNAPSHOT_FILE)[0] + ".keys.json"
+SNAPSHOT_LOCK_FILE = SNAPSHOT_FILE + ".lock"
+
+ROW_DTYPE = np.dtype([("day", "<i4"), ("key", "<i4"), ("krw", "<f8")])  # day: 1970-01-01부터의 일 수
+
+TOTAL_KEY = "total"
+CATEGORY_LABELS = {
+    "liquid_assets": "Liquid Assets",
+    "receivables_and_deposits": "Savings/Deposits",
+    "stocks": "Stocks",
+    "cryptocurrency": "Cryptocurrency",
+}
+ACCOUNT_PREFIX = "stocks:"  # 주식 계좌별 key = "stocks:<계좌명>"
+
+_lock = threading.Lock()
+_keys = None  # (keys 파일 식별값, 이름 → 번호)
+_last = None  # (snapshots.bin 식별값, 파일의 마지막 {이름: krw})
+
+
+def _stamp(path: str):
+    """파일이 바뀌었는지 보는 식별값 (없으면 None)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _today() -> int:
+    return (date.today() - date(1970, 1, 1)).days
+
+
+def snapshot_values(summary: dict) -> dict:
+    """summary(summary.py 형식)에서 기록할 {key: KRW 금액}."""
+    rate = summary.get("usd_krw", 0)
+    values = {
+        TOTAL_KEY: summary.get("converted_total_krw", 0),
+        "liquid_assets": summary.get("liquid_assets_krw", 0),
+        "receivables_and_deposits": summary.get("receivables_and_deposits_krw", 0),
+        "stocks": summary.get("stocks_krw", 0) + summary.get("stocks_usd", 0) * rate,
+        "cryptocurrency": summary.get("cryptocurrency_krw", 0),
+    }
+    for account_name, acc in summary.get("accounts", {}).get("stocks", {}).items():
+        values[ACCOUNT_PREFIX + account_name] = acc.get("krw", 0) + acc.get("usd", 0) * rate
+    return {k: float(v) for k, v in values.items()}
+
+
+def _significant(values: dict) -> dict:
+    """비교용: 0원인 계좌는 기록이 없는 것과 같게 본다."""
+    return {k: v for k, v in values.items() if v or not k.startswith(ACCOUNT_PREFIX)}
+
+
+def _row_count() -> int:
+    try:
+        return os.path.getsize(SNAPSHOT_FILE) // ROW_DTYPE.itemsize
+    except FileNotFoundError:
+        return 0
+
+
+def _rows() -> np.ndarray:
+    """기록된 모든 행 (읽기 전용 memmap). 끝에 덜 쓰인 행이 있으면 무시."""
+    count = _row_count()
+    if count == 0:
+        return np.empty(0, dtype=ROW_DTYPE)
+    return np.memmap(SNAPSHOT_FILE, dtype=ROW_DTYPE, mode="r", shape=(count,))
+
+
+def _load_keys() -> dict:
+    """이름 → 번호. 다른 프로세스가 keys 파일을 바꿨으면 다시 읽는다."""
+    global _keys
+    stamp = _stamp(SNAPSHOT_KEYS_FILE)
+    if _keys is None or _keys[0] != stamp:
+        try:
+            with open(SNAPSHOT_KEYS_FILE, "r", encoding="utf-8") as f:
+                _keys = (stamp, {name: i for i, name in enumerate(json.load(f))})
+        except FileNotFoundError:
+            _keys = (None, {})
+    return _keys[1]
+
+
+def _load_last() -> dict:
+    """파일에 남아 있는 key별 마지막 값. 그 뒤로 파일이 바뀌었으면 (덧붙이기 / 오늘 묶음 덮어쓰기) 다시 읽는다."""
+    global _last
+    stamp = _stamp(SNAPSHOT_FILE)
+    if _last is None or _last[0] != stamp:
+        rows = _rows()
+        names = {i: name for name, i in _load_keys().items()}
+        last = {}
+        if len(rows):
+            last_day = rows["day"][-1]
+            tail = rows[rows["day"] == last_day]
+            for key, krw in zip(tail["key"], tail["krw"]):
+                if key in names:
+                    last[names[key]] = float(krw)
+        _last = (stamp, _significant(last))
+    return _last[1]
+
+
+@timed_function("record_snapshot")
+def record_snapshot(summary: dict) -> bool:
+    """
+    지금 합계를 오늘 날짜로 기록. 마지막 기록과 같으면 아무것도 쓰지 않고,
+    오늘 이미 기록한 묶음이 있으면 그것을 덮어쓴다 (파일은 하루에 한 묶음만 늘어난다).
+    returns 기록했는지
+    """
+    global _keys, _last
+    values = snapshot_values(summary)
+    with _lock, _file_lock(SNAPSHOT_LOCK_FILE):
+        # 잠금 안에서 파일 기준으로 다시 읽은 key 목록 / 마지막 값과 비교한다
+        last = _load_last()
+        if _significant(values) == last:
+            return False
+        keys = dict(_load_keys())
+        new_names = [name for name in values if name not in keys]
+        if new_names:
+            for name in new_names:
+                keys[name] = len(keys)
+            tmp_path = SNAPSHOT_KEYS_FILE + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(keys), f, ensure_ascii=False)
+            os.replace(tmp_path, SNAPSHOT_KEYS_FILE)
+            _keys = (_stamp(SNAPSHOT_KEYS_FILE), keys)
+
+        # 지금 없는 계좌(삭제됨)는 0으로 남겨 타임라인에서 끊기게 한다
+        for name in last:
+            values.setdefault(name, 0.0)
+        today = _today()
+        rows = np.empty(len(values), dtype=ROW_DTYPE)
+        rows["day"] = today
+        rows["key"] = [keys[name] for name in values]
+        rows["krw"] = list(values.values())
+        # 오늘 묶음이 있으면 그 앞에서부터, 덜 쓰인 행이 남아 있으면 (이전 기록이 중간에 끊김) 행 경계부터 쓴다
+        days = _rows()["day"]
+        keep = len(days)
+        if keep and days[-1] == today:
+            keep = int(np.searchsorted(days, today, side="left"))
+        with open(SNAPSHOT_FILE, "ab") as f:
+            f.truncate(keep * ROW_DTYPE.itemsize)
+            f.write(rows.tobytes())
+        _last = (_stamp(SNAPSHOT_FILE), _significant(values))
+    return True
+
+
+def record_committed(assets: dict) -> bool:
+    """
+    저장이 끝난 문서의 summary를 기록 (utils.save_assets가 부른다). 예전 형식 summary는 건너뛴다.
+    변경은 이미 저장됐으므로 기록에 실패해도 경고만 남긴다. returns 기록했는지
+    """
+    if not is_incremental(assets):
+        return False
+    try:
+        return record_snapshot(assets["summary"])
+    except OSError:
+        logger.warning("Could not record a net worth snapshot", exc_info=True)
+        return False
+
+
+@timed_function("snapshot_timeline")
+def timeline(names: list = None, start: date = None) -> pd.DataFrame:
+    """
+    기록된 스냅샷의 날짜별 값 (그날의 마지막 기록). 기록이 없는 날은 직전 값.
+    names: 볼 key 목록 (기본: 전체 합계)
+    returns DataFrame(index=날짜, columns=names)
+    """
+    names = names or [TOTAL_KEY]
+    keys = _load_keys()
+    codes = [keys[n] for n in names if n in keys]
+    rows = _rows()
+    if start is not None and len(rows):
+        # 날짜순으로 덧붙이므로 이분 탐색으로 잘라낸다
+        rows = rows[np.searchsorted(rows["day"], (start - date(1970, 1, 1)).days, side="left"):]
+    rows = rows[np.isin(rows["key"], codes)]
+    if not len(rows):
+        return pd.DataFrame(columns=names, dtype="float64")
+
+    df = pd.DataFrame({"day": rows["day"], "key": rows["key"], "krw": rows["krw"]})
+    df = df.drop_duplicates(["day", "key"], keep="last").pivot(index="day", columns="key", values="krw")
+    df.index = pd.to_datetime(df.index.to_numpy(dtype="int64"), unit="D")
+    df.columns = [{i: n for n, i in keys.items()}[c] for c in df.columns]
+    days = pd.date_range(df.index[0], max(df.index[-1], pd.Timestamp(date.today())), freq="D")
+    return df.reindex(index=days, columns=[n for n in names if n in df.columns]).ffill()
+
+
+def category_timeline(start: date = None) -> pd.DataFrame:
+    """카테고리별 타임라인 (열 이름은 화면 표시용)."""
+    return timeline(list(CATEGORY_LABELS), start).rename(columns=CATEGORY_LABELS)
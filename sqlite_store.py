@@ -0,0 +1,355 @@
+# sqlite_store.py
+"""
+assets 문서를 SQLite 테이블로 저장하는 백엔드 (STRAWBERRY_STORAGE=sqlite).
+
+- accounts: 입출금/예적금 계좌, 채권/보증금 항목, 주식 계좌, 거래소
+- holdings: 주식 계좌/거래소 안의 종목
+- deposits: 주식 계좌의 원화/달러 예수금
+- tags:     위 행들에 붙은 태그
+- meta:     revision, summary, 카테고리 합계 등 나머지 값 (JSON)
+
+저장은 문서 전체를 다시 쓰지 않고, 읽은 시점과 달라진 행만 한 트랜잭션으로 INSERT/UPDATE/DELETE 한다.
+
+기존 assets.json 가져오기:
+    python sqlite_store.py migrate [assets.json] [assets.db]
+"""
+import argparse
+import json
+import os
+import sqlite3
+
+import journal
+import utils
+from portfolio import DEPOSIT_NAMES
+from utils import StaleAssetsError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    category TEXT NOT NULL,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    amount_krw,
+    extra TEXT,
+    PRIMARY KEY (category, section, position)
+);
+CREATE INDEX IF NOT EXISTS accounts_by_name ON accounts (category, section, name);
+CREATE TABLE IF NOT EXISTS holdings (
+    category TEXT NOT NULL,
+    account TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    symbol TEXT,
+    ticker TEXT,
+    currency TEXT,
+    quantity,
+    extra TEXT,
+    PRIMARY KEY (category, account, position)
+);
+CREATE INDEX IF NOT EXISTS holdings_by_symbol ON holdings (category, account, symbol);
+CREATE INDEX IF NOT EXISTS holdings_by_ticker ON holdings (ticker);
+CREATE TABLE IF NOT EXISTS deposits (
+    account TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    amount,
+    extra TEXT,
+    PRIMARY KEY (account, position)
+);
+CREATE INDEX IF NOT EXISTS deposits_by_currency ON deposits (account, currency);
+CREATE TABLE IF NOT EXISTS tags (
+    owner TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (owner, position)
+);
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+"""
+
+# 테이블별 (키 컬럼, 값 컬럼)
+TABLES = {
+    "meta": (("key",), ("value",)),
+    "accounts": (("category", "section", "position"), ("name", "amount_krw", "extra")),
+    "holdings": (("category", "account", "position"),
+                 ("symbol", "ticker", "currency", "quantity", "extra")),
+    "deposits": (("account", "position"), ("name", "currency", "amount", "extra")),
+    "tags": (("owner", "position"), ("tag",)),
+}
+
+DETAIL_CATEGORIES = ("liquid_assets", "receivables_and_deposits")  # {section: {"details": [...]}}
+LIST_CATEGORIES = ("stocks", "cryptocurrency")  # {account: [...]}
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _extra(item: dict, known) -> str:
+    """컬럼으로 나누지 않은 나머지 키들 (JSON). 빈 tags 목록도 여기에 남겨 그대로 복원되게 한다."""
+    rest = {k: v for k, v in item.items()
+            if k not in known or (k == "tags" and not v)}
+    return _dumps(rest) if rest else None
+
+
+def _add_tags(rows: dict, owner: str, tags):
+    for i, tag in enumerate(tags or []):
+        rows["tags"][(owner, i)] = (tag,)
+
+
+# ------------------------------------------------------------------------------
+# 문서 <-> 행
+# ------------------------------------------------------------------------------
+
+def decompose(doc: dict) -> dict:
+    """문서를 {table: {키 튜플: 값 튜플}}로 분해."""
+    rows = {table: {} for table in TABLES}
+    layout = []  # 최상위 키 순서와 종류
+    for top_key, top_val in doc.items():
+        if top_key in DETAIL_CATEGORIES and isinstance(top_val, dict):
+            parts = []
+            for section, sec_val in top_val.items():
+                if isinstance(sec_val, dict) and isinstance(sec_val.get("details"), list):
+                    parts.append([section, "section", {k: v for k, v in sec_val.items() if k != "details"}])
+                    for pos, entry in enumerate(sec_val["details"]):
+                        rows["accounts"][(top_key, section, pos)] = (
+                            entry.get("name", ""), entry.get("amount_krw"),
+                            _extra(entry, ("name", "amount_krw", "tags")))
+                        if entry.get("tags"):
+                            _add_tags(rows, f"accounts/{top_key}/{section}/{pos}", entry["tags"])
+                else:
+                    parts.append([section, "value", sec_val])
+            layout.append([top_key, "detail_category", parts])
+        elif top_key in LIST_CATEGORIES and isinstance(top_val, dict):
+            parts = []
+            for pos, (account, items) in enumerate(top_val.items()):
+                if not isinstance(items, list):
+                    parts.append([account, "value", items])
+                    continue
+                parts.append([account, "account", None])
+                rows["accounts"][(top_key, "", pos)] = (account, None, None)
+                for i, item in enumerate(items):
+                    if top_key == "stocks" and item.get("name") in DEPOSIT_NAMES:
+                        currency = "KRW" if "amount_krw" in item else "USD"
+                        amount_key = "amount_krw" if currency == "KRW" else "amount_usd"
+                        rows["deposits"][(account, i)] = (
+                            item["name"], currency, item.get(amount_key),
+                            _extra(item, ("name", amount_key, "tags")))
+                        owner = f"deposits/{account}/{i}"
+                    else:
+                        rows["holdings"][(top_key, account, i)] = (
+                            item.get("symbol"), item.get("ticker"), item.get("currency"),
+                            item.get("quantity"),
+                            _extra(item, ("symbol", "ticker", "currency", "quantity", "tags")))
+                        owner = f"holdings/{top_key}/{account}/{i}"
+                    if item.get("tags"):
+                        _add_tags(rows, owner, item["tags"])
+            layout.append([top_key, "list_category", parts])
+        elif top_key == "revision":
+            rows["meta"][("revision",)] = (_dumps(top_val),)
+        else:
+            layout.append([top_key, "value", top_val])
+    rows["meta"][("layout",)] = (_dumps(layout),)
+    return rows
+
+
+def _entry(fields: dict, extra: str, tags) -> dict:
+    entry = {k: v for k, v in fields.items() if v is not None}
+    if extra:
+        entry.update(json.loads(extra))
+    if tags is not None:
+        entry["tags"] = tags
+    return entry
+
+
+def compose(rows: dict) -> dict:
+    """decompose()의 반대: 행들로 문서를 다시 만든다."""
+    tags = {}
+    for (owner, pos), (tag,) in sorted(rows["tags"].items()):
+        tags.setdefault(owner, []).append(tag)
+
+    details = {}
+    account_names = {}
+    for (category, section, pos), (name, amount_krw, extra) in sorted(rows["accounts"].items()):
+        if category in DETAIL_CATEGORIES:
+            entry = {"name": name}
+            if amount_krw is not None:
+                entry["amount_krw"] = amount_krw
+            if extra:
+                entry.update(json.loads(extra))
+            owner = f"accounts/{category}/{section}/{pos}"
+            if owner in tags:
+                entry["tags"] = tags[owner]
+            details.setdefault((category, section), []).append(entry)
+        else:
+            account_names[(category, name)] = []
+
+    for (category, account, pos), (symbol, ticker, currency, quantity, extra) in rows["holdings"].items():
+        item = _entry({"symbol": symbol, "ticker": ticker, "currency": currency, "quantity": quantity},
+                      extra, tags.get(f"holdings/{category}/{account}/{pos}"))
+        account_names.setdefault((category, account), []).append((pos, item))
+    for (account, pos), (name, currency, amount, extra) in rows["deposits"].items():
+        amount_key = "amount_krw" if currency == "KRW" else "amount_usd"
+        item = _entry({"name": name, amount_key: amount}, extra, tags.get(f"deposits/{account}/{pos}"))
+        account_names.setdefault(("stocks", account), []).append((pos, item))
+
+    doc = {}
+    layout = json.loads(rows["meta"][("layout",)][0])
+    for top_key, kind, value in layout:
+        if kind == "detail_category":
+            cat = {}
+            for section, part_kind, part in value:
+                if part_kind == "section":
+                    cat[section] = dict(part)
+                    cat[section]["details"] = details.get((top_key, section), [])
+                else:
+                    cat[section] = part
+            doc[top_key] = cat
+        elif kind == "list_category":
+            cat = {}
+            for account, part_kind, part in value:
+                if part_kind == "account":
+                    items = sorted(account_names.get((top_key, account), []), key=lambda p: p[0])
+                    cat[account] = [item for _, item in items]
+                else:
+                    cat[account] = part
+            doc[top_key] = cat
+        else:
+            doc[top_key] = value
+    if ("revision",) in rows["meta"]:
+        doc["revision"] = json.loads(rows["meta"][("revision",)][0])
+    return doc
+
+
+# ------------------------------------------------------------------------------
+# 읽기 / 쓰기
+# ------------------------------------------------------------------------------
+
+def _read_rows(conn) -> dict:
+    rows = {}
+    for table, (keys, values) in TABLES.items():
+        cols = ", ".join(keys + values)
+        rows[table] = {
+            tuple(r[:len(keys)]): tuple(r[len(keys):])
+            for r in conn.execute(f"SELECT {cols} FROM {table}")
+        }
+    return rows
+
+
+def _revision(conn) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+    return None if row is None else json.loads(row[0])
+
+
+def load(path: str) -> dict:
+    """DB 전체를 문서로. DB가 없거나 비어 있으면 {}."""
+    if not os.path.exists(path):
+        return {}
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN")
+        rows = _read_rows(conn)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    if ("layout",) not in rows["meta"]:
+        return {}
+    doc = compose(rows)
+    doc.setdefault("revision", 0)
+    return doc
+
+
+def _apply_row_diff(conn, old_rows: dict, new_rows: dict):
+    for table, (keys, values) in TABLES.items():
+        old, new = old_rows[table], new_rows[table]
+        where = " AND ".join(f"{k} = ?" for k in keys)
+        gone = [key for key in old if key not in new]
+        if gone:
+            conn.executemany(f"DELETE FROM {table} WHERE {where}", gone)
+        changed = [key + val for key, val in new.items() if old.get(key) != val]
+        if changed:
+            cols = keys + values
+            marks = ", ".join("?" for _ in cols)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(cols)}) VALUES ({marks})", changed)
+
+
+def save(path: str, data: dict, base: dict = None):
+    """
+    data를 한 트랜잭션으로 저장. base(읽은 시점의 문서)가 있으면 그것과 달라진 행만 쓴다.
+    읽은 뒤 다른 세션이 먼저 저장했으면 StaleAssetsError.
+    """
+    revision = data.get("revision", 0)
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            disk_revision = _revision(conn)
+            if disk_revision is not None and disk_revision != revision:
+                raise StaleAssetsError(
+                    "The database was changed by another session. Reload the page and try again."
+                )
+            old_rows = decompose(base) if base is not None else _read_rows(conn)
+            new_rows = decompose(dict(data, revision=revision + 1))
+            _apply_row_diff(conn, old_rows, new_rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    data["revision"] = revision + 1
+
+
+def migrate(json_path: str, db_path: str):
+    """
+    assets.json 파일을 DB로 가져온다 (DB에 있던 내용은 모두 교체).
+    앱이 쓰는 assets.json이면 아직 스냅샷에 합쳐지지 않은 journal 내용까지 반영한다.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    if os.path.abspath(json_path) == os.path.abspath(utils.DATA_FILE):
+        doc.setdefault("revision", 0)
+        for entry in journal.read_entries(utils.JOURNAL_FILE):
+            if entry["rev"] > doc["revision"]:
+                journal.apply_ops(doc, entry["ops"])
+                doc["revision"] = entry["rev"]
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for table in TABLES:
+            conn.execute(f"DELETE FROM {table}")
+        empty = {table: {} for table in TABLES}
+        _apply_row_diff(conn, empty, decompose(doc))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite storage backend tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="import an assets.json file into the database")
+    mig.add_argument("json_path", nargs="?", default="assets.json")
+    mig.add_argument("db_path", nargs="?", default="assets.db")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        doc = migrate(args.json_path, args.db_path)
+        print(f"Imported {args.json_path} (revision {doc.get('revision', 0)}) into {args.db_path}.")
+
+
+if __name__ == "__main__":
+    main()
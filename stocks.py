@@ -0,0 +1,184 @@
+# stocks.py
+"""
+주식 계좌(stocks) 변경 함수: 매수 / 매도 / 예수금 입출금 / 환전.
+
+반환값은 페이지에서 쓰던 그대로: 성공 True / "ok", 실패 False / "insufficient" (+ 매수/매도의 "no_deposit").
+summary는 apply_delta로, 매수 lot / 실현손익은 cost_basis로 함께 맞춘다.
+"""
+from cost_basis import DEFAULT_COST_METHOD, record_buy, record_sell
+from portfolio import Portfolio
+from summary import apply_delta, marked_value
+
+
+def buy_stock(portfolio: Portfolio, account_name: str, symbol: str, quantity: float, price: float,
+              ticker: str = "", currency: str = "KRW", tags: list = None, method: str = None):
+    """
+    price × quantity를 그 통화 예수금에서 빼고 종목 수량을 늘린다 (없는 종목이면 새로 추가).
+    기존 종목이면 ticker / currency / tags / method는 무시하고 그 종목의 것을 쓴다.
+    price > 0이면 cost_basis에 매수 lot으로 남긴다.
+    returns "ok" | "insufficient" | "no_deposit" | False (계좌 없음)
+    """
+    assets = portfolio.assets
+    stocks_data = assets["stocks"]
+    if not portfolio.has_stock_account(account_name):
+        return False
+    item = portfolio.find_holding(account_name, symbol)
+    if item is not None:
+        currency = item.get("currency", "USD")
+
+    deposit = portfolio.deposit_item(account_name, currency)
+    if deposit is None:
+        return "no_deposit"
+    cost_amount = price * quantity
+    if currency == "KRW":
+        if deposit["amount_krw"] < cost_amount:
+            return "insufficient"
+        deposit["amount_krw"] -= cost_amount
+        stocks_data["total_krw"] -= cost_amount
+        apply_delta(assets, "stocks", account_name, krw=-cost_amount)
+    else:
+        if deposit["amount_usd"] < cost_amount:
+            return "insufficient"
+        deposit["amount_usd"] -= cost_amount
+        stocks_data["total_usd"] -= cost_amount
+        apply_delta(assets, "stocks", account_name, usd=-cost_amount)
+
+    if item is None:
+        item = {
+            "symbol": symbol,
+            "ticker": ticker,
+            "currency": currency,
+            "quantity": 0,
+            "tags": tags if tags is not None else ["#Investment Assets"],
+            "cost_method": method or DEFAULT_COST_METHOD,
+        }
+        portfolio.add_holding(account_name, item)
+    if price > 0:
+        record_buy(item, quantity, price)
+    item["quantity"] += quantity
+    pos_krw, pos_usd = marked_value(assets, item, quantity)
+    apply_delta(assets, "stocks", account_name, krw=pos_krw, usd=pos_usd)
+    return "ok"
+
+
+def sell_stock(portfolio: Portfolio, account_name: str, symbol: str, quantity: float, price: float):
+    """
+    종목 수량을 줄이고 price × quantity를 그 통화 예수금에 더한다. 실현손익은 종목의 "realized"에 쌓인다.
+    returns "ok" | "insufficient" (보유 수량 부족) | "no_deposit" | False (계좌/종목 없음)
+    """
+    assets = portfolio.assets
+    stocks_data = assets["stocks"]
+    if not portfolio.has_stock_account(account_name):
+        return False
+    item = portfolio.find_holding(account_name, symbol)
+    if item is None:
+        return False
+    if quantity > item["quantity"]:
+        return "insufficient"
+    deposit = portfolio.deposit_item(account_name, "KRW" if item["currency"] == "KRW" else "USD")
+    if deposit is None:
+        return "no_deposit"
+
+    record_sell(item, quantity, price)
+    item["quantity"] -= quantity
+    proceed = price * quantity
+    pos_krw, pos_usd = marked_value(assets, item, quantity)
+    apply_delta(assets, "stocks", account_name, krw=-pos_krw, usd=-pos_usd)
+    if item["currency"] == "KRW":
+        deposit["amount_krw"] += proceed
+        stocks_data["total_krw"] += proceed
+        apply_delta(assets, "stocks", account_name, krw=proceed)
+    else:
+        deposit["amount_usd"] += proceed
+        stocks_data["total_usd"] += proceed
+        apply_delta(assets, "stocks", account_name, usd=proceed)
+    return "ok"
+
+
+def deposit_stock_account(portfolio: Portfolio, account_name: str, currency: str, amount: float) -> bool:
+    assets = portfolio.assets
+    stocks_data = assets["stocks"]
+    if not portfolio.has_stock_account(account_name):
+        return False
+    item = portfolio.deposit_item(account_name, currency)
+    if item is None:
+        return False
+    if currency == "KRW":
+        item["amount_krw"] += amount
+        stocks_data["total_krw"] += amount
+        apply_delta(assets, "stocks", account_name, krw=amount)
+    else:
+        item["amount_usd"] += amount
+        stocks_data["total_usd"] += amount
+        apply_delta(assets, "stocks", account_name, usd=amount)
+    return True
+
+def withdraw_stock_account(portfolio: Portfolio, account_name: str, currency: str, amount: float):
+    assets = portfolio.assets
+    stocks_data = assets["stocks"]
+    if not portfolio.has_stock_account(account_name):
+        return False
+    item = portfolio.deposit_item(account_name, currency)
+    if item is None:
+        return False
+
+    if currency == "KRW":
+        if item["amount_krw"] < amount:
+            return "insufficient"
+        item["amount_krw"] -= amount
+        stocks_data["total_krw"] -= amount
+        apply_delta(assets, "stocks", account_name, krw=-amount)
+    else:  # USD
+        if item["amount_usd"] < amount:
+            return "insufficient"
+        item["amount_usd"] -= amount
+        stocks_data["total_usd"] -= amount
+        apply_delta(assets, "stocks", account_name, usd=-amount)
+    return "ok"
+
+def exchange_currency(portfolio: Portfolio, account_name: str, from_cur: str, to_cur: str, from_amt: float, to_amt: float):
+    """
+    환전 로직:
+    - from_cur 예수금 -= from_amt
+    - to_cur 예수금 += to_amt
+    """
+    assets = portfolio.assets
+    stocks_data = assets["stocks"]
+    if not portfolio.has_stock_account(account_name):
+        return False
+
+    if from_cur not in ["KRW", "USD"] or to_cur not in ["KRW", "USD"]:
+        return False
+    if from_cur == to_cur:
+        return False
+
+    from_item = portfolio.deposit_item(account_name, from_cur)
+    to_item = portfolio.deposit_item(account_name, to_cur)
+    if from_item is None or to_item is None:
+        return False
+
+    # from
+    if from_cur == "KRW":
+        if from_item["amount_krw"] < from_amt:
+            return "insufficient"
+        from_item["amount_krw"] -= from_amt
+        stocks_data["total_krw"] -= from_amt
+        apply_delta(assets, "stocks", account_name, krw=-from_amt)
+    else:
+        if from_item["amount_usd"] < from_amt:
+            return "insufficient"
+        from_item["amount_usd"] -= from_amt
+        stocks_data["total_usd"] -= from_amt
+        apply_delta(assets, "stocks", account_name, usd=-from_amt)
+
+    # to
+    if to_cur == "KRW":
+        to_item["amount_krw"] += to_amt
+        stocks_data["total_krw"] += to_amt
+        apply_delta(assets, "stocks", account_name, krw=to_amt)
+    else:
+        to_item["amount_usd"] += to_amt
+        stocks_data["total_usd"] += to_amt
+        apply_delta(assets, "stocks", account_name, usd=to_amt)
+
+    return "ok"
@@ -0,0 +1,258 @@
+# strawberry.py
+"""
+Streamlit 없이 쓰는 명령줄 도구 (cron 등).
+
+    ./strawberry value                              # = python strawberry.py value (실행 파일 strawberry, PATH에 링크해서 써도 됨)
+    python strawberry.py value                      # 저장된 summary 합계 (가격 조회 없음, 예전 형식이면 아래 참고)
+    python strawberry.py value --live --json        # 가격/환율을 받아 다시 평가한 합계 (평가 결과는 저장하지 않음)
+    python strawberry.py deposit liquid Checking "Main" 100000
+    python strawberry.py withdraw stock "Broker" USD 500
+    python strawberry.py buy "Broker" Apple 2 180 --ticker AAPL --currency USD
+    python strawberry.py sell "Broker" Apple 1 190
+    python strawberry.py export --format csv --output positions.csv
+
+변경 명령은 batch.Batch로 한 단계짜리 batch를 만들어 commit한다 (페이지 / Staged Changes와 같은 함수, 한 번 저장).
+pandas / yfinance / numpy는 쓰는 명령 안에서만 import한다 → value(저장된 값)는 utils + summary만 읽는다.
+(그 아래 profiling / utils / journal도 logging, shutil, tempfile 같은 무거운 표준 모듈은 쓰는 곳에서 import한다)
+예전 형식의 summary는 변경 명령이 고치지 않으므로, value는 가격이 필요 없는 합계를 문서에서 다시 계산하고
+주식 종목은 빼고 보여준다 (stderr에 안내. value --live를 한 번 실행하면 변환된다).
+"""
+import argparse
+import json
+import os
+import sys
+
+# value에서 보여주는 summary 항목 (키, 표시 이름, 통화)
+VALUE_ROWS = [
+    ("converted_total_krw", "Combined total", "KRW"),
+    ("total_krw_without_usd", "Total (KRW)", "KRW"),
+    ("total_usd", "Total (USD)", "USD"),
+    ("liquid_assets_krw", "Liquid assets", "KRW"),
+    ("receivables_and_deposits_krw", "Receivables and deposits", "KRW"),
+    ("stocks_krw", "Stocks (KRW)", "KRW"),
+    ("stocks_usd", "Stocks (USD)", "USD"),
+    ("cryptocurrency_usd", "Cryptocurrency", "USD"),
+    ("usd_krw", "USD/KRW", None),
+]
+
+# (명령, 대상) → batch 단계 이름
+DEPOSIT_OPS = {
+    ("deposit", "liquid"): "liquid_deposit",
+    ("withdraw", "liquid"): "liquid_withdraw",
+    ("deposit", "receivable"): "rd_loan_out",
+    ("withdraw", "receivable"): "rd_repay",
+    ("deposit", "stock"): "stock_deposit",
+    ("withdraw", "stock"): "stock_withdraw",
+}
+
+
+def _fail(message: str):
+    print(message, file=sys.stderr)
+    sys.exit(1)
+
+
+def _format(value: float, currency: str) -> str:
+    if currency == "KRW":
+        return f"₩ {int(value):,}"
+    if currency == "USD":
+        return f"$ {value:,.2f}"
+    return f"{value:,.2f}"
+
+
+def live_refresh(assets: dict):
+    """
+    Home과 같은 순서로 가격 / 환율 / 코인을 받아 summary를 갱신한다 (예전 형식을 변환했을 때만 저장).
+    returns (prices, rate, crypto_valuation)
+    """
+    from crypto import collect_symbols, default_source, value_crypto
+    from fx import get_usd_krw_rate
+    from quotes import cached_price_table, collect_tickers, fetch_stock_prices
+    from snapshots import record_snapshot
+    from summary import is_incremental, refresh_summary
+    from utils import StaleAssetsError, save_assets
+
+    rate = get_usd_krw_rate()
+    crypto_source = default_source()
+    crypto_data = assets.get("cryptocurrency", {})
+    cached_price_table(collect_tickers(assets.get("stocks", {}))
+                       + crypto_source.tickers(collect_symbols(crypto_data)))
+    prices, _ = fetch_stock_prices(assets.get("stocks", {}))
+    crypto_valuation = value_crypto(crypto_data, rate, crypto_source)
+    if assets:
+        if refresh_summary(assets, prices, rate, crypto_valuation):
+            try:
+                save_assets(assets)
+            except StaleAssetsError:
+                print("Assets were changed by another session; the converted summary was not saved.",
+                      file=sys.stderr)
+        if is_incremental(assets):
+            record_snapshot(assets["summary"])
+    return prices, rate, crypto_valuation
+
+
+def cmd_value(args):
+    from summary import empty_summary, is_incremental, rebuild_summary
+    from utils import load_assets
+
+    assets = load_assets()
+    if args.live:
+        live_refresh(assets)
+    elif assets and not is_incremental(assets):
+        # 저장된 값(없을 수도 있음)은 변경 명령이 고치지 않았다 → 저장하지 않고 가격 없이 다시 계산
+        rebuild_summary(assets, {}, assets.get("summary", {}).get("usd_krw", 0))
+        print("The stored summary is in the old format; stock holdings are left out. "
+              "Run 'value --live' once to value them and convert the summary.", file=sys.stderr)
+    summary = assets.get("summary") or empty_summary()
+
+    if args.json:
+        print(json.dumps({key: summary.get(key, 0) for key, _, _ in VALUE_ROWS}, ensure_ascii=False))
+        return
+    for key, label, currency in VALUE_ROWS:
+        print(f"{label:<26} {_format(summary.get(key, 0), currency)}")
+
+
+def cmd_export(args):
+    from utils import load_assets
+    from valuation import value_positions
+
+    assets = load_assets()
+    if args.live:
+        prices, rate, crypto_valuation = live_refresh(assets)
+        positions = value_positions(assets, prices, rate, crypto_valuation["positions"])
+    else:
+        # 저장된 summary의 마지막 평가 가격(marks) / 환율로 평가 (코인은 --live일 때만)
+        summary = assets.get("summary", {})
+        positions = value_positions(assets, summary.get("marks", {}), summary.get("usd_krw", 0))
+
+    out = args.output or sys.stdout
+    if args.format == "json":
+        positions.to_json(out, orient="records", force_ascii=False)
+        if out is sys.stdout:
+            print()
+    else:
+        positions.to_csv(out, index=False)
+
+
+def _commit(op: str, **kwargs):
+    """한 단계짜리 batch를 저장. 실패하면 이유를 stderr에 쓰고 종료 코드 1."""
+    from batch import Batch
+    from utils import StaleAssetsError
+
+    batch = Batch()
+    batch.add(op, **kwargs)
+    try:
+        failures = batch.commit()
+    except StaleAssetsError:
+        _fail("Assets were changed by another session. Try again.")
+    for _, op, result in failures:
+        reason = result if isinstance(result, str) else "not found"
+        _fail(f"{Batch.describe(op, kwargs)} failed: {reason}")
+    print(f"Saved: {Batch.describe(op, kwargs)}")
+
+
+def cmd_move(args):
+    op = DEPOSIT_OPS[(args.command, args.target)]
+    if args.target == "liquid":
+        _commit(op, acct_type=args.kind, acct_name=args.name, amount=int(args.amount))
+    elif args.target == "receivable":
+        kwargs = {"rd_type": args.kind, "rd_name": args.name, "amount": int(args.amount)}
+        if args.command == "deposit":
+            kwargs["tags"] = args.tag
+        _commit(op, **kwargs)
+    else:
+        _commit(op, account_name=args.account, currency=args.currency, amount=args.amount)
+
+
+def cmd_exchange(args):
+    to_cur = "KRW" if args.from_cur == "USD" else "USD"
+    _commit("stock_exchange", account_name=args.account, from_cur=args.from_cur, to_cur=to_cur,
+            from_amt=args.from_amt, to_amt=args.to_amt)
+
+
+def cmd_buy(args):
+    _commit("stock_buy", account_name=args.account, symbol=args.symbol, quantity=args.quantity,
+            price=args.price, ticker=args.ticker, currency=args.currency, tags=args.tag,
+            method=args.method)
+
+
+def cmd_sell(args):
+    _commit("stock_sell", account_name=args.account, symbol=args.symbol, quantity=args.quantity,
+            price=args.price)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # 선택지는 portfolio.SECTION_KEYS와 같게 둔다 (import 비용 없이 --help가 뜨도록 복사)
+    liquid_kinds = ["Checking", "Savings", "Installment"]
+    rd_kinds = ["Receivables", "Deposits"]
+    currencies = ["KRW", "USD"]
+
+    parser = argparse.ArgumentParser(prog="strawberry", description="Strawberry asset tracker (headless)")
+    parser.add_argument("--data-dir", default=".", help="directory holding assets.json / assets.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    value = sub.add_parser("value", help="print the stored totals")
+    value.add_argument("--live", action="store_true", help="fetch prices / FX first and print the revalued totals")
+    value.add_argument("--json", action="store_true", help="print one JSON object")
+    value.set_defaults(func=cmd_value)
+
+    export = sub.add_parser("export", help="write the positions table")
+    export.add_argument("--format", choices=["csv", "json"], default="csv")
+    export.add_argument("--output", help="file path (default: stdout)")
+    export.add_argument("--live", action="store_true",
+                        help="value with fresh prices (and include crypto) instead of the stored marks")
+    export.set_defaults(func=cmd_export)
+
+    for command in ("deposit", "withdraw"):
+        move = sub.add_parser(command, help=f"{command} cash")
+        targets = move.add_subparsers(dest="target", required=True)
+        liquid = targets.add_parser("liquid", help="checking / savings / installment account")
+        liquid.add_argument("kind", choices=liquid_kinds)
+        liquid.add_argument("name")
+        liquid.add_argument("amount", type=float)
+        rd = targets.add_parser("receivable", help="receivable / deposit entry")
+        rd.add_argument("kind", choices=rd_kinds)
+        rd.add_argument("name")
+        rd.add_argument("amount", type=float)
+        if command == "deposit":
+            rd.add_argument("--tag", action="append", default=[], help="tags for a new entry (repeatable)")
+        stock = targets.add_parser("stock", help="stock account cash deposit")
+        stock.add_argument("account")
+        stock.add_argument("currency", choices=currencies)
+        stock.add_argument("amount", type=float)
+        move.set_defaults(func=cmd_move)
+
+    exchange = sub.add_parser("exchange", help="exchange KRW <-> USD inside a stock account")
+    exchange.add_argument("account")
+    exchange.add_argument("from_cur", choices=currencies)
+    exchange.add_argument("from_amt", type=float)
+    exchange.add_argument("to_amt", type=float, help="resulting amount in the other currency")
+    exchange.set_defaults(func=cmd_exchange)
+
+    buy = sub.add_parser("buy", help="buy shares with the account's cash deposit")
+    buy.add_argument("account")
+    buy.add_argument("symbol")
+    buy.add_argument("quantity", type=float)
+    buy.add_argument("price", type=float, help="per share price")
+    buy.add_argument("--ticker", default="", help="for a new holding (e.g. AAPL, 005930.KS)")
+    buy.add_argument("--currency", choices=currencies, default="KRW", help="for a new holding")
+    buy.add_argument("--tag", action="append", default=None, help="for a new holding (repeatable)")
+    buy.add_argument("--method", choices=["fifo", "average"], help="cost basis method for a new holding")
+    buy.set_defaults(func=cmd_buy)
+
+    sell = sub.add_parser("sell", help="sell shares into the account's cash deposit")
+    sell.add_argument("account")
+    sell.add_argument("symbol")
+    sell.add_argument("quantity", type=float)
+    sell.add_argument("price", type=float, help="per share price")
+    sell.set_defaults(func=cmd_sell)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.chdir(args.data_dir)  # 저장 파일 경로는 모두 현재 디렉터리 기준
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# summary.py
+"""
+assets["summary"]를 증분(delta) 방식으로 유지하는 모듈.
+
+모든 변경 함수는 전체를 다시 계산하지 않고 apply_delta()로 바뀐 금액만 반영한다.
+주식은 summary["marks"]에 기록된 가격(마지막으로 평가한 가격)으로 평가되어 있고,
+revalue()는 가격이 바뀐 종목만 차액을 반영한다.
+가격 재평가 결과(marks 포함)는 저장하지 않는다 (refresh_summary, 프로세스 캐시).
+저장된 summary의 marks는 변환하거나 변경 함수가 저장할 때의 값이다.
+
+불변식: summary의 주식 합계 = 예수금 + Σ 수량 × unit_value(marks[ticker], summary["usd_krw"])
+"""
+import marshal
+import math
+import threading
+
+from profiling import timed_function
+from portfolio import DEPOSIT_NAMES, is_krw_quoted, iter_stock_accounts
+
+CATEGORY_KEYS = {
+    # category: (KRW 합계 키, USD 합계 키)
+    "liquid_assets": ("liquid_assets_krw", None),
+    "receivables_and_deposits": ("receivables_and_deposits_krw", None),
+    "stocks": ("stocks_krw", "stocks_usd"),
+    "cryptocurrency": (None, "cryptocurrency_usd"),
+}
+
+# 가격으로 다시 평가한 summary는 저장하지 않고 프로세스에만 둔다: 문서 식별값 → (marshal된 summary, 코인 합계)
+_live = {}
+_live_lock = threading.Lock()
+
+
+def empty_summary() -> dict:
+    return {
+        "liquid_assets_krw": 0,
+        "receivables_and_deposits_krw": 0,
+        "stocks_krw": 0,
+        "stocks_usd": 0,
+        "cryptocurrency_krw": 0,
+        "cryptocurrency_usd": 0,
+        "total_krw_without_usd": 0,
+        "total_usd": 0,
+        "converted_total_krw": 0,
+        "usd_krw": 0,
+        "accounts": {"stocks": {}},
+        "marks": {},
+    }
+
+
+def is_incremental(assets: dict) -> bool:
+    """summary가 이 모듈의 형식(계좌별 합계 + marks)으로 관리되고 있는지."""
+    summary = assets.get("summary", {})
+    return "accounts" in summary and "marks" in summary
+
+
+def _refresh_converted(summary: dict):
+    rate = summary.get("usd_krw", 0)
+    summary["cryptocurrency_krw"] = summary["cryptocurrency_usd"] * rate
+    summary["converted_total_krw"] = summary["total_krw_without_usd"] + summary["total_usd"] * rate
+
+
+def apply_delta(assets: dict, category: str, account: str = None, krw: float = 0.0, usd: float = 0.0):
+    """
+    category(와 account)의 합계에 krw / usd 변화량을 반영. O(1).
+    account는 summary["accounts"][category]에 계좌별 합계를 두는 카테고리(stocks)에만 사용.
+    """
+    if not is_incremental(assets):
+        return
+    summary = assets["summary"]
+    krw_key, usd_key = CATEGORY_KEYS[category]
+    if krw:
+        summary[krw_key] += krw
+        summary["total_krw_without_usd"] += krw
+    if usd:
+        summary[usd_key] += usd
+        summary["total_usd"] += usd
+    if account is not None:
+        acc = summary["accounts"].setdefault(category, {}).setdefault(account, {"krw": 0, "usd": 0})
+        acc["krw"] += krw
+        acc["usd"] += usd
+    _refresh_converted(summary)
+
+
+def add_account(assets: dict, category: str, account: str):
+    if is_incremental(assets):
+        assets["summary"]["accounts"].setdefault(category, {})[account] = {"krw": 0, "usd": 0}
+
+
+def remove_account(assets: dict, category: str, account: str):
+    """계좌를 지울 때 그 계좌의 합계를 카테고리/전체 합계에서 뺀다."""
+    if not is_incremental(assets):
+        return
+    acc = assets["summary"]["accounts"].get(category, {}).get(account)
+    if acc is None:
+        return
+    apply_delta(assets, category, krw=-acc["krw"], usd=-acc["usd"])
+    del assets["summary"]["accounts"][category][account]
+
+
+def unit_value(item: dict, price: float, rate: float):
+    """
+    종목 1주의 평가액을 (krw, usd)로.
+    KRW로 표시하는 종목 중 원화 시세가 아닌 것(portfolio.is_krw_quoted)은 USD 시세 × 환율.
+    """
+    if price is None or math.isnan(price):
+        price = 0.0
+    currency = item.get("currency", "USD")
+    if currency == "KRW":
+        if is_krw_quoted(currency, item.get("ticker", "")):
+            return price, 0.0
+        return price * rate, 0.0
+    return 0.0, price
+
+
+def marked_value(assets: dict, item: dict, quantity: float):
+    """summary에 기록된 mark 가격 기준으로 quantity주의 평가액 (krw, usd)."""
+    if not is_incremental(assets):
+        return 0.0, 0.0
+    summary = assets["summary"]
+    price = summary["marks"].get(item.get("ticker", ""), 0.0)
+    krw, usd = unit_value(item, price, summary.get("usd_krw", 0))
+    return krw * quantity, usd * quantity
+
+
+@timed_function("rebuild_summary")
+def rebuild_summary(assets: dict, prices, rate: float):
+    """
+    summary 전체를 처음부터 다시 계산 (O(전체)). 예전 형식의 파일을 처음 열 때 한 번만 쓴다.
+    prices: 티커별 가격 (dict 또는 pd.Series)
+    """
+    summary = empty_summary()
+    summary["usd_krw"] = rate
+    assets["summary"] = summary
+
+    liquid = assets.get("liquid_assets", {}).get("total_krw", 0)
+    rd = assets.get("receivables_and_deposits", {}).get("total_krw", 0)
+    apply_delta(assets, "liquid_assets", krw=liquid)
+    apply_delta(assets, "receivables_and_deposits", krw=rd)
+    apply_delta(assets, "cryptocurrency", usd=assets.get("cryptocurrency", {}).get("total_usd", 0))
+
+    for account_name, holdings in iter_stock_accounts(assets.get("stocks", {})):
+        add_account(assets, "stocks", account_name)
+        for item in holdings:
+            if item.get("name") in DEPOSIT_NAMES:
+                apply_delta(assets, "stocks", account_name,
+                            krw=item.get("amount_krw", 0), usd=item.get("amount_usd", 0))
+                continue
+            ticker = item.get("ticker", "")
+            price = prices.get(ticker, math.nan) if ticker else math.nan
+            if ticker and not math.isnan(price):
+                summary["marks"][ticker] = float(price)
+            krw, usd = marked_value(assets, item, item.get("quantity", 0.0))
+            apply_delta(assets, "stocks", account_name, krw=krw, usd=usd)
+    return summary
+
+
+@timed_function("revalue")
+def revalue(assets: dict, prices, rate: float) -> int:
+    """
+    가격(또는 환율)이 바뀐 종목만 다시 평가해서 차액을 반영.
+    가격을 못 받은(NaN) 종목은 기존 mark를 유지한다.
+    returns 다시 평가한 종목(티커) 수
+    """
+    summary = assets["summary"]
+    marks = summary["marks"]
+    old_rate = summary.get("usd_krw", 0)
+    rate_changed = rate != old_rate
+
+    # 바뀐 티커만 추림
+    changed = {}
+    for ticker, price in prices.items():
+        if price is None or math.isnan(price):
+            continue
+        if marks.get(ticker) != price:
+            changed[ticker] = float(price)
+    if not changed and not rate_changed:
+        return 0
+
+    revalued = set()
+    for account_name, holdings in iter_stock_accounts(assets.get("stocks", {})):
+        for item in holdings:
+            if item.get("name") in DEPOSIT_NAMES:
+                continue
+            ticker = item.get("ticker", "")
+            currency = item.get("currency", "USD")
+            needs_rate = currency == "KRW" and not is_krw_quoted(currency, ticker)
+            if ticker not in changed and not (rate_changed and needs_rate):
+                continue
+            qty = item.get("quantity", 0.0)
+            old_krw, old_usd = unit_value(item, marks.get(ticker, 0.0), old_rate)
+            new_krw, new_usd = unit_value(item, changed.get(ticker, marks.get(ticker, 0.0)), rate)
+            apply_delta(assets, "stocks", account_name,
+                        krw=(new_krw - old_krw) * qty, usd=(new_usd - old_usd) * qty)
+            revalued.add(ticker)
+
+    marks.update(changed)
+    summary["usd_krw"] = rate
+    _refresh_converted(summary)
+    return len(revalued | set(changed))
+
+
+def _live_key(assets: dict) -> tuple:
+    """저장된 문서 식별값: revision + 저장된 합계 (다른 파일의 같은 revision과 섞이지 않도록)."""
+    summary = assets["summary"]
+    return (assets.get("revision", 0), summary["converted_total_krw"], summary["usd_krw"], len(summary["marks"]))
+
+
+def refresh_summary(assets: dict, prices, rate: float, crypto_valuation: dict = None) -> bool:
+    """
+    새 가격/환율(+ crypto.value_crypto 결과)로 summary를 맞춘다. 예전 형식이면 처음부터 다시 계산, 아니면 revalue.
+    가격 재평가는 저장하지 않는다. 같은 문서(_live_key)를 다시 열면 이 프로세스에서 마지막으로 평가한
+    summary / 코인 합계(_live)에서 이어서 바뀐 종목만 다시 평가한다.
+    returns 저장이 필요한지 (예전 형식을 변환했을 때만)
+    """
+    from crypto import sync_valuation  # crypto가 이 모듈을 import하므로 여기서
+
+    if not is_incremental(assets):
+        rebuild_summary(assets, prices, rate)
+        if crypto_valuation is not None:
+            sync_valuation(assets, crypto_valuation)
+        return True
+
+    key = _live_key(assets)
+    crypto_data = assets.get("cryptocurrency")
+    with _live_lock:
+        cached = _live.get(key)
+    if cached is not None:
+        assets["summary"] = marshal.loads(cached[0])
+        if crypto_data is not None:
+            crypto_data["total_usd"] = cached[1]
+    if crypto_valuation is not None:
+        sync_valuation(assets, crypto_valuation)
+    revalue(assets, prices, rate)
+    with _live_lock:
+        _live.clear()
+        _live[key] = (marshal.dumps(assets["summary"]),
+                      crypto_data.get("total_usd", 0) if crypto_data is not None else 0)
+    return False
@@ -1,19 +1,289 @@
 # utils.py
 import json
+import marshal
 import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 
-DATA_FILE = "assets.json"  # JSON 파일 경로
+import journal
+from profiling import timed_function
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 저장소 종류: "json" (assets.json + journal) 또는 "sqlite" (assets.db, sqlite_store.py)
+STORAGE_BACKEND = os.environ.get("STRAWBERRY_STORAGE", "json")
+DB_FILE = "assets.db"  # sqlite 백엔드용 DB 파일
+
+DATA_FILE = "assets.json"  # JSON 파일 경로 (스냅샷)
+JOURNAL_FILE = "assets.journal.jsonl"  # 스냅샷 이후의 변경 기록 (한 줄 = 저장 한 번)
+JOURNAL_ARCHIVE_DIR = "journal_archive"  # compaction 때 옮겨둔 예전 스냅샷 + 변경 기록
+LOCK_FILE = DATA_FILE + ".lock"  # 동시에 저장하지 않도록 잡는 잠금 파일
+
+# STRAWBERRY_COMPACT_JSON=1 → 들여쓰기 없이 저장 (파일 크기/저장 시간 절약)
+COMPACT_JSON = os.environ.get("STRAWBERRY_COMPACT_JSON", "0") == "1"
+# journal이 이만큼 쌓이면 다음 저장 때 스냅샷을 새로 쓰고 journal은 보관함으로 옮긴다
+COMPACT_EVERY = int(os.environ.get("STRAWBERRY_COMPACT_EVERY", "200"))
+
+# 마지막으로 읽거나 쓴 파일들의 식별값 → (revision, journal 항목 수).
+# 파일이 그대로면 다시 파싱하지 않고 revision과 문서를 알 수 있다.
+_known_state = {}
+# revision → 그 시점 문서 (marshal로 직렬화, json 파싱이나 깊은 복사보다 빠르게 되살릴 수 있다).
+# 저장할 때 바뀐 부분(diff)만 journal에 쓰기 위한 기준이자, load_assets의 캐시.
+_bases = OrderedDict()
+_MAX_BASES = 16
+# load_assets 캐시 통계 (load_stats())
+_stats = {"loads": 0, "hits": 0, "misses": 0, "last_ms": 0.0, "total_ms": 0.0}
+
+
+class StaleAssetsError(Exception):
+    """다른 세션(탭)이 먼저 저장해서, 지금 저장하면 그 변경을 덮어쓰게 되는 경우."""
+
+
+# 페이지에서 StaleAssetsError를 만났을 때 보여주는 안내
+STALE_MESSAGE = "Assets were changed by another session. Reload the page and try again."
+
+
+@contextmanager
+def _file_lock(path: str = LOCK_FILE):
+    """path(기본 LOCK_FILE)에 대한 배타적 잠금 (프로세스/스레드 간)."""
+    with open(path, "a+b") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _fingerprint(path: str):
+    """
+    파일 식별값 (없으면 None).
+    os.replace로 저장할 때마다 inode가 바뀌므로 mtime 해상도가 낮아도 구분된다.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _fingerprints():
+    return _fingerprint(DATA_FILE), _fingerprint(JOURNAL_FILE)
+
+
+def _remember_base(data: dict):
+    """그 revision 문서의 복사본을 기억 (다음 저장 때 diff 기준)."""
+    _bases[data["revision"]] = marshal.dumps(data)
+    _bases.move_to_end(data["revision"])
+    while len(_bases) > _MAX_BASES:
+        _bases.popitem(last=False)
+
+
+def _base(revision):
+    """기억해 둔 그 revision 문서의 새 복사본. 없으면 None."""
+    blob = _bases.get(revision)
+    return marshal.loads(blob) if blob is not None else None
+
+
+def _remember(data: dict, journal_len: int):
+    """지금 파일 상태와 그 문서의 복사본을 기억 (잠금 안에서 호출)."""
+    _known_state.clear()
+    _known_state[_fingerprints()] = (data["revision"], journal_len)
+    _remember_base(data)
+
+
+def _read_state():
+    """스냅샷 + journal을 읽어 현재 문서를 만든다 (잠금 안에서 호출). returns (data, journal 항목 수)"""
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data.setdefault("revision", 0)
+    entries = journal.read_entries(JOURNAL_FILE)
+    for entry in entries:
+        # 스냅샷에 이미 들어간 항목(compaction 도중 종료된 경우)은 건너뜀
+        if entry["rev"] <= data["revision"]:
+            continue
+        journal.apply_ops(data, entry["ops"])
+        data["revision"] = entry["rev"]
+    _remember(data, len(entries))
+    return data, len(entries)
+
+
+def _disk_state():
+    """현재 파일의 (revision, journal 항목 수). 파일이 없으면 (None, 0)."""
+    if not os.path.exists(DATA_FILE):
+        return None, 0
+    state = _known_state.get(_fingerprints())
+    if state is not None:
+        return state
+    data, journal_len = _read_state()
+    return data["revision"], journal_len
+
+
+def _write_snapshot(data: dict, archive_as: int = None):
+    """
+    임시 파일에 다 쓴 뒤 os.replace로 바꿔치기 → 저장 중에 죽어도 파일이 깨지지 않음.
+    archive_as가 있으면 기존 스냅샷과 journal을 JOURNAL_ARCHIVE_DIR/assets.<archive_as>.*로 옮긴다.
+    (보관된 .json에 .journal.jsonl을 순서대로 적용하면 그 구간의 변경을 그대로 재현할 수 있다)
+    """
+    import shutil
+    import tempfile  # 쓸 때만 import (읽기만 하는 명령줄 도구의 시작 시간)
+
+    dir_name = os.path.dirname(os.path.abspath(DATA_FILE))
+    fd, tmp_path = tempfile.mkstemp(prefix=".assets-", suffix=".tmp", dir=dir_name)
+    try:
+        if os.path.exists(DATA_FILE):
+            os.chmod(tmp_path, os.stat(DATA_FILE).st_mode & 0o777)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # ensure_ascii=False → 한글이 유니코드 이스케이프가 안 되도록
+            if COMPACT_JSON:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            else:
+                # indent=4 → 보기 좋게 줄바꿈
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+
+        archive = None
+        if archive_as is not None and os.path.exists(JOURNAL_FILE):
+            os.makedirs(JOURNAL_ARCHIVE_DIR, exist_ok=True)
+            archive = os.path.join(JOURNAL_ARCHIVE_DIR, f"assets.{archive_as}")
+            if os.path.exists(archive + ".json"):
+                os.remove(archive + ".json")
+            try:
+                os.link(DATA_FILE, archive + ".json")
+            except OSError:
+                shutil.copy2(DATA_FILE, archive + ".json")
+
+        os.replace(tmp_path, DATA_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # 새 스냅샷에 이미 모두 반영됨. 여기서 종료돼도 남은 항목은 rev가 낮아 무시된다.
+    if archive is not None:
+        os.replace(JOURNAL_FILE, archive + ".journal.jsonl")
+
+
+def _cached_state():
+    """파일이 마지막으로 읽거나 쓴 그대로면 그때 문서의 복사본, 아니면 None (잠금 안에서 호출)."""
+    state = _known_state.get(_fingerprints())
+    if state is None:
+        return None
+    return _base(state[0])
+
+
+@timed_function("load_assets")
 def load_assets():
-    """assets.json을 로드하여 딕셔너리로 반환."""
+    """
+    assets.json(+ 변경 기록) 또는 sqlite DB를 로드하여 딕셔너리로 반환.
+    JSON 저장소는 파일 식별값(inode, mtime, 크기)이 마지막으로 읽거나 쓴 그대로면
+    다시 파싱하지 않고 캐시된 문서의 복사본을 돌려준다 (호출한 쪽에서 고쳐도 캐시는 그대로).
+    save_assets나 다른 프로세스/사람이 파일을 바꾸면 식별값이 달라져 자동으로 다시 읽는다.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_store
+        data = sqlite_store.load(DB_FILE)
+        if data:
+            _remember_base(data)
+        return data
+
     if not os.path.exists(DATA_FILE):
         return {}
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    started = time.perf_counter()
+    with _file_lock():
+        data = _cached_state()
+        hit = data is not None
+        if not hit:
+            data, _ = _read_state()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _stats["loads"] += 1
+        _stats["hits" if hit else "misses"] += 1
+        _stats["last_ms"] = elapsed_ms
+        _stats["total_ms"] += elapsed_ms
+    return data
+
 
+def load_stats() -> dict:
+    """load_assets 캐시 통계: 호출 수, 캐시 적중/실패 수, 적중률, 마지막/평균 로드 시간(ms)."""
+    stats = dict(_stats)
+    stats["hit_ratio"] = stats["hits"] / stats["loads"] if stats["loads"] else 0.0
+    stats["avg_ms"] = stats["total_ms"] / stats["loads"] if stats["loads"] else 0.0
+    return stats
+
+
+@timed_function("save_assets")
 def save_assets(data):
-    """수정된 자산 딕셔너리를 assets.json에 저장."""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        # ensure_ascii=False → 한글이 유니코드 이스케이프가 안 되도록
-        # indent=4 → 보기 좋게 줄바꿈
-        json.dump(data, f, ensure_ascii=False, indent=4)
\ No newline at end of file
+    """
+    수정된 자산 딕셔너리를 저장.
+    - 보통은 읽은 시점과 달라진 부분만 journal에 한 줄 추가 (파일 전체를 다시 쓰지 않음)
+    - journal이 COMPACT_EVERY개 쌓였거나 기준 문서를 모르면 스냅샷을 새로 쓴다
+    - 잠금 파일로 저장을 한 번에 하나씩만 하고, 읽은 뒤에 다른 세션이 저장했으면
+      StaleAssetsError (revision 비교, 덮어쓰지 않음)
+    sqlite 백엔드에서는 달라진 행만 한 트랜잭션으로 반영한다.
+    저장이 끝나면 합계를 순자산 스냅샷에 남긴다 (변경이 있을 때만, 하루 한 묶음).
+    """
+    if STORAGE_BACKEND == "sqlite":
+        import sqlite_store
+        sqlite_store.save(DB_FILE, data, _base(data.get("revision", 0)))
+        _remember_base(data)
+        _record_snapshot(data)
+        return
+
+    with _file_lock():
+        disk_revision, journal_len = _disk_state()
+        revision = data.get("revision", 0)
+        if disk_revision is not None and disk_revision != revision:
+            raise StaleAssetsError(
+                "assets.json was changed by another session. Reload the page and try again."
+            )
+
+        base = _base(revision) if disk_revision is not None else None
+        if base is not None and journal_len < COMPACT_EVERY:
+            ops = journal.diff(base, data, skip=("revision",))
+            if not ops:
+                return
+            journal.append_entry(JOURNAL_FILE, revision + 1, ops)
+            data["revision"] = revision + 1
+            _remember(data, journal_len + 1)
+        else:
+            data["revision"] = revision + 1
+            try:
+                _write_snapshot(data, archive_as=disk_revision)
+            except BaseException:
+                data["revision"] = revision
+                raise
+            _remember(data, 0)
+    _record_snapshot(data)
+
+
+def _record_snapshot(data):
+    """저장이 끝난 뒤 합계를 순자산 스냅샷으로 남긴다 (snapshots.record_committed, 하루 한 묶음)."""
+    from snapshots import record_committed
+    record_committed(data)
+
+
+def save_from_page(data) -> bool:
+    """
+    페이지의 버튼 처리에서 쓰는 save_assets.
+    다른 세션이 먼저 저장했으면 (StaleAssetsError) 화면에 STALE_MESSAGE를 보여주고 False.
+    """
+    try:
+        save_assets(data)
+    except StaleAssetsError:
+        import streamlit as st
+        st.error(STALE_MESSAGE)
+        return False
+    return True
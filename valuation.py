@@ -0,0 +1,154 @@
+# valuation.py
+"""
+자산 평가 파이프라인.
+
+assets 문서 + 가격표 + 환율 → 모든 항목을 한 줄씩 펼친 positions 표 하나.
+페이지(주식 계좌 합계/표, 리밸런싱 ...)는 종목별로 다시 평가하지 않고 이 표를 잘라서 쓴다.
+
+kind
+  cash:   금액 자체가 수량인 항목 (입출금/예적금 계좌, 주식 예수금)
+  fixed:  채권/보증금
+  stock / crypto: 가격 × 수량으로 평가하는 종목
+currency는 그 항목을 표시하는 통화(native). KRW로 표시하는 종목 중 원화 시세가 아닌 것은
+USD 시세 × 환율이 native 가격이다 (portfolio.is_krw_quoted, summary.unit_value와 같은 규칙).
+
+종목(stock)은 cost_basis의 lot 장부로 cost_quantity(원가를 아는 수량) / cost(그 취득원가) /
+realized(실현손익)를 함께 싣고, unrealized = cost_quantity × price - cost를 표 전체에 한 번에 계산한다.
+장부가 없는 항목은 NaN.
+"""
+import numpy as np
+import pandas as pd
+
+from cost_basis import tracked
+from profiling import timed_function
+from portfolio import DEPOSIT_NAMES, is_krw_quoted, iter_stock_accounts
+
+UNTAGGED = "(untagged)"
+
+POSITION_COLUMNS = ["category", "account", "name", "ticker", "kind", "currency", "quantity",
+                    "price", "unit_krw", "value", "value_krw", "value_usd", "tags", "tag",
+                    "cost_quantity", "cost", "avg_cost", "unrealized", "unrealized_pct", "realized"]
+
+
+_TEXT_COLUMNS = ("category", "account", "name", "ticker", "kind", "currency", "tags")
+_NUMBER_COLUMNS = ("quantity", "price", "cost_quantity", "cost", "realized")
+
+
+def _chunk(parts: dict, n: int, **columns):
+    """
+    항목 n개를 열 단위로 덧붙인다. 값이 list면 항목별 값, 아니면 n개 모두 같은 값.
+    빠진 숫자 열(원가 / 실현손익)은 NaN.
+    """
+    if n == 0:
+        return
+    for name in _TEXT_COLUMNS + _NUMBER_COLUMNS:
+        value = columns.get(name, np.nan)
+        parts[name].extend(value if isinstance(value, list) else [value] * n)
+
+
+def _tracked_columns(items: list):
+    """종목들의 (원가를 아는 수량, 취득원가, 실현손익) 열. lot 장부가 없는 종목은 NaN."""
+    cost_quantity, cost, realized = [np.nan] * len(items), [np.nan] * len(items), [np.nan] * len(items)
+    for i, it in enumerate(items):
+        if "lots" in it:
+            cost_quantity[i], cost[i] = tracked(it)
+            realized[i] = float(it.get("realized", 0.0))
+    return cost_quantity, cost, realized
+
+
+@timed_function("value_positions")
+def value_positions(assets: dict, prices, rate: float, crypto_positions: pd.DataFrame = None,
+                    columns: list = None) -> pd.DataFrame:
+    """
+    자산 문서 전체를 평가한 positions 표.
+    prices: 주식 티커별 가격 (quotes.fetch_stock_prices, pd.Series 또는 dict)
+    crypto_positions: crypto.value_crypto()["positions"] (없으면 코인은 빠짐)
+    price / value는 native 통화 기준, value_krw / value_usd는 환율로 맞춘 값.
+    시세가 없는 종목은 0으로 평가한다.
+    columns: 필요한 열만 (기본은 POSITION_COLUMNS 전부). 표를 만드는 시간은 열 수에 비례한다.
+    항목을 한 줄씩 더하지 않고 섹션 / 계좌 단위로 열을 모아서 numpy 배열로 한 번에 만든다 (종목 수천 개용).
+    """
+    parts = {name: [] for name in _TEXT_COLUMNS + _NUMBER_COLUMNS}
+
+    for category, kind in (("liquid_assets", "cash"), ("receivables_and_deposits", "fixed")):
+        for section_key, section in assets.get(category, {}).items():
+            if not isinstance(section, dict):
+                continue
+            details = section.get("details", [])
+            _chunk(parts, len(details), category=category, account=section_key,
+                   name=[e.get("name", "") for e in details], ticker="", kind=kind, currency="KRW",
+                   quantity=[float(e.get("amount_krw", 0)) for e in details], price=1.0,
+                   tags=[e.get("tags", []) for e in details])
+
+    for account_name, holdings in iter_stock_accounts(assets.get("stocks", {})):
+        deposits = [it for it in holdings if it.get("name") in DEPOSIT_NAMES]
+        items = [it for it in holdings if it.get("name") not in DEPOSIT_NAMES]
+        _chunk(parts, len(deposits), category="stocks", account=account_name,
+               name=[it["name"] for it in deposits], ticker="", kind="cash",
+               currency=["KRW" if "amount_krw" in it else "USD" for it in deposits],
+               quantity=[float(it["amount_krw"]) if "amount_krw" in it else float(it.get("amount_usd", 0))
+                         for it in deposits],
+               price=1.0, tags=[it.get("tags", []) for it in deposits])
+        # 가격은 아래에서 한 번에 채운다
+        cost_quantity, cost, realized = _tracked_columns(items)
+        _chunk(parts, len(items), category="stocks", account=account_name,
+               name=[it.get("symbol", "") for it in items], ticker=[it.get("ticker", "") for it in items],
+               kind="stock", currency=["KRW" if it.get("currency", "USD") == "KRW" else "USD" for it in items],
+               quantity=[float(it.get("quantity", 0)) for it in items], price=np.nan,
+               tags=[it.get("tags", []) for it in items],
+               cost_quantity=cost_quantity, cost=cost, realized=realized)
+
+    if crypto_positions is not None and not crypto_positions.empty:
+        symbols = crypto_positions["symbol"].tolist()
+        _chunk(parts, len(symbols), category="cryptocurrency", account=crypto_positions["exchange"].tolist(),
+               name=symbols, ticker=symbols, kind="crypto", currency="USD",
+               quantity=crypto_positions["quantity"].astype("float64").tolist(),
+               price=crypto_positions["price_usd"].astype("float64").tolist(),
+               tags=crypto_positions["tags"].tolist())
+
+    cols = {}
+    for name in _TEXT_COLUMNS:
+        cols[name] = np.empty(len(parts[name]), dtype=object)
+        cols[name][:] = parts[name]  # tags(list)도 원소 그대로 담는다
+    for name in _NUMBER_COLUMNS:
+        cols[name] = np.array(parts[name], dtype="float64")
+
+    # 주식 가격: 티커별 시세 → native 가격 (KRW 표시 + 원화 시세 아님 → USD 시세 × 환율)
+    price = cols["price"]
+    currency = cols["currency"]
+    is_stock = cols["kind"] == "stock"
+    if is_stock.any():
+        tickers = cols["ticker"][is_stock]
+        currencies = currency[is_stock]
+        lookup = prices if isinstance(prices, dict) else prices.to_dict()
+        raw = np.fromiter((lookup.get(t) or 0.0 for t in tickers), dtype="float64", count=len(tickers))
+        raw = np.nan_to_num(raw, nan=0.0)  # 시세 없음(None / NaN) → 0
+        krw_quoted = np.fromiter(map(is_krw_quoted, currencies, tickers), dtype=bool, count=len(tickers))
+        price[is_stock] = np.where((currencies == "KRW") & ~krw_quoted, raw * rate, raw)
+
+    to_krw = np.where(currency == "USD", rate, 1.0)
+    cols["unit_krw"] = price * to_krw
+    cols["value"] = cols["quantity"] * price
+    cols["value_krw"] = cols["value"] * to_krw
+    cols["value_usd"] = cols["value_krw"] / rate if rate else np.zeros(len(price))
+    cols["tag"] = np.array([t[0] if isinstance(t, list) and t else UNTAGGED for t in parts["tags"]], dtype=object)
+
+    # 손익 (native 통화). 원가를 아는 수량이 0이면 평균 단가 / 수익률은 NaN
+    cost_quantity, cost = cols["cost_quantity"], cols["cost"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols["avg_cost"] = np.where(cost_quantity > 0, cost / cost_quantity, np.nan)
+        cols["unrealized"] = np.where(cost_quantity > 0, cost_quantity * price - cost, np.nan)
+        cols["unrealized_pct"] = np.where(cost > 0, cols["unrealized"] / cost, np.nan)
+    # 글자 열은 object 배열 그대로 담는다 (기본 문자열 dtype으로 바꾸면 열마다 항목 수만큼 변환 비용이 든다)
+    return pd.DataFrame({name: pd.Series(cols[name], dtype=object, copy=False) if cols[name].dtype == object
+                         else cols[name] for name in columns or POSITION_COLUMNS})
+
+
+def native_totals(positions: pd.DataFrame, by: str = "account") -> pd.DataFrame:
+    """
+    by별 native 통화 합계. returns DataFrame(index=by, columns=["KRW", "USD"])
+    (KRW 표시 항목 합 / USD 표시 항목 합. 환율로 섞지 않는다)
+    """
+    table = positions.pivot_table(index=by, columns="currency", values="value",
+                                  aggfunc="sum", fill_value=0.0, sort=False)
+    return table.reindex(columns=["KRW", "USD"], fill_value=0.0)